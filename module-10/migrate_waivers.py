@@ -0,0 +1,177 @@
+"""
+Outland Adventures table browser: waiver migration
+
+Moves the waivers still stored in trip_member.waiver out to the waiver store
+(see waiver_store.py), a batch of trip members at a time.
+
+First, waivers written before db_upgrade_2025.sql added the triggers that
+keep waiver_hash and waiver_size filled in get theirs, one short
+transaction per batch. Then, for each batch:
+
+  1. the next batch of member ids with a waiver in the table is looked up,
+     carrying on from the last id of the batch before
+  2. each of their waivers is copied to the store a chunk at a time, outside
+     of any transaction, so nothing is locked while the files are written
+  3. one short transaction points the members at the stored copies and
+     empties their waiver column; a member whose waiver changed during the
+     copy is left alone and picked up by the next run
+
+It can be stopped and run again at any time. Run db_upgrade_2025.sql first.
+
+    python migrate_waivers.py --batch-size 200
+    python migrate_waivers.py --optimize   # also give the freed space back once done
+    python migrate_waivers.py --backfill-only   # only fill in waiver_hash and waiver_size
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# shared_db is in the parent folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+from shared_db import get_connection, PreparedCursor
+
+from waiver_store import WaiverStore, default_store
+from waivers import waiver_chunks
+
+# Next batch of members whose waiver has no hash yet, in id order, and the statement filling
+# in their hashes and sizes (both ends of the batch are passed, so it's one UPDATE per batch)
+NEXT_BACKFILL_SQL = ("SELECT id FROM trip_member WHERE id > %s AND waiver_hash IS NULL AND waiver IS NOT NULL "
+                     "ORDER BY id LIMIT %s")
+BACKFILL_SQL = ("UPDATE trip_member SET waiver_hash = SHA2(waiver, 256), waiver_size = OCTET_LENGTH(waiver) "
+                "WHERE id BETWEEN %s AND %s AND waiver_hash IS NULL AND waiver IS NOT NULL")
+
+# Next batch of members whose waiver is still in the table, in id order
+NEXT_BATCH_SQL = "SELECT id FROM trip_member WHERE id > %s AND waiver IS NOT NULL ORDER BY id LIMIT %s"
+
+# Points a member at its stored waiver, but only if the waiver is still the one that was copied
+# (the triggers update waiver_hash whenever the waiver changes)
+MOVE_SQL = ("UPDATE trip_member SET waiver_hash = %s, waiver_size = %s, waiver = NULL "
+            "WHERE id = %s AND waiver IS NOT NULL AND waiver_hash = %s")
+
+
+# Class to move waivers to the store in batches, keeping count of what it did
+class WaiverMigration:
+
+    def __init__(self, connection, store, batch_size=100):
+        # connection should be in autocommit mode; each batch starts its own transaction
+        self.connection = connection
+        self.store = store
+        self.batch_size = batch_size
+        self.backfilled = 0  # members whose waiver_hash and waiver_size were filled in
+        self.moved = 0       # members pointed at the store
+        self.skipped = 0     # members whose waiver changed while it was copied
+        self.new_files = 0   # waivers added to the store
+        self.duplicates = 0  # waivers the store already had
+        self.bytes_moved = 0 # waiver bytes taken out of the table
+        self.bytes_stored = 0 # bytes of the new files in the store
+
+    # Method to fill in waiver_hash and waiver_size for every waiver that doesn't have them;
+    # on_batch, if given, is called after each batch
+    def backfill(self, on_batch=None):
+        cursor = PreparedCursor(self.connection)
+        try:
+            last_id = 0
+            while True:
+                cursor.execute(NEXT_BACKFILL_SQL, (last_id, self.batch_size))
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    break
+                # autocommit, so each batch's UPDATE is its own short transaction
+                cursor.execute(BACKFILL_SQL, (ids[0], ids[-1]))
+                self.backfilled += cursor.rowcount
+                last_id = ids[-1]
+                if on_batch is not None:
+                    on_batch(self)
+        finally:
+            cursor.close()
+
+    # Method to move every waiver still in the table; on_batch, if given, is called after each batch
+    def run(self, on_batch=None):
+        self.backfill(on_batch)
+        cursor = PreparedCursor(self.connection)
+        try:
+            last_id = 0
+            while True:
+                cursor.execute(NEXT_BATCH_SQL, (last_id, self.batch_size))
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    break
+                self._move_batch(cursor, ids)
+                last_id = ids[-1]
+                if on_batch is not None:
+                    on_batch(self)
+        finally:
+            cursor.close()
+
+    # Method to copy one batch of waivers to the store and point their members at the copies
+    def _move_batch(self, cursor, ids):
+        copied = []
+        for member_id in ids:
+            digest, size, new = self.store.put(waiver_chunks(cursor, member_id, store=self.store))
+            copied.append((digest, size, member_id))
+            if new:
+                self.new_files += 1
+                self.bytes_stored += size
+            else:
+                self.duplicates += 1
+
+        # The row locks are only held for these UPDATEs, not while copying
+        self.connection.start_transaction()
+        try:
+            for digest, size, member_id in copied:
+                cursor.execute(MOVE_SQL, (digest, size, member_id, digest))
+                if cursor.rowcount == 1:
+                    self.moved += 1
+                    self.bytes_moved += size
+                else:
+                    self.skipped += 1
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move trip member waivers out of MySQL into the waiver store.")
+    parser.add_argument("--batch-size", type=int, default=100, help="members per transaction (default: 100)")
+    parser.add_argument("--store", help="waiver store folder (default: WAIVER_STORE in .env_outland)")
+    parser.add_argument("--optimize", action="store_true",
+                        help="run OPTIMIZE TABLE trip_member afterwards to give the freed space back")
+    parser.add_argument("--backfill-only", action="store_true",
+                        help="only fill in missing waiver hashes and sizes, leaving the waivers in the table")
+    args = parser.parse_args(argv)
+
+    store = WaiverStore(args.store) if args.store else default_store()
+    db = get_connection(".env_outland", pool_size=1, autocommit=True)
+    started = time.perf_counter()
+    try:
+        migration = WaiverMigration(db, store, args.batch_size)
+        report = lambda progress: print(f"  {progress.backfilled} hashed, {progress.moved} moved, "
+                                        f"{progress.skipped} skipped", end="\r")
+        if args.backfill_only:
+            migration.backfill(report)
+        else:
+            migration.run(report)
+        print()
+
+        # InnoDB keeps the emptied space for reuse; rebuilding the table hands it back
+        if args.optimize:
+            cursor = db.cursor()
+            cursor.execute("OPTIMIZE TABLE trip_member")
+            cursor.fetchall()
+            cursor.close()
+    finally:
+        db.close()
+
+    print(f"{migration.backfilled} waiver hashes and sizes filled in")
+    print(f"{migration.moved} waivers moved to {store.root} in {time.perf_counter() - started:.1f}s, "
+          f"{migration.skipped} skipped (changed while copying; run again to move them)")
+    print(f"{migration.new_files} new files, {migration.duplicates} duplicates; "
+          f"{migration.bytes_moved:,} bytes taken out of the table, {migration.bytes_stored:,} bytes stored")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,70 +1,43 @@
 # BLUE TEAM: Vaneshiea Bell, Jess Monnier, DeJanae Faison
 # Professor Sue Sampson
 # Assignment 10 Milestone 2, 2/23/25
-# Connect to SQL file and print contents of database tables
+# Connect to SQL file and browse the contents of database tables a page at a time
 import mysql.connector
 from mysql.connector import errorcode
 import os
-
-# Connect to .env file
-from dotenv import dotenv_values
+import sys
 
 # Get the directory of the script so we don't have to execute 
 # the script from that directory for the .env file to work
 working_dir = os.path.dirname(os.path.realpath(__file__))
 os.chdir(working_dir)
 
-# Using ENV file
-secrets = dotenv_values("..\\.env_outland")
-
-config = {
-    "user": secrets["USER"],
-    "password": secrets["PASSWORD"],
-    "host": secrets["HOST"],
-    "database": secrets["DATABASE"],
-    "raise_on_warnings": True # not in .env file
-}
-
-# open connection with error checking
-try:
-    """ try/catch block for handling potential MySQL database errors """ 
-
-    db = mysql.connector.connect(**config) # connect to the database 
-    
-    # output the connection status 
-    print("\n  Database user {} connected to MySQL on host {} with database {}".format(config["user"], config["host"], config["database"]))
+# shared_db (in the parent folder) reads our .env_outland file and hands out pooled connections
+sys.path.insert(0, os.path.join(working_dir, ".."))
+from shared_db import load_config, get_connection, PreparedCursor
+from table_browser import KeysetPager
+from waivers import WAIVER_SUMMARY_COLUMNS, add_waiver_extension, save_waiver, view_waiver
 
-    input("\n\n  Press Enter to view the contents of the customer table...")
+config = load_config(".env_outland")
 
-    # Get a database "cursor" to execute queries in our database
-    cursor = db.cursor()
+# Number of rows shown per page; can be changed while browsing
+PAGE_SIZE = 6
 
-    # Get first 6 entries from the customer table
-    cursor.execute("SELECT * FROM customer LIMIT 6")
-    customers = cursor.fetchall()
-    
-    # Display customer info
-    print("\n\n--Customers--")
-    for customer in customers:
-        # Use a multi-line string and its .format method to get a nice output
-        print("""
+# Tables that can be browsed: name -> (heading, primary key columns, columns shown, how to show a row)
+TABLES = {
+    "customer": ("Customers", ("cust_id",),
+        ("cust_id", "first_name", "last_name", "phone_number", "addr_street", "addr_city", "addr_state", "addr_zip"),
+        """
 ID: {}
 Name: {} {}
 Phone: {}
 Address:
     {}
-    {}, {} {}""".format(*customer))
-
-    input("\n\n  Press Enter to view the contents of the staff table...")
-    
-    # Get the contents of the staff table
-    cursor.execute("SELECT * FROM staff LIMIT 6")
-    employees = cursor.fetchall()
-    
-    # Display staff info
-    print("\n\n--Staff--")
-    for staff in employees:
-        print("""
+    {}, {} {}"""),
+    "staff": ("Staff", ("staff_id",),
+        ("staff_id", "first_name", "last_name", "nick_name", "phone_number", "addr_street", "addr_city",
+         "addr_state", "addr_zip", "email", "staff_role"),
+        """
 ID: {}
 Name: {} {}
 Nickname: {}
@@ -73,92 +46,55 @@ Address:
     {}
     {}, {} {}
 Email: {}
-Role: {}""".format(*staff))
-
-    input("\n\n  Press Enter to view the contents of the trip table...")
-    
-    # Get the first 6 entries of the trip table
-    cursor.execute("SELECT * FROM trip LIMIT 6")
-    trips = cursor.fetchall()
-    
-    # Display trip info
-    print("\n\n--Trip--")
-    for trip in trips:
-        print("""
+Role: {}"""),
+    "trip": ("Trip", ("trip_id",),
+        ("trip_id", "destination", "trip_start", "trip_end", "staff_id", "cust_primary"),
+        """
 ID: {}
 Destination: {}
 Dates: {} - {}
 Staff ID of Guide: {}
-Primary Customer's ID: {}""".format(*trip))
-    
-    input("\n\n  Press Enter to view the contents of the trip_member table...")
-    
-    # Get the first 6 entries of the trip_member table
-    cursor.execute("SELECT * FROM trip_member LIMIT 6")
-    trip_members = cursor.fetchall()
-    
-    # Display trip_member info
-    print("\n\n--Trip Member--")
-    for trip_member in trip_members:
-        print("""
+Primary Customer's ID: {}"""),
+    # Waivers can be up to 16 MB each, so only their size and hash are read here; see waivers.py
+    "trip_member": ("Trip Member", ("id",),
+        ("id", "trip_id", "first_name", "last_name", "date_of_birth", "reservations") + WAIVER_SUMMARY_COLUMNS
+        + ("email", "phone_number", "cust_id", "passport_status", "emergency_number", "emergency_name",
+           "emergency_relation"),
+        """
 ID: {}
 Trip ID: {}
 Name: {} {} (Result of None None means this info is in the customer table)
 Date of Birth: {}
 Reservations: {}
-Waiver: {}
+Waiver: {} bytes, SHA-256 {} (w <id> saves it to a file, v <id> opens it)
 Email: {} (Result of None means this info is in the customer table)
 Phone Number: {} (Ditto)
 Customer ID: {} (Result of None means this trip member has no customer account)
 Passport Status: {}
 Emergency Contact Number: {}
 Emergency Contact Name: {}
-Emergency Contact Relationship: {}""".format(*trip_member))
-    
-    input("\n\n  Press Enter to view the contents of the guide requirements table...")
-    
-    # Get the contents of the guide_req table
-    cursor.execute("SELECT * FROM guide_req")
-    guide_reqs = cursor.fetchall()
-    
-    # Display guide_req info
-    print("\n\n--Guide Requirements--")
-    for guide_req in guide_reqs:
-        print("""
+Emergency Contact Relationship: {}"""),
+    "guide_req": ("Guide Requirements", ("req_id",),
+        ("req_id", "name", "description", "valid_months", "governing_org"),
+        """
 Requirement ID: {}
 Name: {}
 Description: 
     {}
 Months Valid: {} (A result of None means it doesn't expire)
 Governing Organization:
-    {}""".format(*guide_req))
-    
-    input("\n\n  Press Enter to view the contents of the guide requirements tracking table...")
-    
-    # Get the contents of the guide_req_tracker table
-    cursor.execute("SELECT * FROM guide_req_tracker")
-    entries = cursor.fetchall()
-    
-    # Display guide_req_tracker info
-    print("\n\n--Guide Requirement Tracker--")
-    for entry in entries:
-        print("""
+    {}"""),
+    "guide_req_tracker": ("Guide Requirement Tracker", ("id",),
+        ("id", "complete_date", "status", "req_id", "staff_id"),
+        """
 ID: {}
 Last Date of Completion: {}
 Status: {}
 Requirement ID: {}
-Staff ID of Guide: {}""".format(*entry))
-    
-    input("\n\n  Press Enter to view the contents of the order inventory table...")
-    
-    # Get the contents of the order_inventory table
-    cursor.execute("SELECT * FROM order_inventory")
-    eqps = cursor.fetchall()
-    
-    # Display order_inventory info
-    print("\n\n--Order Inventory--")
-    for eqp in eqps:
-        print("""
+Staff ID of Guide: {}"""),
+    "order_inventory": ("Order Inventory", ("product_code", "product_condition"),
+        ("product_code", "product_condition", "name", "unit_price", "stock", "weight", "dimensions", "description"),
+        """
 Product Code: {}
 Product Condition: {}
 Name: {}
@@ -167,92 +103,179 @@ Stock: {}
 Weight: {} lbs (Approximate, for shipping)
 Dimensions: {} (Also for shipping)
 Description:
-    {}""".format(*eqp))
-    
-    input("\n\n  Press Enter to view the contents of the orders table...")
-    
-    # Get the contents of the orders table
-    cursor.execute("SELECT * FROM orders LIMIT 6")
-    orders = cursor.fetchall()
-    
-    # Display order info
-    print("\n\n--Orders--")
-    for order in orders:
-        print("""
+    {}"""),
+    "orders": ("Orders", ("order_id",),
+        ("order_id", "order_date", "cust_id", "ship_street", "ship_city", "ship_state", "ship_zip"),
+        """
 Order ID: {}
 Date of Order: {}
 Customer ID: {}
 Shipping Info: (Will show "None" for all entries if picking up in store)
     {}
-    {}, {} {}""".format(*order))
-    
-    input("\n\n  Press Enter to view the contents of the order item table...")
-    
-    # Get the contents of the order_item table
-    cursor.execute("SELECT * FROM order_item LIMIT 6")
-    order_items = cursor.fetchall()
-    
-    # Display order_item info
-    print("\n\n--Order Items--")
-    for order_item in order_items:
-        print("""
+    {}, {} {}"""),
+    "order_item": ("Order Items", ("id",),
+        ("id", "product_code", "product_condition", "quantity", "ship_tracking", "order_id"),
+        """
 ID: {}
 Product Code: {}
 Product Condition: {}
 Quantity: {}
 Shipping Tracking Info: ("None" for in-store pickup)
     {}
-Order ID: {}""".format(*order_item))
-    
-    input("\n\n  Press Enter to view the contents of the rental table...")
-    
-    # Get the contents of the rental table
-    cursor.execute("SELECT * FROM rental LIMIT 6")
-    rentals = cursor.fetchall()
-    
-    # Display rental info
-    print("\n\n--Rentals--")
-    for rental in rentals:
-        print("""
+Order ID: {}"""),
+    "rental": ("Rentals", ("rental_id",),
+        ("rental_id", "rental_date", "cust_id", "start_date", "end_date"),
+        """
 Rental ID: {}
 Date of Rental Transaction: {}
 Customer ID: {}
-Rental Period: {} - {}""".format(*rental))
-    
-    input("\n\n  Press Enter to view the contents of the rental inventory table...")
-    
-    # Get the contents of the rental_inventory table
-    cursor.execute("SELECT * FROM rental_inventory")
-    eqps = cursor.fetchall()
-    
-    # Display rental_inventory info
-    print("\n\n--Rental Inventory--")
-    for eqp in eqps:
-        print("""
+Rental Period: {} - {}"""),
+    "rental_inventory": ("Rental Inventory", ("item_id",),
+        ("item_id", "initial_use", "rate", "product_condition", "product_code", "rental_id"),
+        """
 Item ID: {}
 Date of Initial Use: {} ("None" means it hasn't been rented yet)
 Rate: ${} (per day)
 Product Condition: {}
 Product Code: {}
-Rental ID: {} ("None" if not rented/reserved currently)""".format(*eqp))
-    
-    input("\n\n  Press Enter to view the contents of the rental history table...")
-    
-    # Get the contents of the rental_history table
-    cursor.execute("SELECT * FROM rental_history LIMIT 6")
-    eqps = cursor.fetchall()
-    
-    # Display rental_history info
-    print("\n\n--Rental History--")
-    for eqp in eqps:
-        print("""
+Rental ID: {} ("None" if not rented/reserved currently)"""),
+    "rental_history": ("Rental History", ("id",),
+        ("id", "item_id", "rental_id", "issue_condition", "return_condition"),
+        """
 ID: {}
 Item ID: {} (Foreign key for rental_inventory)
 Rental ID: {} (Foreign key for rental)
 Issue Condition: {}
-Return Condition: {} (Value of None means it is still out for rental)""".format(*eqp))
+Return Condition: {} (Value of None means it is still out for rental)"""),
+}
+
+BROWSE_HELP = "  [Enter]/n next page, p previous, f first, l last, j <id> jump to an id, s <number> page size, t tables, q quit"
+WAIVER_HELP = "  w <id> [file] save a trip member's waiver, v <id> open it"
+
+# Function to ask which table to browse; returns None to quit
+def choose_table():
+    print("\n\n--Tables--")
+    names = list(TABLES)
+    for number, name in enumerate(names, start = 1):
+        print("  {}. {} ({})".format(number, TABLES[name][0], name))
+    while True:
+        choice = input("\n  Enter a table number or name (q to quit): ").strip()
+        if choice.lower() == "q":
+            return None
+        if choice.isdigit() and 1 <= int(choice) <= len(names):
+            return names[int(choice) - 1]
+        if choice in TABLES:
+            return choice
+        print("  There is no table {}".format(choice))
+
+# Function to turn what was typed after "j" into key values; composite keys are
+# separated by commas, e.g. "j TENT-2P, new" (or just "j TENT-2P")
+def parse_key(text):
+    return [int(value) if value.isdigit() else value for value in (part.strip() for part in text.split(","))]
+
+# Function to print the current page of a table
+def show_page(pager, heading, template):
+    print("\n\n--{}--".format(heading))
+    if not pager.rows:
+        print("\n  (no rows here)")
+    for row in pager.rows:
+        print(template.format(*row))
+    print("\n  Page of {} rows{}{}".format(pager.page_size,
+                                            ", more before" if pager.has_previous else "",
+                                            ", more after" if pager.has_next else ""))
+
+# Function to save ("w <id> [file]") or open ("v <id>") a trip member's waiver; the
+# waiver is written to the file a chunk at a time
+def show_waiver(cursor, action, argument):
+    member_id, _, path = argument.partition(" ")
+    try:
+        if action == "v":
+            path, size, digest = view_waiver(cursor, int(member_id))
+        elif path.strip():
+            path = path.strip()
+            size, digest = save_waiver(cursor, int(member_id), path)
+        else:
+            # Without a file name it's saved here, named after the trip member and its file type
+            size, digest = save_waiver(cursor, int(member_id), "waiver_{}".format(member_id))
+            path = add_waiver_extension("waiver_{}".format(member_id))
+    except (LookupError, OSError) as err:
+        print("  {}".format(err))
+        return
+    print("  Saved the waiver to {} ({} bytes, SHA-256 {})".format(path, size, digest))
+
+# Function to page through one table until the user asks for the table list or to quit;
+# returns False to quit
+def browse(cursor, table):
+    global PAGE_SIZE
+    heading, key_columns, columns, template = TABLES[table]
+    pager = KeysetPager(cursor, table, key_columns, columns, PAGE_SIZE)
+    pager.first()
+    show_page(pager, heading, template)
+    while True:
+        print("\n" + BROWSE_HELP)
+        if table == "trip_member":
+            print(WAIVER_HELP)
+        command = input("  > ").strip()
+        action, _, argument = command.partition(" ")
+        action = action.lower()
+        if action in ("", "n"):
+            if not pager.has_next:
+                print("  That was the last page")
+                continue
+            pager.next()
+        elif action == "p":
+            if not pager.has_previous:
+                print("  That was the first page")
+                continue
+            pager.previous()
+        elif action == "f":
+            pager.first()
+        elif action == "l":
+            pager.last()
+        elif action == "j" and argument:
+            try:
+                pager.jump(parse_key(argument))
+            except ValueError as err:
+                print("  {}".format(err))
+                continue
+        elif action == "s" and argument.isdigit() and int(argument) > 0:
+            # The page is re-read from its first row at the new size
+            PAGE_SIZE = pager.page_size = int(argument)
+            if pager.rows:
+                pager.jump(pager.key_of(pager.rows[0]))
+            else:
+                pager.first()
+        elif action in ("w", "v") and table == "trip_member" and argument.split(" ")[0].isdigit():
+            show_waiver(cursor, action, argument)
+            continue
+        elif action == "t":
+            return True
+        elif action == "q":
+            return False
+        else:
+            print("  Sorry, I didn't understand that")
+            continue
+        show_page(pager, heading, template)
+
+db = None
+cursor = None
+
+# open connection with error checking
+try:
+    """ try/catch block for handling potential MySQL database errors """ 
+
+    db = get_connection(".env_outland", pool_size=1) # connect to the database 
     
-    input("\n\n  Phew, we made it! Press Enter to exit...")
+    # output the connection status 
+    print("\n  Database user {} connected to MySQL on host {} with database {}".format(config["user"], config["host"], config["database"]))
+
+    # Get a prepared statement cursor; each page is one prepared statement run with new values
+    cursor = PreparedCursor(db)
+
+    # Keep browsing until the user quits
+    table = choose_table()
+    while table is not None and browse(cursor, table):
+        table = choose_table()
 
 except mysql.connector.Error as err:
     """ on error code """
@@ -271,4 +294,7 @@ except mysql.connector.Error as err:
 finally:
     """ close the connection to MySQL """
 
-    db.close()
\ No newline at end of file
+    if cursor is not None:
+        cursor.close()
+    if db is not None:
+        db.close()
@@ -0,0 +1,125 @@
+"""
+Outland Adventures table browser: keyset pager
+
+Pages through a table in primary key order. Every page is found from the
+key of the row it starts after (or before), e.g.
+
+    SELECT ... FROM rental_history WHERE id > 1200 ORDER BY id LIMIT 7
+
+instead of skipping rows with OFFSET, so MySQL goes straight to the right
+spot in the primary key and reads only that page's rows. A page near the
+end of a table with millions of rows costs the same as the first page of a
+table with six. Composite keys (like order_inventory's product code and
+condition) are compared as a row: (product_code, product_condition) > (...).
+
+The statements are run through a PreparedCursor, so each table's handful of
+statements is prepared once and its result rows are read off the connection
+as they arrive; nothing past the page (plus one row, to see if there's a
+next page) is ever sent.
+"""
+
+
+# Class to page through one table by its primary key
+class KeysetPager:
+
+    def __init__(self, cursor, table, key_columns, columns, page_size=6):
+        # cursor should be a PreparedCursor; columns are the columns (or SQL expressions)
+        # to show, and must include every one of key_columns
+        self.cursor = cursor
+        self.table = table
+        self.key_columns = tuple(key_columns)
+        self.columns = tuple(columns)
+        self.page_size = page_size
+        self.rows = []             # rows on the current page
+        self.has_next = False      # whether there are rows after the current page
+        self.has_previous = False  # whether there are rows before it
+        self._key_positions = [self.columns.index(column) for column in self.key_columns]
+
+        # The statements are built once and kept, since the prepared statement handles are
+        # only reused for the very same strings (see shared_db.prepared)
+        select = f"SELECT {', '.join(self.columns)} FROM {table}"
+        forward = ", ".join(self.key_columns)
+        backward = ", ".join(f"{column} DESC" for column in self.key_columns)
+        key, marks = self._key_sql(self.key_columns)
+        self._first_sql = f"{select} ORDER BY {forward} LIMIT %s"
+        self._last_sql = f"{select} ORDER BY {backward} LIMIT %s"
+        self._after_sql = f"{select} WHERE {key} > {marks} ORDER BY {forward} LIMIT %s"
+        self._before_sql = f"{select} WHERE {key} < {marks} ORDER BY {backward} LIMIT %s"
+
+        # Jumping can give just the leading part of a composite key, e.g. only a product code
+        self._jump_sql = []
+        for length in range(1, len(self.key_columns) + 1):
+            key, marks = self._key_sql(self.key_columns[:length])
+            self._jump_sql.append(f"{select} WHERE {key} >= {marks} ORDER BY {forward} LIMIT %s")
+
+    # Method to get the SQL for a key (a row for composite keys) and its placeholders
+    @staticmethod
+    def _key_sql(key_columns):
+        if len(key_columns) == 1:
+            return key_columns[0], "%s"
+        return f"({', '.join(key_columns)})", f"({', '.join(['%s'] * len(key_columns))})"
+
+    @property
+    def page_size(self):
+        return self._page_size
+
+    @page_size.setter
+    def page_size(self, size):
+        if size < 1:
+            raise ValueError("page size must be at least 1")
+        self._page_size = size
+
+    # Method to get the primary key of a row on the page
+    def key_of(self, row):
+        return [row[position] for position in self._key_positions]
+
+    # Method to run one page's statement, reading at most one row more than a page
+    def _fetch(self, sql, key=()):
+        self.cursor.execute(sql, list(key) + [self.page_size + 1])
+        rows = self.cursor.fetchall()
+        return rows[:self.page_size], len(rows) > self.page_size
+
+    # Methods to move to the first or last page
+    def first(self):
+        self.rows, self.has_next = self._fetch(self._first_sql)
+        self.has_previous = False
+        return self.rows
+
+    def last(self):
+        rows, self.has_previous = self._fetch(self._last_sql)
+        self.rows = rows[::-1]
+        self.has_next = False
+        return self.rows
+
+    # Method to move to the next page; stays put if there isn't one
+    def next(self):
+        if not self.rows:
+            return self.first()
+        rows, more = self._fetch(self._after_sql, self.key_of(self.rows[-1]))
+        if rows:
+            self.rows, self.has_next, self.has_previous = rows, more, True
+        else:
+            self.has_next = False
+        return self.rows
+
+    # Method to move to the previous page; stays put if there isn't one
+    def previous(self):
+        if not self.rows:
+            return self.last()
+        rows, more = self._fetch(self._before_sql, self.key_of(self.rows[0]))
+        if rows:
+            self.rows, self.has_previous, self.has_next = rows[::-1], more, True
+        else:
+            self.has_previous = False
+        return self.rows
+
+    # Method to move to the page starting at a key (or the first key after it);
+    # key is a list of values for the leading key columns
+    def jump(self, key):
+        if not 1 <= len(key) <= len(self.key_columns):
+            raise ValueError(f"{self.table} is keyed by {', '.join(self.key_columns)}")
+        self.rows, self.has_next = self._fetch(self._jump_sql[len(key) - 1], key)
+
+        # Whether anything comes before isn't known without another query; previous() finds out
+        self.has_previous = bool(self.rows)
+        return self.rows
@@ -0,0 +1,108 @@
+"""
+Tests for table_browser: the keyset pager's statements, and paging through an
+in-memory SQLite table standing in for MySQL
+"""
+
+import sqlite3
+
+import pytest
+
+from table_browser import KeysetPager
+
+
+# Class standing in for a PreparedCursor
+class FakeCursor:
+
+    def __init__(self, db):
+        self.db = db
+        self.executed = []
+
+    def execute(self, sql, params=()):
+        self.executed.append((sql, list(params)))
+        self.rows = self.db.execute(sql.replace("%s", "?"), tuple(params)).fetchall()
+
+    def fetchall(self):
+        return self.rows
+
+
+@pytest.fixture
+def cursor():
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE rental_history (id INTEGER PRIMARY KEY, item_id INT)")
+    db.executemany("INSERT INTO rental_history VALUES (?, ?)", [(i, i * 10) for i in range(1, 15)])
+    db.execute("""CREATE TABLE order_inventory (product_code TEXT, product_condition TEXT, stock INT,
+                  PRIMARY KEY (product_code, product_condition))""")
+    db.executemany("INSERT INTO order_inventory VALUES (?, ?, ?)",
+                   [(code, condition, 1) for code in ("P1", "P2", "P3") for condition in ("new", "used")])
+    return FakeCursor(db)
+
+
+def ids(rows):
+    return [row[0] for row in rows]
+
+
+def test_statements_for_a_single_key():
+    pager = KeysetPager(FakeCursor(None), "rental_history", ["id"], ["id", "item_id"])
+    assert pager._first_sql == "SELECT id, item_id FROM rental_history ORDER BY id LIMIT %s"
+    assert pager._last_sql == "SELECT id, item_id FROM rental_history ORDER BY id DESC LIMIT %s"
+    assert pager._after_sql == "SELECT id, item_id FROM rental_history WHERE id > %s ORDER BY id LIMIT %s"
+    assert pager._before_sql == "SELECT id, item_id FROM rental_history WHERE id < %s ORDER BY id DESC LIMIT %s"
+    assert pager._jump_sql == ["SELECT id, item_id FROM rental_history WHERE id >= %s ORDER BY id LIMIT %s"]
+
+
+def test_statements_for_a_composite_key():
+    pager = KeysetPager(FakeCursor(None), "order_inventory", ["product_code", "product_condition"],
+                        ["product_code", "product_condition", "stock"])
+    assert "WHERE (product_code, product_condition) > (%s, %s) ORDER BY product_code, product_condition" \
+        in pager._after_sql
+    assert "ORDER BY product_code DESC, product_condition DESC" in pager._before_sql
+    assert "WHERE product_code >= %s ORDER BY" in pager._jump_sql[0]
+    assert "WHERE (product_code, product_condition) >= (%s, %s) ORDER BY" in pager._jump_sql[1]
+
+
+def test_key_columns_must_be_shown():
+    with pytest.raises(ValueError):
+        KeysetPager(FakeCursor(None), "rental_history", ["id"], ["item_id"])
+
+
+def test_page_size_must_be_positive():
+    with pytest.raises(ValueError):
+        KeysetPager(FakeCursor(None), "rental_history", ["id"], ["id"], page_size=0)
+
+
+def test_paging_forward_and_back(cursor):
+    pager = KeysetPager(cursor, "rental_history", ["id"], ["id", "item_id"], page_size=6)
+    assert ids(pager.first()) == [1, 2, 3, 4, 5, 6]
+    assert (pager.has_previous, pager.has_next) == (False, True)
+    assert ids(pager.next()) == [7, 8, 9, 10, 11, 12]
+    assert ids(pager.next()) == [13, 14]
+    assert (pager.has_previous, pager.has_next) == (True, False)
+    assert ids(pager.next()) == [13, 14]  # stays on the last page
+    assert ids(pager.previous()) == [7, 8, 9, 10, 11, 12]
+    assert ids(pager.last()) == [9, 10, 11, 12, 13, 14]
+    assert (pager.has_previous, pager.has_next) == (True, False)
+
+
+def test_each_page_reads_one_row_more_than_a_page(cursor):
+    pager = KeysetPager(cursor, "rental_history", ["id"], ["id"], page_size=6)
+    pager.first()
+    pager.next()
+    assert cursor.executed[-1][1] == [6, 7]  # after id 6, page size + 1
+
+
+def test_paging_a_composite_key(cursor):
+    pager = KeysetPager(cursor, "order_inventory", ["product_code", "product_condition"],
+                        ["product_code", "product_condition", "stock"], page_size=4)
+    pager.first()
+    assert [pager.key_of(row) for row in pager.next()] == [["P3", "new"], ["P3", "used"]]
+    assert [pager.key_of(row) for row in pager.previous()] == [["P1", "new"], ["P1", "used"],
+                                                               ["P2", "new"], ["P2", "used"]]
+
+
+def test_jump_to_a_whole_or_partial_key(cursor):
+    pager = KeysetPager(cursor, "order_inventory", ["product_code", "product_condition"],
+                        ["product_code", "product_condition", "stock"], page_size=2)
+    assert [pager.key_of(row) for row in pager.jump(["P2"])] == [["P2", "new"], ["P2", "used"]]
+    assert [pager.key_of(row) for row in pager.jump(["P2", "used"])] == [["P2", "used"], ["P3", "new"]]
+    with pytest.raises(ValueError):
+        pager.jump(["P2", "used", 1])
@@ -0,0 +1,121 @@
+"""
+Outland Adventures table browser: waiver store
+
+Signed waivers kept as files outside of MySQL, named by the SHA-256 hash of
+their contents. trip_member keeps only the hash (waiver_hash) and size
+(waiver_size), so its rows stay small and scanning it never drags waivers
+through the buffer pool. Many members sign the same template PDF; since
+identical documents have the same hash, each one is stored once however
+many members point at it.
+
+    ab/cd/abcd1234...   a waiver, under folders named for the start of its hash
+    tmp/                waivers being written; moved into place once complete
+
+Waivers are read through memory-mapped files, so the operating system pages
+them in as they're read instead of copying the whole file into Python.
+"""
+
+import hashlib
+import mmap
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# shared_db is in the parent folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+from shared_db.config import waiver_store_setting
+
+
+# Class for a folder of waivers named by their SHA-256 hash
+class WaiverStore:
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    # Method to get where the waiver with a given hash is (or would be) kept
+    def path(self, digest):
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def __contains__(self, digest):
+        return self.path(digest).is_file()
+
+    # Method to add a waiver from an iterable of byte chunks; returns its hash, its size and
+    # whether it was new (False when the same document was already stored)
+    def put(self, chunks):
+
+        # Written to a temporary file first and only moved into place once complete and on
+        # disk, so a waiver in the store is always whole, even after a crash part way through
+        temp_dir = self.root / "tmp"
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        handle, temp_path = tempfile.mkstemp(dir=temp_dir)
+        try:
+            with os.fdopen(handle, "wb") as file:
+                for chunk in chunks:
+                    file.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                file.flush()
+                os.fsync(file.fileno())
+
+            digest = digest.hexdigest()
+            path = self.path(digest)
+            if path.is_file():
+                os.remove(temp_path)
+                return digest, size, False
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return digest, size, True
+
+    # Method to add a waiver held in memory
+    def put_bytes(self, data):
+        return self.put([data])
+
+    # Method to open a waiver for reading as a read-only memoryview of the file; the view
+    # (and any slice of it) can only be used inside the with block
+    @contextmanager
+    def open(self, digest):
+        path = self.path(digest)
+        if not path.is_file():
+            raise LookupError(f"waiver {digest} is not in the store at {self.root}")
+        with open(path, "rb") as file:
+            # mmap can't map an empty file
+            if os.fstat(file.fileno()).st_size == 0:
+                yield memoryview(b"")
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    yield view
+                finally:
+                    view.release()
+
+    # Method to yield a waiver a chunk at a time
+    def chunks(self, digest, chunk_size=1024 * 1024):
+        with self.open(digest) as view:
+            for start in range(0, len(view), chunk_size):
+                yield bytes(view[start:start + chunk_size])
+
+    # Method to check that a stored waiver still matches its hash
+    def verify(self, digest):
+        with self.open(digest) as view:
+            return hashlib.sha256(view).hexdigest() == digest
+
+
+# The store named in .env_outland, made the first time it's asked for
+_default_store = None
+
+
+# Function to get the store named in .env_outland (see shared_db.config.waiver_store_setting)
+def default_store():
+    global _default_store
+    if _default_store is None:
+        _default_store = WaiverStore(waiver_store_setting(".env_outland"))
+    return _default_store
@@ -0,0 +1,105 @@
+"""
+Outland Adventures table browser: trip member waivers
+
+A signed waiver is either stored in trip_member.waiver, where it can be up
+to 16 MB, or moved out to the waiver store (see waiver_store.py). Either
+way its SHA-256 hash and size are in waiver_hash and waiver_size, which
+triggers fill in whenever a waiver is written. Lists of trip members never
+select the waiver itself, only those columns (WAIVER_SUMMARY_COLUMNS), so
+MySQL doesn't have to read any of the waiver to list them.
+
+A waiver is only read when someone asks for it, and written to a file a
+chunk at a time: from the waiver store if it has been moved there,
+otherwise from MySQL with a SUBSTRING of the waiver per chunk, so only one
+chunk of it is ever in memory.
+"""
+
+import contextlib
+import hashlib
+import os
+import tempfile
+import webbrowser
+from pathlib import Path
+
+from waiver_store import default_store
+
+# Columns to select in place of the waiver itself: its size in bytes and its SHA-256 hash
+WAIVER_SUMMARY_COLUMNS = ("waiver_size", "waiver_hash")
+
+# Bytes of the waiver written to the file at a time
+CHUNK_SIZE = 1024 * 1024
+
+# Statements to read a waiver; kept as constants so a PreparedCursor prepares each once.
+# waiver IS NULL is answered without reading the waiver.
+WAIVER_LOOKUP_SQL = ("SELECT waiver_hash, waiver IS NULL, COALESCE(waiver_size, OCTET_LENGTH(waiver))"
+                     " FROM trip_member WHERE id = %s")
+WAIVER_CHUNK_SQL = "SELECT SUBSTRING(waiver, %s, %s) FROM trip_member WHERE id = %s"
+
+# File types waivers are signed in, recognized by how the file starts
+FILE_TYPES = ((b"%PDF", ".pdf"), (b"\x89PNG", ".png"), (b"\xff\xd8\xff", ".jpg"))
+
+
+# Function to give a saved waiver the file extension of its type (guessed from its
+# first bytes); returns the new path
+def add_waiver_extension(path):
+    with open(path, "rb") as file:
+        first_bytes = file.read(8)
+    extension = next((extension for magic, extension in FILE_TYPES if first_bytes.startswith(magic)), ".bin")
+    os.replace(path, path + extension)
+    return path + extension
+
+
+# Function to yield a trip member's waiver a chunk at a time, from the waiver store
+# (the one in .env_outland if not given) once it's been moved there; raises
+# LookupError if there's no trip member with that id, or if the trip member or their
+# waiver goes away part way through
+def waiver_chunks(cursor, member_id, chunk_size=CHUNK_SIZE, store=None):
+    cursor.execute(WAIVER_LOOKUP_SQL, (member_id,))
+    rows = cursor.fetchall()
+    if not rows:
+        raise LookupError(f"there is no trip member with id {member_id}")
+    digest, moved, size = rows[0]
+    if moved:
+        yield from (store or default_store()).chunks(digest, chunk_size)
+        return
+
+    # SUBSTRING counts from 1
+    for start in range(1, size + 1, chunk_size):
+        cursor.execute(WAIVER_CHUNK_SQL, (start, chunk_size, member_id))
+        rows = cursor.fetchall()
+        if not rows or rows[0][0] is None:
+            raise LookupError(f"the waiver of trip member {member_id} was removed while it was being read")
+        yield rows[0][0]
+
+
+# Function to write a trip member's waiver to a file, chunk by chunk; returns the size
+# and SHA-256 hash of what was written, to check against the summary columns
+def save_waiver(cursor, member_id, path, chunk_size=CHUNK_SIZE, store=None):
+    size = 0
+    digest = hashlib.sha256()
+    with open(path, "wb") as file:
+        try:
+            for chunk in waiver_chunks(cursor, member_id, chunk_size, store):
+                file.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        except Exception:
+            # Don't leave a partial waiver behind
+            file.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            raise
+    return size, digest.hexdigest()
+
+
+# Function to save a trip member's waiver to a temporary file and open it in the
+# computer's default viewer; returns the file's path, size and hash
+def view_waiver(cursor, member_id, chunk_size=CHUNK_SIZE, store=None):
+
+    # The file type isn't known until the first chunk is in, so it's renamed once written
+    handle, path = tempfile.mkstemp(prefix=f"waiver_{member_id}_")
+    os.close(handle)
+    size, digest = save_waiver(cursor, member_id, path, chunk_size, store)
+    path = add_waiver_extension(path)
+    webbrowser.open(Path(path).as_uri())
+    return path, size, digest
@@ -0,0 +1,293 @@
+"""
+Outland Adventures report generator: report pipeline benchmark
+
+Measures how the report data pipelines hold up as the data grows. For each
+scale factor the outland schema (tables and rollup triggers from
+db_init_2025.sql, without the sample rows) is created in a scratch database,
+filled by data_generator.py through bulk_loader.py, and then every pipeline is
+run headlessly a few times, recording the median of:
+
+    wall_ms       time to run the pipeline
+    round_trips   statements sent to MySQL
+    rows_fetched  rows read back from MySQL
+    peak_kib      peak Python memory while it ran (tracemalloc)
+
+Results are saved as JSON, and compared against an earlier run with
+--baseline; exits with 1 if anything regressed.
+
+    python bench_reports.py --scales 1 10 100 --save reports.json
+    python bench_reports.py --scales 1 10 100 --baseline reports.json
+
+By default the scratch database (outland_bench) is created on the server in
+.env_outland, which needs a user allowed to create it. --mysqld starts a
+throwaway server from the given mysqld binary instead and removes it after.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import mysql.connector
+
+# shared_db is in the parent folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+from shared_db import load_config, get_connection, PreparedCursor
+
+from bulk_loader import BulkLoader
+from data_generator import generate, DATA_START, DATA_END
+from report_queries import equipment_report_data, trip_report_data, inventory_report_data
+from time_buckets import generate_template
+
+working_dir = os.path.dirname(os.path.realpath(__file__))
+SCHEMA_SCRIPT = os.path.join(working_dir, "db_init_2025.sql")
+
+# Statements in db_init_2025.sql the benchmark leaves out: setting up the database and
+# its user (the scratch database is made separately) and the sample data
+SKIPPED_STATEMENTS = re.compile(r"^(CREATE DATABASE|USE|DROP USER|CREATE USER|GRANT|INSERT)\b", re.IGNORECASE)
+
+# Pipelines to time: name -> function called with a cursor
+PIPELINES = {
+    "equipment": lambda cursor: equipment_report_data(cursor),
+    "equipment_live": lambda cursor: equipment_report_data(cursor, use_rollups=False),
+    "trip": lambda cursor: trip_report_data(cursor),
+    "trip_live": lambda cursor: trip_report_data(cursor, use_rollups=False),
+    "inventory": lambda cursor: inventory_report_data(cursor),
+    "quarter_template": lambda cursor: generate_template(DATA_START, DATA_END, "quarter"),
+}
+
+
+# Function to split a .sql script into statements the way the mysql client does,
+# including DELIMITER blocks (used for the triggers)
+def read_sql_script(path):
+    with open(path, encoding="utf-8") as file:
+        text = file.read()
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.DOTALL) # block comments
+
+    statements = []
+    delimiter = ";"
+    current = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.upper().startswith("DELIMITER "):
+            delimiter = stripped.split(None, 1)[1]
+            continue
+
+        # -- comments run to the end of the line (MySQL needs a space or the line end after --)
+        line = re.sub(r"--(\s.*)?$", "", line)
+        current.append(line)
+        statement = "\n".join(current).strip()
+        if statement.endswith(delimiter):
+            statement = statement[:-len(delimiter)].strip()
+            if statement:
+                statements.append(statement)
+            current = []
+    return statements
+
+
+# Function to start a throwaway MySQL server; returns the process, its folder and connection settings
+def start_mysqld(mysqld):
+    base = tempfile.mkdtemp(prefix="outland-bench-")
+    datadir = os.path.join(base, "data")
+    common = [mysqld, "--no-defaults", f"--datadir={datadir}"]
+    subprocess.run(common + ["--initialize-insecure"], check=True, capture_output=True)
+
+    # Pick a free port, then wait for the server to take connections
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen(common + [f"--port={port}", "--bind-address=127.0.0.1", "--mysqlx=OFF",
+                                         f"--socket={os.path.join(base, 'mysqld.sock')}",
+                                         f"--log-error={os.path.join(base, 'error.log')}", "--local-infile=ON"])
+    overrides = {"host": "127.0.0.1", "port": port, "user": "root", "password": ""}
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            mysql.connector.connect(**overrides).close()
+            return process, base, overrides
+        except mysql.connector.Error:
+            if time.monotonic() > deadline or process.poll() is not None:
+                stop_mysqld(process, base)
+                raise RuntimeError(f"mysqld did not start; see {os.path.join(base, 'error.log')}")
+            time.sleep(0.5)
+
+
+# Function to stop a server started by start_mysqld and delete its files
+def stop_mysqld(process, base):
+    process.terminate()
+    try:
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        process.kill()
+    shutil.rmtree(base, ignore_errors=True)
+
+
+# Function to (re)create the schema in the scratch database and load one scale's worth of data
+def load_scale(overrides, scale, seed, batch_size):
+
+    # Make the scratch database from a connection that isn't using one yet
+    # (DROP TABLE IF EXISTS and friends leave notes, so warnings can't be errors here)
+    server = load_config(".env_outland", **overrides)
+    database = server.pop("database")
+    server["raise_on_warnings"] = False
+    connection = mysql.connector.connect(**server)
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+        cursor.execute(f"USE {database}")
+        for statement in read_sql_script(SCHEMA_SCRIPT):
+            if not SKIPPED_STATEMENTS.match(statement):
+                cursor.execute(statement)
+        cursor.close()
+
+        # Load the generated data, then refresh the index statistics so plans are stable
+        loader = BulkLoader(connection, batch_size)
+        loader.load_chunks(generate(scale, seed, batch_size))
+        cursor = connection.cursor()
+        cursor.execute("ANALYZE TABLE customer, trip, orders, order_item, rental, rental_inventory, "
+                       "rental_history, order_quarter_rollup, rental_quarter_rollup, trip_quarter_rollup")
+        cursor.fetchall()
+        cursor.close()
+    finally:
+        connection.close()
+    return {"rows": sum(loader.rows.values()), "rows_per_second": round(loader.rows_per_second())}
+
+
+# Class wrapping a cursor to count the statements sent and rows read back
+class CountingCursor:
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.round_trips = 0
+        self.rows_fetched = 0
+
+    def execute(self, operation, params=()):
+        self.round_trips += 1
+        self.cursor.execute(operation, params)
+        return self
+
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        self.rows_fetched += row is not None
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self.cursor.fetchmany(size)
+        self.rows_fetched += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self.cursor.fetchall()
+        self.rows_fetched += len(rows)
+        return rows
+
+
+# Function to run one pipeline once and measure it
+def measure(pipeline, cursor):
+    counting = CountingCursor(cursor)
+    tracemalloc.start()
+    started = time.perf_counter()
+    pipeline(counting)
+    wall_ms = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"wall_ms": wall_ms, "round_trips": counting.round_trips,
+            "rows_fetched": counting.rows_fetched, "peak_kib": peak / 1024}
+
+
+# Function to run every pipeline several times on a loaded database and keep the medians
+def bench_scale(overrides, runs):
+    results = {}
+    db = get_connection(".env_outland", pool_size=1, autocommit=True, **overrides)
+    cursor = PreparedCursor(db)
+    try:
+        for name, pipeline in PIPELINES.items():
+
+            # One untimed run first so every pipeline starts with its statements prepared
+            pipeline(cursor)
+            samples = [measure(pipeline, cursor) for run in range(runs)]
+            results[name] = {key: round(statistics.median(sample[key] for sample in samples), 2)
+                             for key in samples[0]}
+    finally:
+        cursor.close()
+        db.close()
+    return results
+
+
+# Function to compare results with a baseline; returns a list of regressions
+def compare(results, baseline, tolerance):
+    problems = []
+    for scale, pipelines in results["scales"].items():
+        for name, current in pipelines.items():
+            before = baseline.get("scales", {}).get(scale, {}).get(name)
+            if before is None:
+                continue
+            label = f"scale {scale} {name}"
+            for key in ("wall_ms", "peak_kib"):
+                if current[key] > before[key] * (1 + tolerance) and current[key] - before[key] > 1:
+                    problems.append(f"{label}: {key} regressed: {current[key]:.1f} vs baseline {before[key]:.1f}")
+            if current["round_trips"] > before["round_trips"]:
+                problems.append(f"{label}: round_trips went up: {current['round_trips']} vs baseline {before['round_trips']}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the report pipelines at several data scales.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100],
+                        help="scale factors to load and test (default: 1 10 100)")
+    parser.add_argument("--seed", type=int, default=0, help="data generator seed (default: 0)")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per pipeline (default: 5)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per load transaction (default: 5000)")
+    parser.add_argument("--database", default="outland_bench", help="scratch database to use (default: outland_bench)")
+    parser.add_argument("--mysqld", help="start a throwaway server from this mysqld binary instead")
+    parser.add_argument("--baseline", help="JSON results from an earlier --save to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown/memory growth against the baseline, as a fraction (default: 0.25)")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    server = None
+    overrides = {}
+    if args.mysqld:
+        process, base, overrides = start_mysqld(args.mysqld)
+        server = (process, base)
+    overrides["database"] = args.database
+
+    results = {"seed": args.seed, "runs": args.runs, "load": {}, "scales": {}}
+    try:
+        for scale in args.scales:
+            key = f"{scale:g}"
+            print(f"scale {key}: loading...")
+            results["load"][key] = load_scale(overrides, scale, args.seed, args.batch_size)
+            print(f"  {results['load'][key]['rows']} rows at {results['load'][key]['rows_per_second']:,} rows/s")
+            results["scales"][key] = bench_scale(overrides, args.runs)
+            for name, result in results["scales"][key].items():
+                print(f"  {name}: {result['wall_ms']:.1f} ms, {result['round_trips']:g} round trips, "
+                      f"{result['rows_fetched']:g} rows, {result['peak_kib']:.0f} KiB peak")
+    finally:
+        if server is not None:
+            stop_mysqld(*server)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    problems = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            problems = compare(results, json.load(file), args.tolerance)
+    for problem in problems:
+        print("FAIL: " + problem)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
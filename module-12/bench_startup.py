@@ -0,0 +1,112 @@
+"""
+Outland Adventures report generator: startup benchmark
+
+Guards the report app's cold start. Each run launches outdoor_adventure_reports.py
+in a fresh interpreter with OUTLAND_STARTUP_BENCH set, which makes the app print
+how long its window took to appear (and which slow modules were loaded by then)
+and close itself. The import time of the app's startup modules is measured the
+same way. Exits with 1 if the medians break the limits or regress against a
+saved baseline.
+
+    python bench_startup.py --runs 5 --save startup.json
+    python bench_startup.py --baseline startup.json
+
+The window needs a display; on a headless machine run it under xvfb-run.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+working_dir = os.path.dirname(os.path.realpath(__file__))
+APP = os.path.join(working_dir, "outdoor_adventure_reports.py")
+
+# Modules the app imports before showing its window
+STARTUP_IMPORTS = "tkinter, shared_db, report_queries, report_cache, report_worker, report_grid"
+
+# Modules that must not be loaded before the window appears
+HEAVY_MODULES = ("numpy", "matplotlib", "mysql.connector")
+
+
+# Function to time importing the startup modules in a fresh interpreter
+def time_imports():
+    code = ("import time; started = time.perf_counter(); "
+            f"import {STARTUP_IMPORTS}; "
+            "print((time.perf_counter() - started) * 1000)")
+    env = dict(os.environ, PYTHONPATH=os.path.join(working_dir, "..")) # shared_db is in the parent folder
+    output = subprocess.run([sys.executable, "-c", code], cwd=working_dir, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.strip())
+
+
+# Function to launch the app once and read back its time to first window
+def time_first_window():
+    env = dict(os.environ, OUTLAND_STARTUP_BENCH="1")
+    result = subprocess.run([sys.executable, APP], cwd=working_dir, env=env,
+                            capture_output=True, text=True, timeout=60)
+    for line in result.stdout.splitlines():
+        if line.startswith("first_window_ms="):
+            fields = dict(field.split("=", 1) for field in line.split())
+            loaded = [name for name in fields["loaded"].split(",") if name]
+            return float(fields["first_window_ms"]), loaded
+    raise RuntimeError("The app did not report its startup time:\n" + result.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the report app's startup.")
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to time (default: 5)")
+    parser.add_argument("--max-window-ms", type=float, default=1500,
+                        help="fail if the median time to first window is above this (default: 1500)")
+    parser.add_argument("--baseline", help="JSON results from an earlier --save to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline, as a fraction (default: 0.25)")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    import_times = []
+    window_times = []
+    loaded_early = set()
+    for run in range(args.runs):
+        import_times.append(time_imports())
+        window_ms, loaded = time_first_window()
+        window_times.append(window_ms)
+        loaded_early.update(loaded)
+
+    results = {
+        "import_ms": statistics.median(import_times),
+        "first_window_ms": statistics.median(window_times),
+        "loaded_before_window": sorted(loaded_early),
+        "runs": args.runs,
+    }
+    print(f"startup imports: {results['import_ms']:.1f} ms (median of {args.runs})")
+    print(f"time to first window: {results['first_window_ms']:.1f} ms (median of {args.runs})")
+
+    # Check the limits
+    problems = []
+    heavy = [name for name in loaded_early if name in HEAVY_MODULES]
+    if heavy:
+        problems.append(f"loaded before the window appeared: {', '.join(sorted(heavy))}")
+    if results["first_window_ms"] > args.max_window_ms:
+        problems.append(f"time to first window is over {args.max_window_ms:.0f} ms")
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        for key in ("import_ms", "first_window_ms"):
+            limit = baseline[key] * (1 + args.tolerance)
+            if results[key] > limit:
+                problems.append(f"{key} regressed: {results[key]:.1f} ms vs baseline {baseline[key]:.1f} ms")
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    for problem in problems:
+        print("FAIL: " + problem)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+Outland Adventures test data: bulk loader
+
+Loads orders with their items, rentals with their history and trips with
+their members many rows per statement instead of one INSERT (plus lookups)
+per row like db_init_2025.sql. Each batch runs in its own transaction:
+
+  1. the parent and child tables are locked (LOCK TABLES ... WRITE), so no
+     other session can add rows to them until the batch is done
+  2. the parents are inserted as one multi-row INSERT (executemany) or LOAD
+     DATA LOCAL INFILE, letting AUTO_INCREMENT number them, and the new ids
+     read back in one SELECT (nobody else can have added any meanwhile)
+  3. the children are inserted pointing at those ids, the batch is committed
+     and the tables unlocked
+
+The loader's connection doesn't turn warnings into errors the way the other
+scripts' connections do: a LOAD DATA or multi-row INSERT can leave harmless
+notes (a value truncated or converted). They're read with SHOW WARNINGS
+instead, kept in BulkLoader.warnings and reported at the end.
+
+It also loads the output of data_generator.py, numbering the generated rows
+after whatever is already in the database. Generated product codes include
+the seed, so load each seed into a database once.
+
+    python bulk_loader.py --scale 100 --seed 7 --batch-size 5000
+    python bulk_loader.py --scale 100 --load-data   # needs local_infile=ON on the server
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+# shared_db is in the parent folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+from shared_db import get_connection
+
+from data_generator import TABLE_COLUMNS, ID_TABLES, generate
+
+# Columns the caller supplies for each kind of record (ids are filled in by the loader)
+ORDER_COLUMNS = ("order_date", "cust_id", "ship_street", "ship_city", "ship_state", "ship_zip")
+ORDER_ITEM_COLUMNS = ("product_code", "product_condition", "quantity", "ship_tracking")
+RENTAL_COLUMNS = ("rental_date", "cust_id", "start_date", "end_date")
+RENTAL_HISTORY_COLUMNS = ("item_id", "issue_condition", "return_condition")
+TRIP_COLUMNS = ("destination", "trip_start", "trip_end", "staff_id", "cust_primary")
+TRIP_MEMBER_COLUMNS = ("first_name", "last_name", "date_of_birth", "reservations", "waiver", "email",
+                       "phone_number", "cust_id", "passport_status", "emergency_number",
+                       "emergency_name", "emergency_relation")
+
+# Primary key column of each table with an AUTO_INCREMENT id
+ID_COLUMNS = {table: TABLE_COLUMNS[table][0] for table in ID_TABLES}
+
+# Warnings kept in BulkLoader.warnings; the rest are only counted
+MAX_WARNINGS = 100
+
+
+# Function to turn a value into a field of a LOAD DATA file in its default format:
+# tab separated, backslash escapes and \N for NULL. Binary values are written as
+# hex and turned back into bytes by the LOAD DATA statement (see load_data_sql).
+def load_data_field(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+# Function to build a LOAD DATA statement for a table and its columns
+def load_data_sql(table, columns, binary_columns):
+
+    # Binary columns are read into user variables and unhexed on the way in
+    targets = [f"@{column}" if column in binary_columns else column for column in columns]
+    sql = f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} ({', '.join(targets)})"
+    if binary_columns:
+        sql += " SET " + ", ".join(f"{column} = UNHEX(@{column})" for column in binary_columns)
+    return sql
+
+
+# Class to bulk load records, a batch per transaction, keeping count of what went in
+class BulkLoader:
+
+    def __init__(self, connection, batch_size=1000, use_load_data=False):
+        # use_load_data needs a connection opened with allow_local_infile=True and a
+        # server with local_infile=ON; otherwise multi-row INSERTs are used
+        self.connection = connection
+        self.batch_size = batch_size
+        self.use_load_data = use_load_data
+        self.rows = {}        # table -> rows loaded
+        self.seconds = 0.0    # time spent loading
+        self.round_trips = 0  # statements sent
+        self.warnings = []    # (level, code, message) of the first MAX_WARNINGS warnings
+        self.warning_count = 0 # warnings in all
+
+    # Method to load orders; each record is ORDER_COLUMNS values followed by a list of
+    # ORDER_ITEM_COLUMNS tuples. Returns the new order ids in the same order.
+    def load_orders(self, records):
+        return self._load_families("orders", ORDER_COLUMNS, "order_item", "order_id", ORDER_ITEM_COLUMNS, records)
+
+    # Method to load rentals; each record is RENTAL_COLUMNS values followed by a list of
+    # RENTAL_HISTORY_COLUMNS tuples. Returns the new rental ids.
+    def load_rentals(self, records):
+        return self._load_families("rental", RENTAL_COLUMNS, "rental_history", "rental_id",
+                                   RENTAL_HISTORY_COLUMNS, records)
+
+    # Method to load trips; each record is TRIP_COLUMNS values followed by a list of
+    # TRIP_MEMBER_COLUMNS tuples. Returns the new trip ids.
+    def load_trips(self, records):
+        return self._load_families("trip", TRIP_COLUMNS, "trip_member", "trip_id", TRIP_MEMBER_COLUMNS, records)
+
+    # Method to load parent records along with their child rows, batch_size parents per transaction
+    def _load_families(self, table, columns, child_table, child_key, child_columns, records):
+        new_ids = []
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                new_ids.extend(self._load_family_batch(table, columns, child_table, child_key, child_columns, batch))
+                batch = []
+        if batch:
+            new_ids.extend(self._load_family_batch(table, columns, child_table, child_key, child_columns, batch))
+        return new_ids
+
+    # Method to load one batch of parents and children in one transaction
+    def _load_family_batch(self, table, columns, child_table, child_key, child_columns, batch):
+        started = time.perf_counter()
+        key = ID_COLUMNS[table]
+        cursor = self.connection.cursor()
+
+        # LOCK TABLES ends any open transaction, so the batch's transaction is the one that
+        # autocommit=False starts with the first statement after it (the usual way to use the two)
+        autocommit = self.connection.autocommit
+        self.connection.autocommit = False
+        cursor.execute(f"LOCK TABLES {table} WRITE, {child_table} WRITE")
+        self.round_trips += 1
+        try:
+            cursor.execute(f"SELECT COALESCE(MAX({key}), 0) FROM {table}")
+            last_id = cursor.fetchall()[0][0]
+
+            # The table is locked, so every id above the old highest one is one of this batch's,
+            # in the order the rows were sent
+            self._insert(cursor, table, columns, [record[:-1] for record in batch])
+            cursor.execute(f"SELECT {key} FROM {table} WHERE {key} > %s ORDER BY {key}", (last_id,))
+            new_ids = [row[0] for row in cursor.fetchall()]
+            self.round_trips += 2
+
+            children = [[parent_id] + list(child)
+                        for parent_id, record in zip(new_ids, batch) for child in record[-1]]
+            self._insert(cursor, child_table, (child_key,) + child_columns, children)
+            self.connection.commit()
+            self.round_trips += 1
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.execute("UNLOCK TABLES")
+            self.round_trips += 1
+            cursor.close()
+            self.connection.autocommit = autocommit
+            self.seconds += time.perf_counter() - started
+        return new_ids
+
+    # Method to load rows that already have their ids, e.g. from data_generator.generate();
+    # chunks are (table, columns, rows) and are committed every batch_size rows or so
+    def load_chunks(self, chunks):
+        cursor = self.connection.cursor()
+        pending = 0
+        self.connection.start_transaction()
+        try:
+            for table, columns, rows in chunks:
+                started = time.perf_counter()
+                self._insert(cursor, table, columns, rows)
+                pending += len(rows)
+                if pending >= self.batch_size:
+                    self.connection.commit()
+                    self.round_trips += 1
+                    self.connection.start_transaction()
+                    pending = 0
+                self.seconds += time.perf_counter() - started
+            started = time.perf_counter()
+            self.connection.commit()
+            self.round_trips += 1
+            self.seconds += time.perf_counter() - started
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    # Method to insert rows into a table in as few statements as possible
+    def _insert(self, cursor, table, columns, rows):
+        if not rows:
+            return
+        if self.use_load_data:
+            self._load_data(cursor, table, columns, rows)
+        else:
+            # mysql.connector turns executemany of an INSERT ... VALUES into multi-row INSERTs,
+            # so this is one round trip (or a few, for very large batches) instead of one per row
+            placeholders = ", ".join(["%s"] * len(columns))
+            cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+            self.round_trips += 1
+            self._check_warnings(cursor)
+        self.rows[table] = self.rows.get(table, 0) + len(rows)
+
+    # Method to read the warnings the last statement left, if it left any
+    def _check_warnings(self, cursor):
+        if not cursor.warning_count:
+            return
+        cursor.execute("SHOW WARNINGS")
+        warnings = cursor.fetchall()
+        self.round_trips += 1
+        self.warning_count += len(warnings)
+        self.warnings.extend(warnings[:MAX_WARNINGS - len(self.warnings)])
+
+    # Method to insert rows by writing them to a temporary file and LOAD DATA-ing it
+    def _load_data(self, cursor, table, columns, rows):
+        binary_columns = [column for column, value in zip(columns, rows[0]) if isinstance(value, (bytes, bytearray))]
+        with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False, encoding="utf-8", newline="\n") as file:
+            for row in rows:
+                file.write("\t".join(load_data_field(value) for value in row) + "\n")
+        try:
+            cursor.execute(load_data_sql(table, columns, binary_columns), (file.name,))
+            self.round_trips += 1
+            self._check_warnings(cursor)
+        finally:
+            os.remove(file.name)
+
+    # Method to get the overall load rate in rows per second
+    def rows_per_second(self):
+        return sum(self.rows.values()) / self.seconds if self.seconds else 0.0
+
+
+# Function to get the first free id of each table, for generating data to add after what's there
+def next_ids(cursor):
+    columns = [f"(SELECT COALESCE(MAX({key}), 0) + 1 FROM {table})" for table, key in ID_COLUMNS.items()]
+    cursor.execute("SELECT " + ", ".join(columns))
+    return dict(zip(ID_COLUMNS, cursor.fetchall()[0]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Outland Adventures data and bulk load it.")
+    parser.add_argument("--scale", type=float, default=1, help="scale factor; 1 is about the sample data (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per transaction (default: 5000)")
+    parser.add_argument("--load-data", action="store_true", help="use LOAD DATA LOCAL INFILE instead of INSERTs")
+    args = parser.parse_args(argv)
+
+    # Warnings are checked by the loader rather than raised (see the top of this file)
+    with_infile = {"allow_local_infile": True} if args.load_data else {}
+    db = get_connection(".env_outland", pool_size=1, raise_on_warnings=False, **with_infile)
+    try:
+        cursor = db.cursor()
+        start_ids = next_ids(cursor)
+        cursor.close()
+
+        # Chunks are sized to the batches so each commit covers about one chunk
+        loader = BulkLoader(db, args.batch_size, args.load_data)
+        loader.load_chunks(generate(args.scale, args.seed, args.batch_size, start_ids))
+    finally:
+        db.close()
+
+    for table, count in loader.rows.items():
+        print(f"{table}: {count} rows")
+    total = sum(loader.rows.values())
+    print(f"{total} rows in {loader.seconds:.2f}s ({loader.rows_per_second():,.0f} rows/s, "
+          f"{loader.round_trips} round trips)")
+    if loader.warning_count:
+        print(f"{loader.warning_count} warnings, e.g.:")
+        for level, code, message in loader.warnings[:10]:
+            print(f"  {level} {code}: {message}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
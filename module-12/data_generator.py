@@ -0,0 +1,393 @@
+"""
+Outland Adventures test data: synthetic data generator
+
+Produces the outland dataset at any scale factor, for trying the reports
+against realistic amounts of data. scale=1 is about the size of the sample
+data in db_init_2025.sql; customers, trips, orders, rentals and inventory grow
+linearly with the scale, staff and the product catalogue with its square root.
+
+Output is deterministic: the same scale and seed always give the same rows.
+Rows come out of generate() in chunks, parents before children, with their
+ids filled in, so every foreign key (and check_cust_id on trip_member) holds
+as long as the chunks are inserted in the order they arrive. Only counts and
+a few small lists are kept in memory, so millions of rows stream through in
+constant memory.
+
+    python data_generator.py --scale 100 --seed 7
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+# Columns of each generated table, in the order rows list their values
+TABLE_COLUMNS = {
+    "customer": ("cust_id", "first_name", "last_name", "phone_number", "addr_street",
+                 "addr_city", "addr_state", "addr_zip", "email"),
+    "staff": ("staff_id", "first_name", "last_name", "nick_name", "phone_number", "addr_street",
+              "addr_city", "addr_state", "addr_zip", "email", "staff_role"),
+    "guide_req": ("req_id", "name", "description", "valid_months", "governing_org"),
+    "guide_req_tracker": ("id", "complete_date", "status", "req_id", "staff_id"),
+    "order_inventory": ("product_code", "product_condition", "name", "unit_price",
+                        "stock", "weight", "dimensions", "description"),
+    "trip": ("trip_id", "destination", "trip_start", "trip_end", "staff_id", "cust_primary"),
+    "trip_member": ("id", "trip_id", "first_name", "last_name", "date_of_birth", "reservations",
+                    "waiver", "email", "phone_number", "cust_id", "passport_status",
+                    "emergency_number", "emergency_name", "emergency_relation"),
+    "orders": ("order_id", "order_date", "cust_id", "ship_street", "ship_city", "ship_state", "ship_zip"),
+    "order_item": ("id", "product_code", "product_condition", "quantity", "ship_tracking", "order_id"),
+    "rental": ("rental_id", "rental_date", "cust_id", "start_date", "end_date"),
+    "rental_inventory": ("item_id", "initial_use", "rate", "product_condition", "product_code", "rental_id"),
+    "rental_history": ("id", "item_id", "rental_id", "issue_condition", "return_condition"),
+}
+
+# Tables whose first column is an AUTO_INCREMENT id
+ID_TABLES = [table for table in TABLE_COLUMNS if table != "order_inventory"]
+
+# Row counts at scale=1, roughly the sample data in db_init_2025.sql
+BASE_COUNTS = {"customer": 15, "staff": 9, "products": 6, "trip": 25, "orders": 15, "rental": 20,
+               "rental_inventory": 16}
+
+# Dates are spread over this range; rentals still running on DATA_END are "out"
+DATA_START = date(2010, 1, 1)
+DATA_END = date(2025, 12, 31)
+
+# Trip destinations by continent/major continental area (destination strings end in the
+# continent, see the trip table), and roughly how often Outland runs trips to each
+DESTINATIONS = {
+    "Africa": ["Victoria Falls, Zimbabwe", "Serengeti National Park, Tanzania", "Mount Kilimanjaro, Tanzania",
+               "Sahara Desert, Morocco", "Kruger National Park, South Africa", "Namib Desert, Namibia"],
+    "Asia": ["Mount Everest, Nepal", "Mount Fuji, Japan", "Kenting National Park, Taiwan",
+             "Bromo Tengger Semeru National Park, Indonesia", "Ha Long Bay, Vietnam"],
+    "Southern Europe": ["Alps, Switzerland", "Azores, Portugal", "Costa Brava, Spain",
+                        "Olympus Mountain, Greece", "Pyrenees, France/Spain", "Dolomites, Italy"],
+    "South America": ["Torres del Paine, Chile", "Machu Picchu, Peru", "Patagonia, Argentina",
+                      "Galapagos Islands, Ecuador"],
+    "North America": ["Banff National Park, Canada", "Grand Canyon, United States", "Denali, United States",
+                      "Copper Canyon, Mexico"],
+    "Oceania": ["Milford Track, New Zealand", "Uluru, Australia", "Tasmanian Wilderness, Australia"],
+}
+CONTINENT_WEIGHTS = {"Africa": 30, "Asia": 20, "Southern Europe": 24, "South America": 11,
+                     "North America": 10, "Oceania": 5}
+
+# The guide requirements every guide works through (same as the sample data)
+GUIDE_REQS = [
+    ("CPR", "Guides need to be able to perform CPR in the event of an emergency.", 24,
+     "https://www.redcross.org"),
+    ("Wilderness First Aid", "Guides need to be able to treat anything from scratches to illness.", 12,
+     "https://www.redcross.org"),
+    ("Leave No Trace Awareness", "Understanding the importance of protecting nature by leaving no trace", 24,
+     "https://lnt.org/get-involved/training-courses/"),
+    ("Wilderness Fire Safety", "Only you can prevent forest fires.", 4,
+     "https://www.fs.usda.gov/managing-land/fire/training"),
+    ("WFA Certificate", "Guides need a basic understanding of reading maps, field training etc", 24,
+     "Wilderness Guide Association"),
+    ("WGA Training", "Physically be able to withstand the job", 48, "Wilderness Guide Association"),
+]
+
+# Name and address pools for people
+FIRST_NAMES = ["John", "Sally", "Khloe", "Matthew", "Tyson", "Sandra", "Emma", "James", "Olivia", "Liam",
+               "Isabella", "Lucas", "Charlotte", "Sophia", "Ethan", "Melanie", "Nathan", "Jennifer",
+               "Amanda", "David", "Rebecca", "Morgan", "Mei", "Anita", "Karen", "Dimitrios"]
+LAST_NAMES = ["Doe", "Ride", "Arson", "Lanes", "Conners", "Griffin", "Smith", "Harmon", "Williams",
+              "Johnson", "Brown", "Garcia", "Miller", "Davis", "Lopez", "Wilson", "Wong", "Allison"]
+STREETS = ["West Adventure Terrace", "Slip St", "Huntings St", "Washington Rd", "Georges Ave",
+           "Chipper Ave", "Oliver Dr", "Wandering Rd", "Douglas St", "Saddle Ln", "Falcon Terr"]
+CITIES = [("Denver", "CO", 80014), ("Aurora", "CO", 80013), ("Boulder", "CO", 80301),
+          ("Palatine", "IL", 60067), ("Salt Lake City", "UT", 84101), ("Santa Fe", "NM", 87501)]
+STAFF_ROLES = ["Owner", "Owner", "Guide", "Guide", "Marketing", "Inventory Manager", "Web Admin",
+               "Apprentence", "Accountant"]
+RELATIONS = ["mother", "father", "sister", "brother", "husband", "wife", "friend", "partner"]
+AIRLINES = ["American Airlines", "Delta Airlines", "United Airlines", "British Airways", "Lufthansa"]
+
+# Product catalogue pieces; each product comes in one to three conditions
+PRODUCT_KINDS = [("Pack", 4, "29 x 13 x 12 in", 239.95), ("Walking Stick", 9, "49 x 5 x 12 in", 75.65),
+                 ("Tent", 31, "14 x 10 x 23 in", 196.78), ("Lantern", 2, "6 x 5 x 13 in", 99.99),
+                 ("Sleeping Bag", 3, "16 x 9 x 9 in", 129.50), ("Stove", 2, "7 x 7 x 5 in", 64.95)]
+PRODUCT_CONDITIONS = ["new", "used-good", "used-fair"]
+PRODUCT_PRICE_FACTOR = {"new": 1.0, "used-good": 0.75, "used-fair": 0.55}
+RENTAL_CONDITIONS = ["new", "good", "fair"]
+
+
+# Function to work out how many rows of each kind to generate for a scale factor
+def scaled_counts(scale):
+    counts = {}
+    for kind, base in BASE_COUNTS.items():
+
+        # Staff and the product catalogue don't grow with the number of customers nearly as fast
+        factor = math.sqrt(scale) if kind in ("staff", "products") else scale
+        counts[kind] = max(1, round(base * factor))
+    counts["staff"] = max(counts["staff"], len(STAFF_ROLES)) # always at least one of each role
+    return counts
+
+
+# Function to get the date that's fraction (0-1) of the way through the data's date range
+def spread_date(fraction):
+    return DATA_START + timedelta(days=int(fraction * (DATA_END - DATA_START).days))
+
+
+# Function to make up a phone number in 555-555-5555 format
+def phone(rng):
+    return f"{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(0, 9999):04d}"
+
+
+# Function to make up a street address, city, state and zip
+def address(rng):
+    city, state, zip_code = rng.choice(CITIES)
+    return f"{rng.randint(1, 9999)} {rng.choice(STREETS)}", city, state, zip_code + rng.randint(0, 5)
+
+
+# Function to split an iterator of rows into lists of at most chunk_size rows
+def chunked(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Class that generates the whole dataset for one scale factor and seed
+class OutlandDataGenerator:
+
+    def __init__(self, scale=1, seed=0, chunk_size=5000, start_ids=None, waiver_bytes=256):
+        # start_ids maps a table name to the first id to use for it (default 1 for every
+        # table), so data can be generated to go after rows that are already there
+        self.scale = scale
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.waiver_bytes = waiver_bytes
+        self.counts = scaled_counts(scale)
+        self.start_ids = {table: 1 for table in ID_TABLES}
+        self.start_ids.update(start_ids or {})
+
+        # Small lists every later table refers to, worked out up front; past the first
+        # nine staff (one of each role), most new hires are guides
+        rng = self._rng("staff_roles")
+        self.staff_roles = STAFF_ROLES + [rng.choice(["Guide"] * 4 + STAFF_ROLES[4:])
+                                          for i in range(self.counts["staff"] - len(STAFF_ROLES))]
+        self.guide_ids = [self.start_ids["staff"] + i for i, role in enumerate(self.staff_roles) if role == "Guide"]
+        self.products = self._product_catalogue()
+        self.continents = list(CONTINENT_WEIGHTS)
+        self.continent_weights = [CONTINENT_WEIGHTS[continent] for continent in self.continents]
+
+    # Method to get a random number generator for one table (or one row of it); each
+    # gets its own so that changing one table's rules doesn't reshuffle the others
+    def _rng(self, *key):
+        return random.Random(":".join(str(part) for part in (self.seed,) + key))
+
+    # Method to make up the product catalogue as (product code, condition, kind) tuples
+    def _product_catalogue(self):
+        rng = self._rng("products")
+        products = []
+        for i in range(self.counts["products"]):
+            kind = PRODUCT_KINDS[i % len(PRODUCT_KINDS)]
+            conditions = PRODUCT_CONDITIONS[:rng.randint(1, len(PRODUCT_CONDITIONS))]
+            for condition in conditions:
+                products.append((f"GEN{self.seed}-{i + 1:05d}", condition, kind))
+        return products
+
+    # Method to pick a random existing customer id
+    def _customer(self, rng):
+        return self.start_ids["customer"] + rng.randrange(self.counts["customer"])
+
+    # Method to yield (table, columns, rows) chunks for the whole dataset, parents first
+    def generate(self):
+        for table, rows in [("customer", self._customers), ("staff", self._staff),
+                            ("guide_req", self._guide_reqs), ("guide_req_tracker", self._guide_req_trackers),
+                            ("order_inventory", self._order_inventory)]:
+            yield from self._chunks(table, rows())
+
+        # Trips and orders come out a chunk at a time with their members/items right behind them
+        yield from self._trips()
+        yield from self._orders()
+        for table, rows in [("rental", self._rentals), ("rental_inventory", self._rental_inventory),
+                            ("rental_history", self._rental_history)]:
+            yield from self._chunks(table, rows())
+
+    # Method to split a table's rows into (table, columns, rows) chunks
+    def _chunks(self, table, rows):
+        for chunk in chunked(rows, self.chunk_size):
+            yield table, TABLE_COLUMNS[table], chunk
+
+    # Method to generate customer rows
+    def _customers(self):
+        rng = self._rng("customer")
+        for i in range(self.counts["customer"]):
+            cust_id = self.start_ids["customer"] + i
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            street, city, state, zip_code = address(rng)
+            yield (cust_id, first, last, phone(rng), street, city, state, zip_code,
+                   f"{first.lower()}.{last.lower()}.{cust_id}@example.com")
+
+    # Method to generate staff rows; the first nine cover every role once
+    def _staff(self):
+        rng = self._rng("staff")
+        for i, role in enumerate(self.staff_roles):
+            staff_id = self.start_ids["staff"] + i
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            nick_name = first[:3] if rng.random() < 0.3 else None
+            street, city, state, zip_code = address(rng)
+            yield (staff_id, first, last, nick_name, phone(rng), street, city, state, zip_code,
+                   f"staff{staff_id}@outlandadventures.com", role)
+
+    # Method to generate the fixed list of guide requirements
+    def _guide_reqs(self):
+        for i, (name, description, valid_months, governing_org) in enumerate(GUIDE_REQS):
+            yield self.start_ids["guide_req"] + i, name, description, valid_months, governing_org
+
+    # Method to generate each guide's progress on each requirement
+    def _guide_req_trackers(self):
+        rng = self._rng("guide_req_tracker")
+        tracker_id = self.start_ids["guide_req_tracker"]
+        for staff_id in self.guide_ids:
+            for i in range(len(GUIDE_REQS)):
+                if rng.random() < 0.8:
+                    yield tracker_id, spread_date(rng.random()), "Certified", self.start_ids["guide_req"] + i, staff_id
+                else:
+                    yield tracker_id, None, "In progress", self.start_ids["guide_req"] + i, staff_id
+                tracker_id += 1
+
+    # Method to generate the order inventory (one row per product and condition)
+    def _order_inventory(self):
+        rng = self._rng("order_inventory")
+        for code, condition, (kind, weight, dimensions, price) in self.products:
+            name = f"{rng.choice(LAST_NAMES)} {kind} {code[-5:]}"
+            unit_price = round(price * PRODUCT_PRICE_FACTOR[condition] * rng.uniform(0.8, 1.2), 2)
+            yield (code, condition, name, unit_price, rng.randint(0, 40), weight, dimensions,
+                   f"Generated {kind.lower()} for testing, in {condition} condition.")
+
+    # Method to yield trip chunks, each followed by the chunk of its members. Trip ids
+    # increase with their dates, like they would in a real booking system.
+    def _trips(self):
+        rng = self._rng("trip")
+        trip_count = self.counts["trip"]
+        member_id = self.start_ids["trip_member"]
+        for first in range(0, trip_count, self.chunk_size):
+            trips = []
+            members = []
+            for i in range(first, min(first + self.chunk_size, trip_count)):
+                trip_id = self.start_ids["trip"] + i
+                continent = rng.choices(self.continents, self.continent_weights)[0]
+                trip_start = spread_date((i + rng.random()) / trip_count)
+                trip_end = trip_start + timedelta(days=rng.randint(4, 14))
+                cust_primary = self._customer(rng)
+                trips.append((trip_id, f"{rng.choice(DESTINATIONS[continent])}, {continent}", trip_start,
+                              trip_end, rng.choice(self.guide_ids), cust_primary))
+
+                # The primary customer always goes, plus 0-5 others; check_cust_id requires that
+                # members with a customer account have no name/contact details and vice versa
+                for member in range(1 + rng.choices(range(6), [10, 15, 30, 25, 12, 8])[0]):
+                    cust_id = cust_primary if member == 0 else (self._customer(rng) if rng.random() < 0.25 else None)
+                    if cust_id is None:
+                        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                        contact = (first_name, last_name, f"{first_name.lower()}.{member_id}@example.com", phone(rng))
+                    else:
+                        contact = (None, None, None, None)
+                    members.append((member_id, trip_id, contact[0], contact[1],
+                                    trip_start - timedelta(days=rng.randint(18 * 365, 75 * 365)),
+                                    f"{rng.choice(AIRLINES)} {rng.randrange(16**6):06X}" if rng.random() < 0.9 else None,
+                                    rng.randbytes(self.waiver_bytes), contact[2], contact[3], cust_id,
+                                    "Complete" if rng.random() < 0.9 else "Pending", phone(rng),
+                                    f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", rng.choice(RELATIONS)))
+                    member_id += 1
+            yield "trip", TABLE_COLUMNS["trip"], trips
+            yield from self._chunks("trip_member", members)
+
+    # Method to yield order chunks, each followed by the chunk of their items
+    def _orders(self):
+        rng = self._rng("orders")
+        order_count = self.counts["orders"]
+        item_id = self.start_ids["order_item"]
+        for first in range(0, order_count, self.chunk_size):
+            orders = []
+            items = []
+            for i in range(first, min(first + self.chunk_size, order_count)):
+                order_id = self.start_ids["orders"] + i
+
+                # About half the orders are shipped; the rest are picked up in store
+                shipped = rng.random() < 0.5
+                shipping = address(rng) if shipped else (None, None, None, None)
+                orders.append((order_id, spread_date((i + rng.random()) / order_count), self._customer(rng)) + shipping)
+                for product in rng.sample(self.products, min(len(self.products), rng.choices((1, 2, 3), (60, 30, 10))[0])):
+                    tracking = f"1Z{rng.randrange(10**12):012d}" if shipped else None
+                    items.append((item_id, product[0], product[1], rng.choices((1, 2, 3, 4), (70, 20, 7, 3))[0],
+                                  tracking, order_id))
+                    item_id += 1
+            yield "orders", TABLE_COLUMNS["orders"], orders
+            yield from self._chunks("order_item", items)
+
+    # Method to work out one rental's dates; each rental has its own random generator so
+    # that rental_history can work them out again later instead of keeping every rental
+    def _rental_dates(self, i):
+        rng = self._rng("rental", i)
+        rental_date = spread_date((i + rng.random()) / self.counts["rental"])
+        start_date = rental_date + timedelta(days=rng.choice((0, 0, 0, 1, 3, 7, 14)))
+        return rng, rental_date, start_date, start_date + timedelta(days=rng.randint(2, 10))
+
+    # Method to generate rental rows, dated in id order
+    def _rentals(self):
+        for i in range(self.counts["rental"]):
+            rng, rental_date, start_date, end_date = self._rental_dates(i)
+            yield self.start_ids["rental"] + i, rental_date, self._customer(rng), start_date, end_date
+
+    # Method to generate the rental inventory; items still out on DATA_END point at the rental they're on
+    def _rental_inventory(self):
+        rng = self._rng("rental_inventory")
+        codes = sorted({code for code, condition, kind in self.products})
+        rental_count = self.counts["rental"]
+        for i in range(self.counts["rental_inventory"]):
+            # Most items have been rented at some point; newer items are added as the business grows
+            initial_use = spread_date(rng.random() ** 0.7) if rng.random() < 0.9 else None
+            rental_id = None
+            if initial_use is not None and rng.random() < 0.05:
+                rental_id = self.start_ids["rental"] + rental_count - 1 - rng.randrange(max(1, rental_count // 50))
+            yield (self.start_ids["rental_inventory"] + i, initial_use, rng.choice((8.75, 10.00, 25.50)),
+                   rng.choice(RENTAL_CONDITIONS), rng.choice(codes), rental_id)
+
+    # Method to generate the items that went out on each rental
+    def _rental_history(self):
+        history_id = self.start_ids["rental_history"]
+        item_count = self.counts["rental_inventory"]
+        for i in range(self.counts["rental"]):
+            rng, rental_date, start_date, end_date = self._rental_dates(i)
+            returned = end_date < DATA_END
+            for item in range(rng.choices((1, 2, 3), (55, 30, 15))[0]):
+                issue_condition = rng.choice(RENTAL_CONDITIONS)
+                yield (history_id, self.start_ids["rental_inventory"] + rng.randrange(item_count),
+                       self.start_ids["rental"] + i, issue_condition,
+                       (issue_condition if rng.random() < 0.8 else "fair") if returned else None)
+                history_id += 1
+
+
+# Function to generate the dataset as (table, columns, rows) chunks
+def generate(scale=1, seed=0, chunk_size=5000, start_ids=None, waiver_bytes=256):
+    return OutlandDataGenerator(scale, seed, chunk_size, start_ids, waiver_bytes).generate()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic Outland Adventures data and count the rows.")
+    parser.add_argument("--scale", type=float, default=1, help="scale factor; 1 is about the sample data (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per chunk (default: 5000)")
+    args = parser.parse_args(argv)
+
+    # Run the generator without storing anything, e.g. to check counts and speed
+    started = time.perf_counter()
+    totals = {}
+    for table, columns, rows in generate(args.scale, args.seed, args.chunk_size):
+        totals[table] = totals.get(table, 0) + len(rows)
+    seconds = time.perf_counter() - started
+    for table, count in totals.items():
+        print(f"{table}: {count} rows")
+    print(f"{sum(totals.values())} rows in {seconds:.2f}s ({sum(totals.values()) / seconds:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,6 +21,9 @@ GRANT ALL PRIVILEGES ON outland.* TO 'adm'@'localhost';
 
 -- drop tables if they are present
 -- learned the hard way that order matters; drop tables w foreign keys before tables those keys originate from
+DROP TABLE IF EXISTS trip_quarter_rollup;
+DROP TABLE IF EXISTS rental_quarter_rollup;
+DROP TABLE IF EXISTS order_quarter_rollup;
 DROP TABLE IF EXISTS guide_req_tracker;
 DROP TABLE IF EXISTS guide_req;
 DROP TABLE IF EXISTS trip_member;
@@ -76,9 +79,18 @@ CREATE TABLE trip (
 	trip_end		DATE			NOT NULL,
 	staff_id		INT				NOT NULL,
 	cust_primary	INT				NOT NULL,
+	-- continent is derived from the end of destination; stored (not virtual) so it can be indexed,
+	-- which lets reports group/filter by continent without parsing every destination string
+	continent		VARCHAR(75)		AS (substring_index(destination, ', ', -1)) STORED,
 	
     PRIMARY KEY(trip_id),
 
+	-- continent first for group bys/filters; trip_end included so trip reports are served from the index alone
+	INDEX idx_trip_continent (continent, trip_end),
+
+	-- reports look up the earliest/latest trip end
+	INDEX idx_trip_end (trip_end),
+
 	CONSTRAINT fk_trip_staff_id -- this gives the foreign key a name for easy reference if we want to delete or change it later
     FOREIGN KEY(staff_id)
         REFERENCES staff(staff_id),
@@ -96,7 +108,9 @@ CREATE TABLE trip_member (
 	last_name			VARCHAR(75),
     date_of_birth		DATE			NOT NULL,
     reservations		VARCHAR(255),			  -- empty until reservations are booked
-    waiver				MEDIUMBLOB		NOT NULL,
+    waiver				MEDIUMBLOB,				  -- empty once moved out to the waiver store (module-10/waiver_store.py)
+    waiver_hash			CHAR(64),				  -- SHA-256 of the waiver, which is its name in the waiver store;
+    waiver_size			INT,					  -- both filled in by the trip_member_waiver triggers
     email 				VARCHAR(50),			  -- email & phone only filled if no cust_id
     phone_number 		CHAR(12),
     cust_id		 		INT,					  -- only one trip member is required to have a customer account
@@ -106,6 +120,9 @@ CREATE TABLE trip_member (
     emergency_relation	VARCHAR(25)		NOT NULL,
     
     PRIMARY KEY(id),
+
+	-- finds the members sharing a stored waiver, e.g. before removing it from the store
+	INDEX idx_trip_member_waiver_hash (waiver_hash),
     
 	CONSTRAINT fk_trip_members_trip_id
 	FOREIGN KEY(trip_id)
@@ -122,7 +139,10 @@ CREATE TABLE trip_member (
 		AND first_name IS NOT NULL AND last_name IS NOT NULL)
 	OR
 	(cust_id IS NOT NULL and email IS NULL and phone_number IS NULL
-		AND first_name IS NULL AND last_name IS NULL))
+		AND first_name IS NULL AND last_name IS NULL)),
+
+	-- every member has a waiver, either here or in the waiver store
+	CONSTRAINT check_waiver CHECK(waiver IS NOT NULL OR waiver_hash IS NOT NULL)
 );
 
 -- create order_inventory table and composite primary key
@@ -151,6 +171,9 @@ CREATE TABLE orders (
 	ship_zip		INT,
     
     PRIMARY KEY(order_id),
+
+	-- reports look up the earliest/latest order and group orders by date
+	INDEX idx_orders_order_date (order_date),
 	
 	CONSTRAINT fk_orders_cust_id
 	FOREIGN KEY(cust_id)
@@ -186,6 +209,9 @@ CREATE TABLE rental (
     end_date	DATE	NOT NULL,
     
     PRIMARY KEY(rental_id),
+
+	-- reports look up the earliest/latest rental and group rentals by date
+	INDEX idx_rental_rental_date (rental_date),
     
 	CONSTRAINT fk_rental_cust_id
 	FOREIGN KEY(cust_id)
@@ -202,6 +228,9 @@ CREATE TABLE rental_inventory (
     rental_id			INT,				  -- this value is only filled when the item is currently rented/reserved
     
     PRIMARY KEY(item_id),
+
+	-- the inventory age report looks up and pages through items by initial use date
+	INDEX idx_rental_inventory_initial_use (initial_use),
 	
 	CONSTRAINT fk_rental_inventory_rental_id
 	FOREIGN KEY(rental_id)
@@ -261,6 +290,185 @@ CREATE TABLE guide_req_tracker (
         REFERENCES guide_req(req_id)
 );
 
+-- create the quarterly rollup tables; reports read these instead of re-aggregating every
+-- order, rental and trip. quarter_start is the first day of the quarter, e.g. 2025-04-01 for 2025Q2.
+-- rows are kept up to date by the triggers below, so they are never edited directly
+CREATE TABLE order_quarter_rollup (
+	quarter_start	DATE	NOT NULL,
+	items			INT		NOT NULL	DEFAULT 0, -- sum of order_item quantities for orders placed that quarter
+
+	PRIMARY KEY(quarter_start)
+);
+
+CREATE TABLE rental_quarter_rollup (
+	quarter_start	DATE	NOT NULL,
+	items			INT		NOT NULL	DEFAULT 0, -- number of rental_history rows for rentals made that quarter
+
+	PRIMARY KEY(quarter_start)
+);
+
+CREATE TABLE trip_quarter_rollup (
+	continent		VARCHAR(75)	NOT NULL,
+	quarter_start	DATE		NOT NULL,
+	trips			INT			NOT NULL	DEFAULT 0, -- number of trips to the continent ending that quarter
+
+	PRIMARY KEY(continent, quarter_start)
+);
+
+-- triggers to keep the rollups in step with every insert, update and delete
+-- multi-statement triggers need a different delimiter so the ; inside them doesn't end the CREATE
+DELIMITER $$
+
+-- order items count toward the quarter of their order's order_date
+CREATE TRIGGER order_item_rollup_insert AFTER INSERT ON order_item
+FOR EACH ROW
+BEGIN
+	INSERT INTO order_quarter_rollup (quarter_start, items)
+		SELECT makedate(year(order_date), 1) + interval (quarter(order_date) - 1) quarter, NEW.quantity
+		FROM orders WHERE order_id = NEW.order_id
+	ON DUPLICATE KEY UPDATE items = order_quarter_rollup.items + NEW.quantity;
+END$$
+
+CREATE TRIGGER order_item_rollup_delete AFTER DELETE ON order_item
+FOR EACH ROW
+BEGIN
+	UPDATE order_quarter_rollup SET items = items - OLD.quantity
+	WHERE quarter_start = (SELECT makedate(year(order_date), 1) + interval (quarter(order_date) - 1) quarter
+		FROM orders WHERE order_id = OLD.order_id);
+END$$
+
+CREATE TRIGGER order_item_rollup_update AFTER UPDATE ON order_item
+FOR EACH ROW
+BEGIN
+	IF NEW.quantity <> OLD.quantity OR NEW.order_id <> OLD.order_id THEN
+		UPDATE order_quarter_rollup SET items = items - OLD.quantity
+		WHERE quarter_start = (SELECT makedate(year(order_date), 1) + interval (quarter(order_date) - 1) quarter
+			FROM orders WHERE order_id = OLD.order_id);
+		INSERT INTO order_quarter_rollup (quarter_start, items)
+			SELECT makedate(year(order_date), 1) + interval (quarter(order_date) - 1) quarter, NEW.quantity
+			FROM orders WHERE order_id = NEW.order_id
+		ON DUPLICATE KEY UPDATE items = order_quarter_rollup.items + NEW.quantity;
+	END IF;
+END$$
+
+-- moving an order to another quarter moves all of its items with it
+-- (orders can't be deleted while they have items, so there is no delete trigger)
+CREATE TRIGGER orders_rollup_update AFTER UPDATE ON orders
+FOR EACH ROW
+BEGIN
+	DECLARE moved INT;
+	IF quarter(NEW.order_date) <> quarter(OLD.order_date) OR year(NEW.order_date) <> year(OLD.order_date) THEN
+		SELECT coalesce(sum(quantity), 0) INTO moved FROM order_item WHERE order_id = NEW.order_id;
+		UPDATE order_quarter_rollup SET items = items - moved
+		WHERE quarter_start = makedate(year(OLD.order_date), 1) + interval (quarter(OLD.order_date) - 1) quarter;
+		INSERT INTO order_quarter_rollup (quarter_start, items)
+		VALUES (makedate(year(NEW.order_date), 1) + interval (quarter(NEW.order_date) - 1) quarter, moved)
+		ON DUPLICATE KEY UPDATE items = order_quarter_rollup.items + moved;
+	END IF;
+END$$
+
+-- rental history rows count toward the quarter of their rental's rental_date
+CREATE TRIGGER rental_history_rollup_insert AFTER INSERT ON rental_history
+FOR EACH ROW
+BEGIN
+	INSERT INTO rental_quarter_rollup (quarter_start, items)
+		SELECT makedate(year(rental_date), 1) + interval (quarter(rental_date) - 1) quarter, 1
+		FROM rental WHERE rental_id = NEW.rental_id
+	ON DUPLICATE KEY UPDATE items = rental_quarter_rollup.items + 1;
+END$$
+
+CREATE TRIGGER rental_history_rollup_delete AFTER DELETE ON rental_history
+FOR EACH ROW
+BEGIN
+	UPDATE rental_quarter_rollup SET items = items - 1
+	WHERE quarter_start = (SELECT makedate(year(rental_date), 1) + interval (quarter(rental_date) - 1) quarter
+		FROM rental WHERE rental_id = OLD.rental_id);
+END$$
+
+CREATE TRIGGER rental_history_rollup_update AFTER UPDATE ON rental_history
+FOR EACH ROW
+BEGIN
+	IF NEW.rental_id <> OLD.rental_id THEN
+		UPDATE rental_quarter_rollup SET items = items - 1
+		WHERE quarter_start = (SELECT makedate(year(rental_date), 1) + interval (quarter(rental_date) - 1) quarter
+			FROM rental WHERE rental_id = OLD.rental_id);
+		INSERT INTO rental_quarter_rollup (quarter_start, items)
+			SELECT makedate(year(rental_date), 1) + interval (quarter(rental_date) - 1) quarter, 1
+			FROM rental WHERE rental_id = NEW.rental_id
+		ON DUPLICATE KEY UPDATE items = rental_quarter_rollup.items + 1;
+	END IF;
+END$$
+
+-- moving a rental to another quarter moves all of its history rows with it
+CREATE TRIGGER rental_rollup_update AFTER UPDATE ON rental
+FOR EACH ROW
+BEGIN
+	DECLARE moved INT;
+	IF quarter(NEW.rental_date) <> quarter(OLD.rental_date) OR year(NEW.rental_date) <> year(OLD.rental_date) THEN
+		SELECT count(*) INTO moved FROM rental_history WHERE rental_id = NEW.rental_id;
+		UPDATE rental_quarter_rollup SET items = items - moved
+		WHERE quarter_start = makedate(year(OLD.rental_date), 1) + interval (quarter(OLD.rental_date) - 1) quarter;
+		INSERT INTO rental_quarter_rollup (quarter_start, items)
+		VALUES (makedate(year(NEW.rental_date), 1) + interval (quarter(NEW.rental_date) - 1) quarter, moved)
+		ON DUPLICATE KEY UPDATE items = rental_quarter_rollup.items + moved;
+	END IF;
+END$$
+
+-- trips count toward their continent and the quarter of their trip_end
+-- (continent is worked out from destination here, matching trip's generated column)
+CREATE TRIGGER trip_rollup_insert AFTER INSERT ON trip
+FOR EACH ROW
+BEGIN
+	INSERT INTO trip_quarter_rollup (continent, quarter_start, trips)
+	VALUES (substring_index(NEW.destination, ', ', -1),
+		makedate(year(NEW.trip_end), 1) + interval (quarter(NEW.trip_end) - 1) quarter, 1)
+	ON DUPLICATE KEY UPDATE trips = trip_quarter_rollup.trips + 1;
+END$$
+
+CREATE TRIGGER trip_rollup_delete AFTER DELETE ON trip
+FOR EACH ROW
+BEGIN
+	UPDATE trip_quarter_rollup SET trips = trips - 1
+	WHERE continent = substring_index(OLD.destination, ', ', -1)
+		AND quarter_start = makedate(year(OLD.trip_end), 1) + interval (quarter(OLD.trip_end) - 1) quarter;
+END$$
+
+CREATE TRIGGER trip_rollup_update AFTER UPDATE ON trip
+FOR EACH ROW
+BEGIN
+	IF NEW.destination <> OLD.destination OR NEW.trip_end <> OLD.trip_end THEN
+		UPDATE trip_quarter_rollup SET trips = trips - 1
+		WHERE continent = substring_index(OLD.destination, ', ', -1)
+			AND quarter_start = makedate(year(OLD.trip_end), 1) + interval (quarter(OLD.trip_end) - 1) quarter;
+		INSERT INTO trip_quarter_rollup (continent, quarter_start, trips)
+		VALUES (substring_index(NEW.destination, ', ', -1),
+			makedate(year(NEW.trip_end), 1) + interval (quarter(NEW.trip_end) - 1) quarter, 1)
+		ON DUPLICATE KEY UPDATE trips = trip_quarter_rollup.trips + 1;
+	END IF;
+END$$
+
+-- a waiver's size and SHA-256 hash are filled in whenever it's written, so lists of trip
+-- members can show them without MySQL reading (or hashing) the waiver itself
+CREATE TRIGGER trip_member_waiver_insert BEFORE INSERT ON trip_member
+FOR EACH ROW
+BEGIN
+	IF NEW.waiver IS NOT NULL THEN
+		SET NEW.waiver_hash = SHA2(NEW.waiver, 256), NEW.waiver_size = OCTET_LENGTH(NEW.waiver);
+	END IF;
+END$$
+
+-- only a changed waiver is hashed again; moving one to the waiver store sets waiver to NULL
+-- and leaves the hash and size it was given
+CREATE TRIGGER trip_member_waiver_update BEFORE UPDATE ON trip_member
+FOR EACH ROW
+BEGIN
+	IF NEW.waiver IS NOT NULL AND NOT (NEW.waiver <=> OLD.waiver) THEN
+		SET NEW.waiver_hash = SHA2(NEW.waiver, 256), NEW.waiver_size = OCTET_LENGTH(NEW.waiver);
+	END IF;
+END$$
+
+DELIMITER ;
+
 -- insert customers; ChatGPT used to generate an extra 9 customers after initial 6
 INSERT INTO customer 
 (first_name, last_name, phone_number, addr_street, 
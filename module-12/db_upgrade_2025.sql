@@ -0,0 +1,238 @@
+/*
+    Title: db_upgrade_2025.sql
+    Description: brings an existing outland database up to date with db_init_2025.sql
+		without dropping any data. Each section only needs to be run once; a fresh
+		database built from db_init_2025.sql already has all of these changes.
+*/
+
+USE outland;
+
+-- stored continent column on trip, plus its index
+-- adding a STORED generated column rebuilds the table, which fills in continent for every existing row
+ALTER TABLE trip
+	ADD COLUMN continent VARCHAR(75) AS (substring_index(destination, ', ', -1)) STORED,
+	ADD INDEX idx_trip_continent (continent, trip_end);
+
+-- date indexes used by the reports' earliest/latest lookups
+ALTER TABLE trip ADD INDEX idx_trip_end (trip_end);
+ALTER TABLE orders ADD INDEX idx_orders_order_date (order_date);
+ALTER TABLE rental ADD INDEX idx_rental_rental_date (rental_date);
+ALTER TABLE rental_inventory ADD INDEX idx_rental_inventory_initial_use (initial_use);
+
+-- create the quarterly rollup tables; reports read these instead of re-aggregating every
+-- order, rental and trip. quarter_start is the first day of the quarter, e.g. 2025-04-01 for 2025Q2.
+-- rows are kept up to date by the triggers below, so they are never edited directly
+CREATE TABLE order_quarter_rollup (
+	quarter_start	DATE	NOT NULL,
+	items			INT		NOT NULL	DEFAULT 0, -- sum of order_item quantities for orders placed that quarter
+
+	PRIMARY KEY(quarter_start)
+);
+
+CREATE TABLE rental_quarter_rollup (
+	quarter_start	DATE	NOT NULL,
+	items			INT		NOT NULL	DEFAULT 0, -- number of rental_history rows for rentals made that quarter
+
+	PRIMARY KEY(quarter_start)
+);
+
+CREATE TABLE trip_quarter_rollup (
+	continent		VARCHAR(75)	NOT NULL,
+	quarter_start	DATE		NOT NULL,
+	trips			INT			NOT NULL	DEFAULT 0, -- number of trips to the continent ending that quarter
+
+	PRIMARY KEY(continent, quarter_start)
+);
+
+-- backfill the rollups, then create the triggers that keep them up to date, with every table
+-- involved write-locked. Without the lock a row written after the triggers were created but
+-- before the backfill read it would be counted twice, and one written the other way round not
+-- at all. Other sessions wait until UNLOCK TABLES; MySQL allows CREATE TRIGGER under
+-- LOCK TABLES as long as the trigger's table is locked for writing.
+LOCK TABLES orders WRITE, order_item WRITE, rental WRITE, rental_history WRITE, trip WRITE,
+	order_quarter_rollup WRITE, rental_quarter_rollup WRITE, trip_quarter_rollup WRITE;
+
+INSERT INTO order_quarter_rollup (quarter_start, items)
+	SELECT makedate(year(orders.order_date), 1) + interval (quarter(orders.order_date) - 1) quarter, sum(order_item.quantity)
+	FROM order_item INNER JOIN orders ON orders.order_id = order_item.order_id
+	GROUP BY 1;
+
+INSERT INTO rental_quarter_rollup (quarter_start, items)
+	SELECT makedate(year(rental.rental_date), 1) + interval (quarter(rental.rental_date) - 1) quarter, count(*)
+	FROM rental_history INNER JOIN rental ON rental.rental_id = rental_history.rental_id
+	GROUP BY 1;
+
+INSERT INTO trip_quarter_rollup (continent, quarter_start, trips)
+	SELECT continent, makedate(year(trip_end), 1) + interval (quarter(trip_end) - 1) quarter, count(*)
+	FROM trip
+	GROUP BY 1, 2;
+
+-- triggers to keep the rollups in step with every insert, update and delete
+-- multi-statement triggers need a different delimiter so the ; inside them doesn't end the CREATE
+DELIMITER $$
+
+-- order items count toward the quarter of their order's order_date
+CREATE TRIGGER order_item_rollup_insert AFTER INSERT ON order_item
+FOR EACH ROW
+BEGIN
+	INSERT INTO order_quarter_rollup (quarter_start, items)
+		SELECT makedate(year(order_date), 1) + interval (quarter(order_date) - 1) quarter, NEW.quantity
+		FROM orders WHERE order_id = NEW.order_id
+	ON DUPLICATE KEY UPDATE items = order_quarter_rollup.items + NEW.quantity;
+END$$
+
+CREATE TRIGGER order_item_rollup_delete AFTER DELETE ON order_item
+FOR EACH ROW
+BEGIN
+	UPDATE order_quarter_rollup SET items = items - OLD.quantity
+	WHERE quarter_start = (SELECT makedate(year(order_date), 1) + interval (quarter(order_date) - 1) quarter
+		FROM orders WHERE order_id = OLD.order_id);
+END$$
+
+CREATE TRIGGER order_item_rollup_update AFTER UPDATE ON order_item
+FOR EACH ROW
+BEGIN
+	IF NEW.quantity <> OLD.quantity OR NEW.order_id <> OLD.order_id THEN
+		UPDATE order_quarter_rollup SET items = items - OLD.quantity
+		WHERE quarter_start = (SELECT makedate(year(order_date), 1) + interval (quarter(order_date) - 1) quarter
+			FROM orders WHERE order_id = OLD.order_id);
+		INSERT INTO order_quarter_rollup (quarter_start, items)
+			SELECT makedate(year(order_date), 1) + interval (quarter(order_date) - 1) quarter, NEW.quantity
+			FROM orders WHERE order_id = NEW.order_id
+		ON DUPLICATE KEY UPDATE items = order_quarter_rollup.items + NEW.quantity;
+	END IF;
+END$$
+
+-- moving an order to another quarter moves all of its items with it
+-- (orders can't be deleted while they have items, so there is no delete trigger)
+CREATE TRIGGER orders_rollup_update AFTER UPDATE ON orders
+FOR EACH ROW
+BEGIN
+	DECLARE moved INT;
+	IF quarter(NEW.order_date) <> quarter(OLD.order_date) OR year(NEW.order_date) <> year(OLD.order_date) THEN
+		SELECT coalesce(sum(quantity), 0) INTO moved FROM order_item WHERE order_id = NEW.order_id;
+		UPDATE order_quarter_rollup SET items = items - moved
+		WHERE quarter_start = makedate(year(OLD.order_date), 1) + interval (quarter(OLD.order_date) - 1) quarter;
+		INSERT INTO order_quarter_rollup (quarter_start, items)
+		VALUES (makedate(year(NEW.order_date), 1) + interval (quarter(NEW.order_date) - 1) quarter, moved)
+		ON DUPLICATE KEY UPDATE items = order_quarter_rollup.items + moved;
+	END IF;
+END$$
+
+-- rental history rows count toward the quarter of their rental's rental_date
+CREATE TRIGGER rental_history_rollup_insert AFTER INSERT ON rental_history
+FOR EACH ROW
+BEGIN
+	INSERT INTO rental_quarter_rollup (quarter_start, items)
+		SELECT makedate(year(rental_date), 1) + interval (quarter(rental_date) - 1) quarter, 1
+		FROM rental WHERE rental_id = NEW.rental_id
+	ON DUPLICATE KEY UPDATE items = rental_quarter_rollup.items + 1;
+END$$
+
+CREATE TRIGGER rental_history_rollup_delete AFTER DELETE ON rental_history
+FOR EACH ROW
+BEGIN
+	UPDATE rental_quarter_rollup SET items = items - 1
+	WHERE quarter_start = (SELECT makedate(year(rental_date), 1) + interval (quarter(rental_date) - 1) quarter
+		FROM rental WHERE rental_id = OLD.rental_id);
+END$$
+
+CREATE TRIGGER rental_history_rollup_update AFTER UPDATE ON rental_history
+FOR EACH ROW
+BEGIN
+	IF NEW.rental_id <> OLD.rental_id THEN
+		UPDATE rental_quarter_rollup SET items = items - 1
+		WHERE quarter_start = (SELECT makedate(year(rental_date), 1) + interval (quarter(rental_date) - 1) quarter
+			FROM rental WHERE rental_id = OLD.rental_id);
+		INSERT INTO rental_quarter_rollup (quarter_start, items)
+			SELECT makedate(year(rental_date), 1) + interval (quarter(rental_date) - 1) quarter, 1
+			FROM rental WHERE rental_id = NEW.rental_id
+		ON DUPLICATE KEY UPDATE items = rental_quarter_rollup.items + 1;
+	END IF;
+END$$
+
+-- moving a rental to another quarter moves all of its history rows with it
+CREATE TRIGGER rental_rollup_update AFTER UPDATE ON rental
+FOR EACH ROW
+BEGIN
+	DECLARE moved INT;
+	IF quarter(NEW.rental_date) <> quarter(OLD.rental_date) OR year(NEW.rental_date) <> year(OLD.rental_date) THEN
+		SELECT count(*) INTO moved FROM rental_history WHERE rental_id = NEW.rental_id;
+		UPDATE rental_quarter_rollup SET items = items - moved
+		WHERE quarter_start = makedate(year(OLD.rental_date), 1) + interval (quarter(OLD.rental_date) - 1) quarter;
+		INSERT INTO rental_quarter_rollup (quarter_start, items)
+		VALUES (makedate(year(NEW.rental_date), 1) + interval (quarter(NEW.rental_date) - 1) quarter, moved)
+		ON DUPLICATE KEY UPDATE items = rental_quarter_rollup.items + moved;
+	END IF;
+END$$
+
+-- trips count toward their continent and the quarter of their trip_end
+-- (continent is worked out from destination here, matching trip's generated column)
+CREATE TRIGGER trip_rollup_insert AFTER INSERT ON trip
+FOR EACH ROW
+BEGIN
+	INSERT INTO trip_quarter_rollup (continent, quarter_start, trips)
+	VALUES (substring_index(NEW.destination, ', ', -1),
+		makedate(year(NEW.trip_end), 1) + interval (quarter(NEW.trip_end) - 1) quarter, 1)
+	ON DUPLICATE KEY UPDATE trips = trip_quarter_rollup.trips + 1;
+END$$
+
+CREATE TRIGGER trip_rollup_delete AFTER DELETE ON trip
+FOR EACH ROW
+BEGIN
+	UPDATE trip_quarter_rollup SET trips = trips - 1
+	WHERE continent = substring_index(OLD.destination, ', ', -1)
+		AND quarter_start = makedate(year(OLD.trip_end), 1) + interval (quarter(OLD.trip_end) - 1) quarter;
+END$$
+
+CREATE TRIGGER trip_rollup_update AFTER UPDATE ON trip
+FOR EACH ROW
+BEGIN
+	IF NEW.destination <> OLD.destination OR NEW.trip_end <> OLD.trip_end THEN
+		UPDATE trip_quarter_rollup SET trips = trips - 1
+		WHERE continent = substring_index(OLD.destination, ', ', -1)
+			AND quarter_start = makedate(year(OLD.trip_end), 1) + interval (quarter(OLD.trip_end) - 1) quarter;
+		INSERT INTO trip_quarter_rollup (continent, quarter_start, trips)
+		VALUES (substring_index(NEW.destination, ', ', -1),
+			makedate(year(NEW.trip_end), 1) + interval (quarter(NEW.trip_end) - 1) quarter, 1)
+		ON DUPLICATE KEY UPDATE trips = trip_quarter_rollup.trips + 1;
+	END IF;
+END$$
+
+DELIMITER ;
+
+UNLOCK TABLES;
+
+-- waivers can be moved out of trip_member to the waiver store (module-10/waiver_store.py);
+-- module-10/migrate_waivers.py fills in waiver_hash and waiver_size for the existing waivers
+-- and moves them once this has been run
+ALTER TABLE trip_member
+	MODIFY COLUMN waiver MEDIUMBLOB,
+	ADD COLUMN waiver_hash CHAR(64) AFTER waiver,
+	ADD COLUMN waiver_size INT AFTER waiver_hash,
+	ADD INDEX idx_trip_member_waiver_hash (waiver_hash),
+	ADD CONSTRAINT check_waiver CHECK(waiver IS NOT NULL OR waiver_hash IS NOT NULL);
+
+DELIMITER $$
+
+-- a waiver's size and SHA-256 hash are filled in whenever it's written, so lists of trip
+-- members can show them without MySQL reading (or hashing) the waiver itself
+CREATE TRIGGER trip_member_waiver_insert BEFORE INSERT ON trip_member
+FOR EACH ROW
+BEGIN
+	IF NEW.waiver IS NOT NULL THEN
+		SET NEW.waiver_hash = SHA2(NEW.waiver, 256), NEW.waiver_size = OCTET_LENGTH(NEW.waiver);
+	END IF;
+END$$
+
+-- only a changed waiver is hashed again; moving one to the waiver store sets waiver to NULL
+-- and leaves the hash and size it was given
+CREATE TRIGGER trip_member_waiver_update BEFORE UPDATE ON trip_member
+FOR EACH ROW
+BEGIN
+	IF NEW.waiver IS NOT NULL AND NOT (NEW.waiver <=> OLD.waiver) THEN
+		SET NEW.waiver_hash = SHA2(NEW.waiver, 256), NEW.waiver_size = OCTET_LENGTH(NEW.waiver);
+	END IF;
+END$$
+
+DELIMITER ;
@@ -0,0 +1,62 @@
+"""
+Outland Adventures report helpers: columnar results
+
+Reads (series, bucket start, value) report rows straight into NumPy arrays,
+one per column (series labels, datetime64 bucket starts and int64 values),
+and pivots them into a zero-filled grid of series x buckets with a single
+scatter-add instead of a Python loop over the rows. Each series' numbers come
+back as a row of that grid, which the tables and charts use as is.
+
+NumPy is slow to import, so report_queries only loads this module once a
+report runs (and falls back to plain Python lists if NumPy isn't installed).
+"""
+
+import numpy as np
+
+from time_buckets import generate_template
+
+# NumPy date unit each granularity's buckets are counted in, and how many of those units make a bucket
+BUCKET_UNITS = {"week": ("D", 7), "month": ("M", 1), "quarter": ("M", 3), "year": ("Y", 1)}
+
+
+# Function to read a result into one array per column, a chunk of rows at a time;
+# dtypes gives each column's type, e.g. ("O", "datetime64[D]", "int64")
+def fetch_columns(cursor, dtypes, chunk_size=5000):
+    parts = [[] for dtype in dtypes]
+    while True:
+        chunk = cursor.fetchmany(chunk_size)
+        if not chunk:
+            break
+        for part, column, dtype in zip(parts, zip(*chunk), dtypes):
+            part.append(np.array(column, dtype=dtype))
+    return [np.concatenate(part) if part else np.empty(0, dtype=dtype) for part, dtype in zip(parts, dtypes)]
+
+
+# Function to number the buckets that bucket start dates fall in, counting from 1970, so
+# that neighbouring buckets get neighbouring numbers
+def bucket_numbers(starts, granularity="quarter"):
+    unit, size = BUCKET_UNITS[granularity]
+    numbers = starts.astype(f"datetime64[{unit}]").astype(np.int64)
+    if granularity == "week":
+        numbers += 3 # 1970-01-01 was a Thursday; this makes weeks start on Mondays like ISO weeks
+    return numbers // size
+
+
+# Function to pivot (series, bucket start, value) columns into a zero-filled template and
+# one filled template per series (in series order), like time_buckets.pivot_template
+def pivot_columns(series, starts, values, granularity="quarter"):
+
+    # Series labels become row numbers and bucket starts column numbers, then every value is
+    # added into its cell at once; np.add.at adds up repeated cells rather than keeping the last
+    labels, rows = np.unique(series, return_inverse=True)
+    numbers = bucket_numbers(starts, granularity)
+    first = numbers.min()
+    grid = np.zeros((len(labels), numbers.max() - first + 1), dtype=np.int64)
+    np.add.at(grid, (rows, numbers - first), values)
+
+    # The template's labels and start dates are only per bucket, so they're built as usual
+    template = generate_template(starts.min().astype(object), starts.max().astype(object), granularity)
+    template['number'] = np.zeros(grid.shape[1], dtype=np.int64)
+    results = {str(label): {'bucket': template['bucket'], 'start': template['start'], 'number': grid[i]}
+               for i, label in enumerate(labels)}
+    return template, results
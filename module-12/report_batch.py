@@ -0,0 +1,186 @@
+"""
+Outland Adventures report helpers: headless batch runner
+
+Generates the report pack without the tkinter app, e.g. from a nightly job:
+
+    python report_batch.py --out reports/nightly --format csv json
+
+Each report runs on its own worker (threads by default, processes with
+--processes) with its own connection from the shared_db pool, so the whole
+pack takes about as long as the slowest report. Results are written as CSV and/or JSON, and
+the equipment and trip charts as PNG images.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import date
+from decimal import Decimal
+
+# shared_db is in the parent folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+from shared_db import connection, PreparedCursor
+
+from report_queries import equipment_report_data, trip_report_data, inventory_report_data
+
+REPORTS = ("equipment", "trip", "inventory")
+
+# Column headings for the inventory report's rows (see report_queries.inventory_report_chunks)
+INVENTORY_COLUMNS = ["rental_id", "initial_use", "name", "years_in_use", "months_in_use", "item_id"]
+
+
+# Function to turn query values (dates, Decimals from SUM, NumPy numbers from
+# report_arrays) into plain CSV/JSON values
+def plain(value):
+    if hasattr(value, "dtype"):
+        return value.item()
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+# Function to write a quarterly report (template + per-series results) as CSV/JSON
+def write_quarterly(out_dir, name, template, results, formats):
+    paths = []
+    series = list(results.keys())
+    if "csv" in formats:
+        path = os.path.join(out_dir, f"{name}.csv")
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["Quarter"] + series)
+            for i, quarter in enumerate(template['bucket']):
+                writer.writerow([quarter] + [plain(results[label]['number'][i]) for label in series])
+        paths.append(path)
+    if "json" in formats:
+        path = os.path.join(out_dir, f"{name}.json")
+        with open(path, "w") as file:
+            json.dump({"quarters": template['bucket'],
+                       "series": {label: [plain(value) for value in results[label]['number']] for label in series}},
+                      file, indent=2)
+        paths.append(path)
+    return paths
+
+
+# Function to write the inventory report's rows as CSV/JSON
+def write_inventory(out_dir, rows, formats):
+    paths = []
+    if "csv" in formats:
+        path = os.path.join(out_dir, "inventory.csv")
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(INVENTORY_COLUMNS)
+            writer.writerows([plain(value) for value in row] for row in rows)
+        paths.append(path)
+    if "json" in formats:
+        path = os.path.join(out_dir, "inventory.json")
+        with open(path, "w") as file:
+            json.dump([dict(zip(INVENTORY_COLUMNS, (plain(value) for value in row))) for row in rows], file, indent=2)
+        paths.append(path)
+    return paths
+
+
+# Function to save a chart as a PNG without any GUI
+def save_chart(out_dir, name, draw, template, results):
+
+    # Figures are built directly rather than through pyplot, whose global state isn't
+    # safe to share between threads; the Agg canvas renders to a file with no display
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(10, 6), layout='constrained')
+    FigureCanvasAgg(fig)
+    draw(fig.add_subplot(), template, results)
+    path = os.path.join(out_dir, f"{name}.png")
+    fig.savefig(path)
+    return path
+
+
+# Function to run one report start to finish; top level so a process pool can pickle it.
+# Each worker checks out its own connection from a pool sized to the number of workers
+# (each worker process builds a pool of its own).
+def run_report(report, out_dir, formats, charts, use_rollups, pool_size):
+    from report_charts import draw_equipment_chart, draw_trip_chart
+
+    started = time.perf_counter()
+    with connection(".env_outland", pool_size=pool_size, autocommit=True) as db:
+        cursor = PreparedCursor(db) # report queries run as prepared statements
+        try:
+            if report == "inventory":
+                rows = inventory_report_data(cursor)
+                paths = write_inventory(out_dir, rows, formats)
+                count = len(rows)
+            else:
+                if report == "equipment":
+                    template, results = equipment_report_data(cursor, use_rollups)
+                    draw = draw_equipment_chart
+                else:
+                    template, results = trip_report_data(cursor, use_rollups)
+                    draw = draw_trip_chart
+
+                # Nothing to write for an empty report
+                if template is None:
+                    return report, [], 0, time.perf_counter() - started
+                paths = write_quarterly(out_dir, report, template, results, formats)
+                if charts:
+                    paths.append(save_chart(out_dir, report, draw, template, results))
+                count = len(template['bucket'])
+        finally:
+            cursor.close() # before the connection goes back to the pool
+    return report, paths, count, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Outland Adventures reports without the GUI.")
+    # The report names are checked below rather than with choices=, which argparse would also
+    # check the whole default list against (and reject) when no report is named
+    parser.add_argument("reports", nargs="*", help=f"reports to run: {', '.join(REPORTS)} (default: all)")
+    parser.add_argument("--out", default=os.path.join("reports", date.today().isoformat()),
+                        help="folder to write results to (default: reports/<today>)")
+    parser.add_argument("--format", nargs="+", choices=("csv", "json"), default=["csv", "json"],
+                        help="result file formats (default: csv json)")
+    parser.add_argument("--no-charts", action="store_true", help="skip the PNG charts")
+    parser.add_argument("--live", action="store_true",
+                        help="aggregate the base tables instead of reading the rollup tables")
+    parser.add_argument("--processes", action="store_true", help="use worker processes instead of threads")
+    parser.add_argument("--workers", type=int, default=None, help="number of workers (default: one per report)")
+    args = parser.parse_args(argv)
+    unknown = [report for report in args.reports if report not in REPORTS]
+    if unknown:
+        parser.error(f"unknown report(s): {', '.join(unknown)} (choose from {', '.join(REPORTS)})")
+
+    os.makedirs(args.out, exist_ok=True)
+    reports = list(dict.fromkeys(args.reports or REPORTS)) # drop duplicates, keep order
+
+    # Run every report at once; results are printed as each one finishes
+    pool_class = ProcessPoolExecutor if args.processes else ThreadPoolExecutor
+    started = time.perf_counter()
+    failed = False
+    # Threads share one pool with a connection per worker; each process only needs one
+    workers = args.workers or len(reports)
+    pool_size = 1 if args.processes else workers
+    with pool_class(max_workers=workers) as pool:
+        futures = {report: pool.submit(run_report, report, args.out, args.format,
+                                       not args.no_charts, not args.live, pool_size)
+                   for report in reports}
+        for report, future in futures.items():
+            try:
+                name, paths, count, seconds = future.result()
+                print(f"{name}: {count} rows in {seconds:.2f}s -> {', '.join(paths) or 'nothing to report'}")
+            # Any failure (MySQL, a chart, a file, pickling in process mode) only fails that
+            # report; the rest still run and print their status
+            except Exception as err:
+                failed = True
+                print(f"{report}: failed: {err}", file=sys.stderr)
+
+    print(f"Report pack finished in {time.perf_counter() - started:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Outland Adventures report helpers: result cache
+
+Keeps the results of recent reports so that clicking the same report again
+doesn't re-run its queries. A cached result is only reused while the tables
+it was built from are unchanged, which is checked with one cheap query for
+per-table change markers (the highest id plus the time InnoDB last wrote to
+the table), never by re-reading the data itself.
+
+InnoDB only keeps that time to the second, so a change committed later in
+the same second as a write the markers saw wouldn't change them. Markers
+read in the same second as a table's last write are therefore not trusted:
+the result is not cached against them, and a cached result is not reused
+on their say-so.
+"""
+
+import time
+from collections import OrderedDict
+
+# Tables each report reads, with the auto-increment primary key used as part of its
+# change marker (None for tables without one). The equipment and trip reports read
+# the rollup tables, which only change when these base tables do.
+REPORT_TABLES = {
+    "equipment": {"orders": "order_id", "order_item": "id", "rental": "rental_id", "rental_history": "id"},
+    "trip": {"trip": "trip_id"},
+    "inventory": {"rental_inventory": "item_id", "order_inventory": None},
+}
+
+
+# Function to set up a connection so the change markers are always current
+def prepare_cache_connection(cursor):
+
+    # MySQL 8 caches information_schema table statistics (including update_time)
+    # for a day by default; turn that off for this session. Older servers don't
+    # have the setting, but they don't cache either, so that error can be ignored.
+    import mysql.connector # already loaded by whoever opened the connection
+    try:
+        cursor.execute("SET SESSION information_schema_stats_expiry = 0;")
+    except mysql.connector.Error:
+        pass
+
+
+# Function to get the change markers for a group of tables in one round trip; gives
+# None if one of the tables was written to in the current second
+def fetch_change_markers(cursor, tables):
+
+    # For each table get the highest id (changes on every insert, and when the newest
+    # row is deleted) and InnoDB's last update time (changes on any committed insert,
+    # update or delete). Table names can't be query parameters, so only known names
+    # from REPORT_TABLES are spliced in; the information_schema lookups take them as
+    # parameters, so each report's statement text never changes and can stay prepared.
+    # The server's current time comes first, to check the update times against.
+    columns = ["now()"]
+    params = []
+    update_times = [] # positions of the update times in the row
+    for table, key in tables.items():
+        if key is not None:
+            columns.append(f"(select max({key}) from {table})")
+        update_times.append(len(columns))
+        columns.append("""(select update_time from information_schema.tables
+                       where table_schema = database() and table_name = %s)""")
+        params.append(table)
+    cursor.execute("select " + ", ".join(columns) + ";", params)
+    row = cursor.fetchall()[0]
+    now = row[0]
+    if any(row[i] is not None and row[i] >= now for i in update_times):
+        return None
+    return tuple(row[1:])
+
+
+# Class to hold a bounded number of report results, dropping the least recently used
+class ReportCache:
+
+    def __init__(self, max_entries=8, recheck_after=2.0):
+        # Results are stored as key -> (change markers, time last checked, result)
+        self.max_entries = max_entries
+        self.recheck_after = recheck_after # seconds a result is trusted without rechecking
+        self._entries = OrderedDict()
+
+    # Method to get a report's result, running compute() only if there's no valid cached copy
+    def get(self, cursor, report, params, compute):
+        found, result, markers = self.lookup(cursor, report, params)
+        if found:
+            return result
+
+        # No valid cached result, so run the report and keep it for next time
+        result = compute()
+        self.put(report, params, markers, result)
+        return result
+
+    # Method to look for a valid cached result; returns (found, result, markers), where markers
+    # are the current change markers to store alongside a freshly computed result (None if
+    # they can't be trusted yet)
+    def lookup(self, cursor, report, params):
+        key = (report, params)
+        entry = self._entries.get(key)
+
+        # A result checked within the last couple of seconds is returned without touching
+        # MySQL at all; older ones are reused only if the change markers still match
+        if entry is not None:
+            markers, checked, result = entry
+            if time.monotonic() - checked < self.recheck_after:
+                self._entries.move_to_end(key)
+                return True, result, markers
+            current = fetch_change_markers(cursor, REPORT_TABLES[report])
+            if current is not None and current == markers:
+                self._entries[key] = (markers, time.monotonic(), result)
+                self._entries.move_to_end(key)
+                return True, result, markers
+            return False, None, current
+
+        # The markers are read before the report runs so that a change made while
+        # it runs is picked up on the next click
+        return False, None, fetch_change_markers(cursor, REPORT_TABLES[report])
+
+    # Method to store a result, evicting the least recently used ones over the size limit;
+    # a result whose markers are None isn't stored, since a change can't be told from them
+    def put(self, report, params, markers, result):
+        key = (report, params)
+        if markers is None:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (markers, time.monotonic(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # Method to drop everything, e.g. after this app changes the data itself
+    def clear(self):
+        self._entries.clear()
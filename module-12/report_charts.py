@@ -0,0 +1,64 @@
+"""
+Outland Adventures report helpers: charts
+
+Draws the report charts onto a matplotlib Axes handed in by the caller, so
+the same drawing code serves the tkinter app (pyplot windows) and headless
+runs (figures saved straight to image files). The series numbers are handed
+to matplotlib as NumPy arrays, as they come from report_arrays.
+"""
+
+import numpy as np # for the bar graph
+
+
+# Function to draw the equipment sales trends bar graph
+def draw_equipment_chart(ax, template, results):
+
+    # Plot the results as a bar graph
+    x = np.arange(len(template['bucket'])) # For label locations
+    width = 0.2 # width of the bars
+
+    ordered = np.asarray(results['order']['number'])
+    rented = np.asarray(results['rental']['number'])
+
+    offset = width * 0
+    rects = ax.bar(x + offset, ordered, width, label="Ordered Items")
+    ax.bar_label(rects, padding=3)
+
+    offset = width * 1
+    rects = ax.bar(x + offset, rented, width, label="Rented Items")
+    ax.bar_label(rects, padding=3)
+
+    # Configure titles etc for plot and axes and add a legend; leave some headroom
+    # above the tallest bar for its label and the legend
+    tallest = max(ordered.max(initial=0), rented.max(initial=0))
+    ax.set_title("Equipment Rentals vs Orders")
+    ax.set_xlabel('Quarter')
+    ax.set_ylabel("Number of Items Rented/Ordered")
+    ax.set_xticks(x + width, template['bucket'])
+    ax.set_ylim(0, max(35, float(tallest) * 1.25))
+    ax.legend(loc="upper left", ncols=2)
+
+
+# Function to draw the trip destination trends line graph
+def draw_trip_chart(ax, template, results):
+
+    # Create an array of possible colors to use; they repeat if there are
+    # trips to more than 6 continents/major continental areas
+    colors = ['red', 'blue', 'green', 'purple', 'orange', 'brown']
+
+    # Every continent shares the template's quarters, so the lines are drawn against
+    # quarter positions and the quarter labels set once as the x ticks
+    x = np.arange(len(template['bucket']))
+
+    # For each continent, use its index to pick its line color and its "number" array
+    # for y values; also label it by name
+    for i, continent in enumerate(results.keys()):
+        ax.plot(x, np.asarray(results[continent]['number']), label=continent, c=colors[i % len(colors)])
+
+    # Configure titles etc for plot and axes, add a legend
+    ax.set_title("Trip Destination Trends", fontsize=18)
+    ax.set_xlabel('Quarter', fontsize=14)
+    ax.set_ylabel("Number of Trips", fontsize=14)
+    ax.set_xticks(x, template['bucket'])
+    ax.tick_params(axis='both', which='major', labelsize=12)
+    ax.legend()
@@ -0,0 +1,116 @@
+"""
+Outland Adventures report helpers: virtualized report grid
+
+A read-only table widget for report results. Data is handed over column by
+column, and only the rows currently scrolled into view are drawn on the
+canvas, so building, scrolling and destroying the grid costs about the same
+for ten rows as for ten thousand.
+"""
+
+import tkinter as tk
+from tkinter import font as tkfont
+
+
+# Class for a scrollable grid that only draws the rows in view
+class ReportGrid(tk.Frame):
+
+    def __init__(self, parent, width=480, height=400, font=None, row_styles=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        # font is anything tkinter accepts as a font, e.g. ("Arial", 10); row_styles maps
+        # a row tag to canvas text/rectangle colors, e.g. {"red": {"text": "red"}}
+        self.font = tkfont.Font(font=font) if font is not None else tkfont.nametofont("TkDefaultFont")
+        self.header_font = self.font.copy()
+        self.header_font.configure(weight="bold")
+        self.row_styles = row_styles or {}
+        self.padding = 6
+        self.row_height = self.font.metrics("linespace") + self.padding
+
+        # Fixed header canvas on top, scrolling body canvas below; both scroll sideways together
+        self.header = tk.Canvas(self, width=width, height=self.row_height + 2, highlightthickness=0)
+        self.body = tk.Canvas(self, width=width, height=height, highlightthickness=0, background="white")
+        self.y_scroll = tk.Scrollbar(self, orient="vertical", command=self._yview)
+        self.x_scroll = tk.Scrollbar(self, orient="horizontal", command=self._xview)
+        self.body.configure(yscrollcommand=self.y_scroll.set, xscrollcommand=self.x_scroll.set)
+        self.header.configure(xscrollcommand=self.x_scroll.set)
+
+        self.header.grid(row=0, column=0, sticky="EW")
+        self.body.grid(row=1, column=0, sticky="NSEW")
+        self.y_scroll.grid(row=1, column=1, sticky="NS")
+        self.x_scroll.grid(row=2, column=0, sticky="EW")
+        self.rowconfigure(1, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        # Redraw when resized or scrolled with the mouse wheel (Button-4/5 on Linux)
+        self.body.bind("<Configure>", lambda event: self._draw_rows())
+        self.body.bind("<MouseWheel>", lambda event: self._yview("scroll", -1 if event.delta > 0 else 1, "units"))
+        self.body.bind("<Button-4>", lambda event: self._yview("scroll", -1, "units"))
+        self.body.bind("<Button-5>", lambda event: self._yview("scroll", 1, "units"))
+
+        self.labels = []
+        self.columns = []
+        self.row_tags = None
+        self.column_x = []
+
+    # Method to show new data; columns is a list of equal-length sequences, one per label,
+    # and row_tags an optional sequence of row_styles keys, one per row
+    def set_data(self, labels, columns, row_tags=None):
+        self.labels = list(labels)
+        self.columns = columns
+        self.row_tags = row_tags
+        row_count = len(columns[0]) if columns else 0
+
+        # Size each column to fit its header and a sample of its values; measuring every
+        # value would make this cost grow with the result size again
+        self.column_x = [0]
+        for label, column in zip(self.labels, self.columns):
+            sample = [column[i] for i in range(min(row_count, 200))]
+            width = max([self.header_font.measure(label)] + [self.font.measure(str(value)) for value in sample])
+            self.column_x.append(self.column_x[-1] + max(width + 2 * self.padding, 60))
+
+        # The scroll region covers every row even though only the visible ones get drawn
+        total_width = self.column_x[-1]
+        self.body.configure(scrollregion=(0, 0, total_width, row_count * self.row_height))
+        self.header.configure(scrollregion=(0, 0, total_width, self.row_height + 2))
+        self.body.yview_moveto(0)
+        self._draw_header()
+        self._draw_rows()
+
+    # Method to draw the column labels
+    def _draw_header(self):
+        self.header.delete("all")
+        for i, label in enumerate(self.labels):
+            middle = (self.column_x[i] + self.column_x[i + 1]) / 2
+            self.header.create_text(middle, self.row_height / 2 + 1, text=label, font=self.header_font)
+        self.header.create_line(0, self.row_height + 1, self.column_x[-1], self.row_height + 1)
+
+    # Method to draw just the rows that are scrolled into view
+    def _draw_rows(self):
+        self.body.delete("all")
+        if not self.columns:
+            return
+        row_count = len(self.columns[0])
+        top = self.body.canvasy(0)
+        first = max(int(top // self.row_height), 0)
+        last = min(first + int(self.body.winfo_height() // self.row_height) + 2, row_count)
+
+        for row in range(first, last):
+            y = row * self.row_height
+            style = self.row_styles.get(self.row_tags[row], {}) if self.row_tags is not None else {}
+
+            # Alternate row shading (or the row's own background) to make rows easy to follow
+            background = style.get("background", "#f2f2f2" if row % 2 else "white")
+            self.body.create_rectangle(0, y, self.column_x[-1], y + self.row_height, fill=background, width=0)
+            for i, column in enumerate(self.columns):
+                middle = (self.column_x[i] + self.column_x[i + 1]) / 2
+                self.body.create_text(middle, y + self.row_height / 2, text=str(column[row]),
+                                      font=self.font, fill=style.get("text", "black"))
+
+    # Scrollbar callbacks; move the canvas, then draw whatever is now in view
+    def _yview(self, *args):
+        self.body.yview(*args)
+        self._draw_rows()
+
+    def _xview(self, *args):
+        self.body.xview(*args)
+        self.header.xview(*args)
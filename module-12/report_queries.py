@@ -0,0 +1,210 @@
+"""
+Outland Adventures report helpers: shared queries
+
+The data side of the reports: each *_report_data function runs a report's
+queries and hands back the data, leaving the display to the caller. The
+quarterly reports' numbers come back as NumPy arrays when NumPy is installed
+(see report_arrays.py) and as lists otherwise.
+Values always go in as query parameters and only fixed column/table names are
+built into the SQL, so each report's statement text is the same on every run
+and can be kept prepared (see shared_db.PreparedCursor).
+"""
+
+from time_buckets import bucket_start_sql, generate_template, fill_template, pivot_template
+
+
+# Function to get the earliest and latest value of several date columns in one round trip
+def fetch_date_bounds(cursor, columns):
+
+    # columns is a list of (table, column) pairs, e.g. [("orders", "order_date")].
+    # Each min/max is its own scalar subquery; with an index on the column MySQL
+    # reads one end of the index for each, so this stays fast as tables grow.
+    # Table/column names can't be query parameters, so only pass known names.
+    subqueries = []
+    for table, column in columns:
+        subqueries.append(f"(select min({column}) from {table})")
+        subqueries.append(f"(select max({column}) from {table})")
+    cursor.execute("select " + ", ".join(subqueries) + ";")
+    row = cursor.fetchone()
+
+    # Hand back a (min, max) pair per column; both are None for an empty table
+    return [(row[i], row[i + 1]) for i in range(0, len(row), 2)]
+
+
+# Function to get the overall earliest/latest date out of fetch_date_bounds results
+def combine_date_bounds(bounds):
+
+    # Empty tables give None, which min/max can't compare, so skip them
+    earliest = [low for low, high in bounds if low is not None]
+    latest = [high for low, high in bounds if high is not None]
+    if not earliest:
+        return None, None
+    return min(earliest), max(latest)
+
+
+# Function to read (series, bucket start, value) rows and split them into one filled-in
+# template per series; returns the template and the series, or (None, {}) if there were no rows
+def read_pivoted(cursor, granularity="quarter"):
+
+    # NumPy is imported here rather than at the top so the app window doesn't wait for it
+    try:
+        from report_arrays import fetch_columns, pivot_columns
+    except ImportError:
+        rows = cursor.fetchall()
+        if not rows:
+            return None, {}
+        template = generate_template(min(row[1] for row in rows), max(row[1] for row in rows), granularity)
+        return template, pivot_template(template, rows)
+
+    series, starts, values = fetch_columns(cursor, ("O", "datetime64[D]", "int64"))
+    if len(series) == 0:
+        return None, {}
+    return pivot_columns(series, starts, values, granularity)
+
+
+# Function to get the equipment sales trends data
+def equipment_report_data(cursor, use_rollups=True, progress=None):
+
+    # progress, if given, is called with a short description of each step
+    if progress:
+        progress("Adding up ordered and rented items by quarter...")
+
+    # Normally read the quarterly rollup tables, which hold one row per quarter, so
+    # this reads a handful of rows no matter how many orders and rentals there are.
+    # Quarters that have been emptied out by deletes are left as zero rows, so skip those.
+    if use_rollups:
+        cursor.execute("""select 'order', quarter_start, items from order_quarter_rollup where items > 0
+                       union all
+                       select 'rental', quarter_start, items from rental_quarter_rollup where items > 0
+                       order by 1, 2;""")
+
+    # Otherwise aggregate the order/rental tables directly (handy for checking the rollups),
+    # grouping each row by the first day of its quarter
+    else:
+        order_quarter = bucket_start_sql("orders.order_date", "quarter")
+        rental_quarter = bucket_start_sql("rental.rental_date", "quarter")
+        cursor.execute(f"""select 'order', {order_quarter}, sum(order_item.quantity) from order_item
+                       inner join orders on orders.order_id = order_item.order_id group by 2
+                       union all
+                       select 'rental', {rental_quarter}, count(*) from rental_history
+                       inner join rental on rental.rental_id = rental_history.rental_id group by 2
+                       order by 1, 2;""")
+
+    if progress:
+        progress("Filling in quarters...")
+
+    # Split the rows into order/rental series covering the earliest through the latest
+    # quarter; empty orders and rental tables give None, and the report shows a message instead
+    template, pivoted = read_pivoted(cursor, "quarter")
+    if template is None:
+        return None, {}
+
+    # Both series are kept even if one is empty
+    results = {series: pivoted.get(series, fill_template(template, [])) for series in ("order", "rental")}
+    return template, results
+
+
+# Function to get the trip destination trends data
+def trip_report_data(cursor, use_rollups=True, progress=None):
+
+    # progress, if given, is called with a short description of each step
+    if progress:
+        progress("Counting trips by continent and quarter...")
+
+    # Normally read the quarterly rollup, which has one row per continent/quarter pair with trips
+    if use_rollups:
+        cursor.execute("""select continent, quarter_start, trips from trip_quarter_rollup
+                       where trips > 0 order by continent, quarter_start;""")
+
+    # Otherwise count the trips directly; the (continent, trip_end) index covers this query
+    else:
+        trip_quarter = bucket_start_sql("trip_end", "quarter")
+        cursor.execute(f"""select continent, {trip_quarter}, count(*) from trip
+                       group by 1, 2 order by 1, 2;""")
+
+    if progress:
+        progress("Filling in quarters...")
+
+    # Give each continent its own filled-in copy of a template covering the earliest through
+    # the latest quarter; an empty trip table gives None, and the report shows a message instead
+    return read_pivoted(cursor, "quarter")
+
+
+# Function to stream the rental items that have been in use for more than 4.5 years in chunks
+def inventory_report_chunks(cursor, chunk_size=500, after=None, limit=None, progress=None):
+
+    # progress, if given, is called with a short description of each step
+    if progress:
+        progress("Finding rental items in use for over 4.5 years...")
+
+    # Each row is (rental ID, initial use date, name, whole years in use, leftover months, item ID).
+    # Rows come newest first; item_id breaks ties so that after=(initial_use, item_id) of the
+    # last row seen picks up exactly where that left off (keyset paging).
+    query = """SELECT 
+               ri.rental_id, ri.initial_use, oi.name,
+               timestampdiff(year, ri.initial_use, curdate()),
+               timestampdiff(month, ri.initial_use, curdate()) % 12,
+               ri.item_id
+               FROM rental_inventory ri INNER JOIN order_inventory oi
+               ON ri.product_code = oi.product_code 
+               WHERE ri.initial_use < CURDATE() - INTERVAL 54 MONTH"""
+    params = []
+    if after is not None:
+        query += " AND (ri.initial_use < %s OR (ri.initial_use = %s AND ri.item_id < %s))"
+        params.extend([after[0], after[0], after[1]])
+    query += " ORDER BY ri.initial_use DESC, ri.item_id DESC"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    cursor.execute(query + ";", params)
+
+    # The default cursor is unbuffered, so rows stay on the server until fetched;
+    # fetchmany hands them over a chunk at a time
+    while True:
+        chunk = cursor.fetchmany(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+# Function to get the rental items that have been in use for more than 4.5 years as one list
+def inventory_report_data(cursor, after=None, limit=None, progress=None):
+    rows = []
+    for chunk in inventory_report_chunks(cursor, after=after, limit=limit, progress=progress):
+        rows.extend(chunk)
+    return rows
+
+
+# Function to rebuild the quarterly rollups from scratch
+def rebuild_rollups(connection):
+
+    # The triggers in db_init_2025.sql keep the rollups current, so this is only needed
+    # to repair them, e.g. after loading data with the triggers dropped. Everything runs
+    # in one transaction so reports never see a half-rebuilt rollup.
+    order_quarter = bucket_start_sql("orders.order_date", "quarter")
+    rental_quarter = bucket_start_sql("rental.rental_date", "quarter")
+    trip_quarter = bucket_start_sql("trip_end", "quarter")
+    statements = [
+        "delete from order_quarter_rollup;",
+        "delete from rental_quarter_rollup;",
+        "delete from trip_quarter_rollup;",
+        f"""insert into order_quarter_rollup (quarter_start, items)
+            select {order_quarter}, sum(order_item.quantity) from order_item
+            inner join orders on orders.order_id = order_item.order_id group by 1;""",
+        f"""insert into rental_quarter_rollup (quarter_start, items)
+            select {rental_quarter}, count(*) from rental_history
+            inner join rental on rental.rental_id = rental_history.rental_id group by 1;""",
+        f"""insert into trip_quarter_rollup (continent, quarter_start, trips)
+            select continent, {trip_quarter}, count(*) from trip group by 1, 2;""",
+    ]
+    cursor = connection.cursor()
+    connection.start_transaction()
+    try:
+        for statement in statements:
+            cursor.execute(statement)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
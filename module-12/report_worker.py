@@ -0,0 +1,194 @@
+"""
+Outland Adventures report helpers: background report worker
+
+Runs report queries on a worker thread with its own database connection so
+the tkinter window stays responsive while MySQL works. Connections come from
+a connect() callable, normally shared_db.get_connection, so the worker reuses
+pooled connections instead of opening new ones. The worker never
+touches widgets; it posts messages (progress, results, errors) to a queue
+that the main thread drains with poll(), typically from a window.after loop.
+"""
+
+import queue
+import threading
+
+
+# Exception raised inside a report pipeline once the user has cancelled it
+class ReportCancelled(Exception):
+    pass
+
+
+# Class to run report pipelines one at a time on a background thread
+class ReportWorker:
+
+    def __init__(self, connect, on_connect=None, query_log=None):
+        self.connect = connect         # called with no arguments to get a database connection
+        self.on_connect = on_connect   # called with the worker's cursor once it has connected
+        self.query_log = query_log     # shared_db.QueryLog to record the statements in, if any
+        self._jobs = queue.Queue()     # (job id, pipeline, report) jobs waiting to run, None to stop
+        self._messages = queue.Queue() # (kind, job id, payload) messages for the main thread
+        self._cancelled = set()        # ids of jobs the user has cancelled
+        self._lock = threading.Lock()  # guards _cancelled, _current_job and _next_job
+        self._current_job = None
+        self._next_job = 1
+        self._connection_id = None     # MySQL thread id of the worker's connection, used to KILL QUERY
+        self._thread = threading.Thread(target=self._run, name="report-worker", daemon=True)
+
+    # Method to start the worker thread
+    def start(self):
+        self._thread.start()
+
+    # Method to queue a pipeline; it is called as pipeline(cursor, progress) on the worker thread,
+    # where progress(text, chunk=None) reports a step and optionally hands over partial results.
+    # report names the report in the query log.
+    def submit(self, pipeline, report=None):
+        with self._lock:
+            job_id = self._next_job
+            self._next_job += 1
+        self._jobs.put((job_id, pipeline, report))
+        return job_id
+
+    # Method to cancel a job (or the running one if no id is given) from the main thread
+    def cancel(self, job_id=None):
+        with self._lock:
+            if job_id is None:
+                job_id = self._current_job
+            if job_id is None:
+                return
+            self._cancelled.add(job_id)
+            running = job_id == self._current_job
+
+        # A pipeline notices the cancellation the next time it reports progress; if a
+        # query is in flight, kill it through another connection so we don't wait for it.
+        # Connecting takes a moment, so that happens on a short-lived thread of its own.
+        if running and self._connection_id is not None:
+            threading.Thread(target=self._kill_query, args=(job_id, self._connection_id), daemon=True).start()
+
+    # Method to make the cursor pipelines run on: prepared statements, recorded in the
+    # query log if there is one
+    def _make_cursor(self, connection):
+        from shared_db import PreparedCursor, InstrumentedCursor
+        cursor = PreparedCursor(connection)
+        if self.query_log is not None:
+            cursor = InstrumentedCursor(cursor, self.query_log)
+        return cursor
+
+    # Method to stop the statement a cancelled job is running on the worker's connection
+    def _kill_query(self, job_id, connection_id):
+        import mysql.connector
+        try:
+            connection = self.connect()
+            try:
+                cursor = connection.cursor()
+
+                # By the time we're connected the job may have finished and the next one started
+                # (the app submits a new report right after cancelling the old one), so only kill
+                # the query if the cancelled job is still the one running. The lock is held until
+                # the KILL is sent so the worker can't move on to another job in between.
+                with self._lock:
+                    if self._current_job == job_id:
+                        cursor.execute("KILL QUERY %s", (connection_id,))
+            finally:
+                connection.close()
+        except mysql.connector.Error:
+            pass # the query may have finished in the meantime
+
+    # Method for the main thread to collect any messages posted since the last call
+    def poll(self):
+        messages = []
+        while True:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    # Method to stop the worker after any queued jobs and close its connection
+    def stop(self):
+        self._jobs.put(None)
+
+    # Method to stop a pipeline by raising ReportCancelled if its job has been cancelled
+    def _check_cancelled(self, job_id):
+        with self._lock:
+            if job_id in self._cancelled:
+                raise ReportCancelled()
+
+    # Method run on the worker thread
+    def _run(self):
+
+        # Anything that stops the worker (it can't connect, .env is missing, the pool timed
+        # out, ...) is posted with no job id, so the main thread isn't left waiting for results
+        try:
+            self._serve()
+        except Exception as err:
+            self._messages.put(("error", None, err))
+
+    # Method to connect and run jobs until stop() is called
+    def _serve(self):
+
+        # mysql.connector is slow to import, so that happens here on the worker thread rather
+        # than when the app starts. The worker has its own connection; connections can't be
+        # shared between threads.
+        import mysql.connector
+        connection = self.connect()
+        self._connection_id = connection.connection_id
+
+        # Pipelines get a prepared-statement cursor, which keeps each report query prepared
+        # on this connection so later runs only send the parameter values
+        cursor = self._make_cursor(connection)
+        if self.on_connect is not None:
+            self.on_connect(cursor)
+
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                job_id, pipeline, report = job
+                if self.query_log is not None:
+                    cursor.report = report
+
+                # Skip jobs cancelled before they started
+                with self._lock:
+                    if job_id in self._cancelled:
+                        self._cancelled.discard(job_id)
+                        self._messages.put(("cancelled", job_id, None))
+                        continue
+                    self._current_job = job_id
+
+                # Progress callback handed to the pipeline; posts the text (and any chunk of
+                # partial results) to the main thread, and stops the pipeline by raising if
+                # the job has been cancelled
+                def progress(text, chunk=None, job_id=job_id):
+                    self._check_cancelled(job_id)
+                    if chunk is not None:
+                        self._messages.put(("chunk", job_id, chunk))
+                    if text:
+                        self._messages.put(("progress", job_id, text))
+
+                try:
+                    result = pipeline(cursor, progress)
+                    if self.query_log is not None:
+                        cursor.finish() # record the job's last statement now rather than at the next job
+                    self._check_cancelled(job_id) # last chance to notice a cancel before handing back results
+                    self._messages.put(("done", job_id, result))
+                except ReportCancelled:
+                    self._messages.put(("cancelled", job_id, None))
+                except Exception as err:
+                    # A killed query surfaces as a MySQL error; report that as a cancel
+                    with self._lock:
+                        cancelled = job_id in self._cancelled
+                    self._messages.put(("cancelled", job_id, None) if cancelled else ("error", job_id, err))
+
+                    # Start the next job on a fresh cursor in case this one still has unread rows
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pass
+                    cursor = self._make_cursor(connection)
+                finally:
+                    with self._lock:
+                        self._cancelled.discard(job_id)
+                        self._current_job = None
+        finally:
+            cursor.close()
+            connection.close() # hands a pooled connection back to its pool
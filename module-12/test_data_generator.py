@@ -0,0 +1,116 @@
+"""
+Tests for data_generator: deterministic output and rows that fit the schema
+in db_init_2025.sql
+"""
+
+import os
+import re
+from datetime import date
+
+import pytest
+
+from data_generator import TABLE_COLUMNS, ID_TABLES, DATA_START, DATA_END, generate, scaled_counts
+
+SCHEMA_SCRIPT = os.path.join(os.path.dirname(os.path.realpath(__file__)), "db_init_2025.sql")
+
+
+# Function to read the (VAR)CHAR sizes of every table's columns from the schema script
+def column_sizes():
+    with open(SCHEMA_SCRIPT) as file:
+        script = file.read()
+    sizes = {}
+    for table, body in re.findall(r"CREATE TABLE (\w+) \((.*?)\n\);", script, re.DOTALL):
+        sizes[table] = {column: int(size)
+                        for column, size in re.findall(r"^\s*(\w+)\s+(?:VAR)?CHAR\((\d+)\)", body, re.MULTILINE)}
+    return sizes
+
+
+# Function to gather the generated rows by table
+def generated_rows(scale=3, seed=0, chunk_size=50, start_ids=None):
+    tables = {}
+    for table, columns, rows in generate(scale, seed, chunk_size, start_ids):
+        assert columns == TABLE_COLUMNS[table]
+        assert len(rows) <= chunk_size
+        tables.setdefault(table, []).extend(rows)
+    return tables
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return generated_rows()
+
+
+def test_same_seed_gives_the_same_rows(tables):
+    assert generated_rows() == tables
+
+
+def test_different_seeds_give_different_rows(tables):
+    assert generated_rows(seed=1) != tables
+
+
+def test_chunk_size_doesnt_change_the_rows(tables):
+    assert generated_rows(chunk_size=7) == tables
+
+
+def test_row_counts_follow_the_scale(tables):
+    counts = scaled_counts(3)
+    for table in ("customer", "trip", "orders", "rental", "rental_inventory"):
+        assert len(tables[table]) == counts[table]
+
+
+def test_rows_fit_the_columns(tables):
+    sizes = column_sizes()
+    for table, rows in tables.items():
+        columns = TABLE_COLUMNS[table]
+        for row in rows:
+            assert len(row) == len(columns)
+            for column, value in zip(columns, row):
+                if isinstance(value, str) and column in sizes[table]:
+                    assert len(value) <= sizes[table][column], (table, column, value)
+
+
+def test_ids_are_numbered_from_the_start_ids():
+    tables = generated_rows(scale=1, start_ids={"customer": 101, "trip": 51})
+    assert [row[0] for row in tables["customer"]] == list(range(101, 101 + len(tables["customer"])))
+    assert [row[0] for row in tables["trip"]] == list(range(51, 51 + len(tables["trip"])))
+    customers = {row[0] for row in tables["customer"]}
+    assert {row[-1] for row in tables["trip"]} <= customers
+
+
+def test_ids_are_unique(tables):
+    for table in ID_TABLES:
+        ids = [row[0] for row in tables[table]]
+        assert len(ids) == len(set(ids)), table
+
+
+def test_foreign_keys_point_at_generated_rows(tables):
+    ids = {table: {row[0] for row in tables[table]} for table in ID_TABLES}
+    products = {(row[0], row[1]) for row in tables["order_inventory"]}
+    member = TABLE_COLUMNS["trip_member"]
+    for row in tables["trip_member"]:
+        assert row[member.index("trip_id")] in ids["trip"]
+    for row in tables["order_item"]:
+        assert (row[1], row[2]) in products
+        assert row[-1] in ids["orders"]
+    for row in tables["rental_history"]:
+        assert row[1] in ids["rental_inventory"]
+        assert row[2] in ids["rental"]
+
+
+def test_trip_members_satisfy_check_cust_id(tables):
+    columns = TABLE_COLUMNS["trip_member"]
+    contact = [columns.index(column) for column in ("first_name", "last_name", "email", "phone_number")]
+    cust_id = columns.index("cust_id")
+    for row in tables["trip_member"]:
+        if row[cust_id] is None:
+            assert all(row[i] is not None for i in contact)
+        else:
+            assert all(row[i] is None for i in contact)
+
+
+def test_dates_are_in_the_data_range(tables):
+    for row in tables["orders"]:
+        assert DATA_START <= row[1] <= DATA_END
+    for row in tables["trip"]:
+        assert DATA_START <= row[2] <= row[3]
+    assert all(isinstance(row[1], date) for row in tables["rental"])
@@ -0,0 +1,91 @@
+"""
+Tests for report_arrays: the columnar fetch and the NumPy pivot, checked against
+the list-based time_buckets.pivot_template
+"""
+
+import random
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from report_arrays import fetch_columns, bucket_numbers, pivot_columns
+from time_buckets import GRANULARITIES, generate_template, pivot_template
+
+DTYPES = ("O", "datetime64[D]", "int64")
+
+
+# Class standing in for an unbuffered cursor holding a result
+class FakeCursor:
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def fetchmany(self, size=1):
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+
+# Function to make up (series, bucket start, value) rows like a report query returns
+def report_rows(granularity, seed=0):
+    rng = random.Random(seed)
+    starts = generate_template(date(2021, 2, 1), date(2024, 11, 30), granularity)['start']
+    rows = [(series, start, Decimal(rng.randint(1, 50)))
+            for series in ("order", "rental", "Asia") for start in starts if rng.random() < 0.6]
+    return sorted(rows)
+
+
+def test_fetch_columns_reads_every_chunk():
+    rows = report_rows("quarter")
+    series, starts, values = fetch_columns(FakeCursor(rows), DTYPES, chunk_size=4)
+    assert list(series) == [row[0] for row in rows]
+    assert starts.dtype == np.dtype("datetime64[D]")
+    assert list(starts.astype(object)) == [row[1] for row in rows]
+    assert values.dtype == np.int64
+    assert list(values) == [int(row[2]) for row in rows]
+
+
+def test_fetch_columns_of_an_empty_result():
+    columns = fetch_columns(FakeCursor([]), DTYPES)
+    assert [len(column) for column in columns] == [0, 0, 0]
+    assert [column.dtype for column in columns] == [np.dtype(dtype) for dtype in DTYPES]
+
+
+def test_neighbouring_buckets_get_neighbouring_numbers():
+    for granularity in GRANULARITIES:
+        starts = np.array(generate_template(date(2023, 11, 1), date(2025, 2, 1), granularity)['start'],
+                          dtype="datetime64[D]")
+        assert list(np.diff(bucket_numbers(starts, granularity))) == [1] * (len(starts) - 1)
+
+
+def test_weeks_start_on_monday():
+    days = np.array([date(2025, 5, 11), date(2025, 5, 12), date(2025, 5, 18)], dtype="datetime64[D]")
+    sunday, monday, next_sunday = bucket_numbers(days, "week")
+    assert monday == sunday + 1
+    assert next_sunday == monday
+
+
+@pytest.mark.parametrize("granularity", GRANULARITIES)
+def test_pivot_matches_pivot_template(granularity):
+    rows = report_rows(granularity)
+    template, results = pivot_columns(*fetch_columns(FakeCursor(rows), DTYPES), granularity)
+
+    expected_template = generate_template(min(row[1] for row in rows), max(row[1] for row in rows), granularity)
+    expected = pivot_template(expected_template, rows)
+    assert template['bucket'] == expected_template['bucket']
+    assert template['start'] == expected_template['start']
+    assert list(template['number']) == [0] * len(expected_template['bucket'])
+    assert set(results) == set(expected)
+    for series in expected:
+        assert list(results[series]['number']) == expected[series]['number']
+
+
+def test_pivot_adds_up_repeated_cells():
+    series = np.array(["Asia", "Asia", "Africa"], dtype=object)
+    starts = np.array([date(2025, 1, 1), date(2025, 1, 1), date(2025, 4, 1)], dtype="datetime64[D]")
+    template, results = pivot_columns(series, starts, np.array([2, 3, 4]), "quarter")
+    assert template['bucket'] == ["2025Q1", "2025Q2"]
+    assert list(results["Asia"]['number']) == [5, 0]
+    assert list(results["Africa"]['number']) == [0, 4]
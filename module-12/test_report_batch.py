@@ -0,0 +1,68 @@
+"""
+Tests for report_batch: the command line and the CSV/JSON value conversion
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+import report_batch
+from report_batch import REPORTS, main, plain
+
+
+# Function to run main() with run_report replaced by one that only records what it was asked for
+def run_main(monkeypatch, argv):
+    ran = []
+
+    def fake_run_report(report, out_dir, formats, charts, use_rollups, pool_size):
+        ran.append(report)
+        return report, [], 0, 0.0
+
+    monkeypatch.setattr(report_batch, "run_report", fake_run_report)
+    return main(argv), ran
+
+
+def test_runs_every_report_when_none_are_named(monkeypatch, tmp_path):
+    status, ran = run_main(monkeypatch, ["--out", str(tmp_path)])
+    assert status == 0
+    assert sorted(ran) == sorted(REPORTS)
+
+
+def test_runs_only_the_named_reports_once_each(monkeypatch, tmp_path):
+    status, ran = run_main(monkeypatch, ["trip", "trip", "--out", str(tmp_path)])
+    assert status == 0
+    assert ran == ["trip"]
+
+
+def test_rejects_unknown_reports(monkeypatch, tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        run_main(monkeypatch, ["trips", "--out", str(tmp_path)])
+    assert exit_info.value.code == 2
+    assert "trips" in capsys.readouterr().err
+
+
+def test_a_failed_report_does_not_stop_the_others(monkeypatch, tmp_path, capsys):
+    def fake_run_report(report, out_dir, formats, charts, use_rollups, pool_size):
+        if report == "equipment":
+            raise OSError("disk full")
+        return report, [], 0, 0.0
+
+    monkeypatch.setattr(report_batch, "run_report", fake_run_report)
+    assert main(["--out", str(tmp_path)]) == 1
+    output = capsys.readouterr()
+    assert "equipment: failed: disk full" in output.err
+    assert all(f"{report}: 0 rows" in output.out for report in REPORTS if report != "equipment")
+
+
+def test_plain_values():
+    assert plain(Decimal("12")) == 12 and isinstance(plain(Decimal("12")), int)
+    assert plain(Decimal("1.5")) == 1.5
+    assert plain(date(2025, 4, 1)) == "2025-04-01"
+    assert plain("Asia") == "Asia"
+
+
+def test_plain_numpy_values():
+    np = pytest.importorskip("numpy")
+    value = plain(np.int64(7))
+    assert value == 7 and type(value) is int
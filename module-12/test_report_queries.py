@@ -0,0 +1,46 @@
+"""
+Tests for report_queries: the trip report's single grouped query and its pivot
+"""
+
+from datetime import date
+
+from report_queries import trip_report_data
+
+
+# Class standing in for a cursor; it records each statement and hands back fixed rows
+class FakeCursor:
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def fetchmany(self, size=1):
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+
+ROWS = [("Africa", date(2025, 1, 1), 3), ("Africa", date(2025, 7, 1), 1), ("Asia", date(2025, 7, 1), 2)]
+
+
+def test_trip_report_is_one_query_pivoted_by_continent():
+    for use_rollups in (True, False):
+        cursor = FakeCursor(ROWS)
+        template, results = trip_report_data(cursor, use_rollups=use_rollups)
+        assert len(cursor.statements) == 1
+        assert list(template['bucket']) == ["2025Q1", "2025Q2", "2025Q3"]
+        assert list(results) == ["Africa", "Asia"]
+        assert list(results["Africa"]['number']) == [3, 0, 1]
+        assert list(results["Asia"]['number']) == [0, 0, 2]
+
+
+def test_trip_report_of_no_trips():
+    template, results = trip_report_data(FakeCursor([]))
+    assert template is None
+    assert results == {}
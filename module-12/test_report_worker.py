@@ -0,0 +1,57 @@
+"""
+Tests for report_worker: every job, and the worker itself, ends in a message to the main thread
+"""
+
+import time
+
+from report_worker import ReportWorker
+
+
+# Class standing in for a mysql.connector connection and its cursor
+class FakeConnection:
+    connection_id = 1
+
+    def cursor(self, *args, **kwargs):
+        return self
+
+    def close(self):
+        pass
+
+
+# Function to collect the worker's messages until one of the given kind turns up
+def wait_for(worker, kind, timeout=5.0):
+    messages = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        messages += worker.poll()
+        if any(message[0] == kind for message in messages):
+            return messages
+        time.sleep(0.01)
+    raise AssertionError(f"no {kind} message in {messages}")
+
+
+def test_a_failed_connect_is_posted():
+    def connect():
+        raise TimeoutError("no connection free in the pool")
+
+    worker = ReportWorker(connect)
+    worker.start()
+    (message,) = wait_for(worker, "error")
+    assert message[0] == "error" and message[1] is None
+    assert isinstance(message[2], TimeoutError)
+
+
+def test_a_failed_job_is_posted_and_the_next_one_still_runs(monkeypatch):
+    monkeypatch.setattr(ReportWorker, "_make_cursor", lambda self, connection: connection.cursor())
+
+    def broken(cursor, progress):
+        raise ValueError("bad chart")
+
+    worker = ReportWorker(FakeConnection)
+    worker.start()
+    first = worker.submit(broken)
+    second = worker.submit(lambda cursor, progress: "result")
+    messages = wait_for(worker, "done")
+    worker.stop()
+    assert ("done", second, "result") in messages
+    assert [(kind, job_id) for kind, job_id, payload in messages if kind == "error"] == [("error", first)]
@@ -0,0 +1,84 @@
+"""
+Tests for time_buckets: bucket numbering, labels and the zero-filled templates
+"""
+
+from datetime import date
+
+import pytest
+
+from time_buckets import (GRANULARITIES, bucket_start, bucket_start_sql, next_bucket, bucket_label,
+                          generate_template, fill_template, pivot_template)
+
+
+@pytest.mark.parametrize("day, granularity, start", [
+    (date(2025, 5, 17), "year", date(2025, 1, 1)),
+    (date(2025, 5, 17), "quarter", date(2025, 4, 1)),
+    (date(2025, 12, 31), "quarter", date(2025, 10, 1)),
+    (date(2025, 5, 17), "month", date(2025, 5, 1)),
+    (date(2025, 5, 17), "week", date(2025, 5, 12)),  # a Saturday; its week starts on Monday the 12th
+    (date(2025, 1, 1), "week", date(2024, 12, 30)),  # weeks run across the new year
+])
+def test_bucket_start(day, granularity, start):
+    assert bucket_start(day, granularity) == start
+
+
+@pytest.mark.parametrize("start, granularity, following", [
+    (date(2025, 1, 1), "year", date(2026, 1, 1)),
+    (date(2025, 10, 1), "quarter", date(2026, 1, 1)),
+    (date(2025, 12, 1), "month", date(2026, 1, 1)),
+    (date(2024, 12, 30), "week", date(2025, 1, 6)),
+])
+def test_next_bucket(start, granularity, following):
+    assert next_bucket(start, granularity) == following
+
+
+@pytest.mark.parametrize("start, granularity, label", [
+    (date(2025, 1, 1), "year", "2025"),
+    (date(2025, 4, 1), "quarter", "2025Q2"),
+    (date(2025, 3, 1), "month", "2025-03"),
+    (date(2024, 12, 30), "week", "2025W01"),  # ISO week 1 of 2025 starts in 2024
+])
+def test_bucket_label(start, granularity, label):
+    assert bucket_label(start, granularity) == label
+
+
+def test_unknown_granularity():
+    for function in (bucket_start, bucket_label):
+        with pytest.raises(ValueError):
+            function(date(2025, 1, 1), "decade")
+    with pytest.raises(ValueError):
+        bucket_start_sql("trip_end", "decade")
+
+
+def test_bucket_start_sql_covers_every_granularity():
+    for granularity in GRANULARITIES:
+        assert "trip_end" in bucket_start_sql("trip_end", granularity)
+
+
+def test_template_covers_every_bucket_between_the_dates():
+    template = generate_template(date(2024, 11, 5), date(2025, 4, 2), "quarter")
+    assert template['bucket'] == ["2024Q4", "2025Q1", "2025Q2"]
+    assert template['start'] == [date(2024, 10, 1), date(2025, 1, 1), date(2025, 4, 1)]
+    assert template['number'] == [0, 0, 0]
+
+
+def test_template_of_a_single_bucket():
+    template = generate_template(date(2025, 2, 3), date(2025, 2, 3), "month")
+    assert template['bucket'] == ["2025-02"]
+
+
+def test_fill_template_leaves_the_template_alone():
+    template = generate_template(date(2025, 1, 1), date(2025, 12, 31), "quarter")
+    filled = fill_template(template, [(date(2025, 4, 1), 7)])
+    assert filled['number'] == [0, 7, 0, 0]
+    assert template['number'] == [0, 0, 0, 0]
+
+
+def test_pivot_template_splits_rows_by_series():
+    template = generate_template(date(2025, 1, 1), date(2025, 9, 30), "quarter")
+    rows = [("Africa", date(2025, 1, 1), 3), ("Asia", date(2025, 7, 1), 2), ("Africa", date(2025, 7, 1), 1)]
+    pivoted = pivot_template(template, rows)
+    assert list(pivoted) == ["Africa", "Asia"]
+    assert pivoted["Africa"]['number'] == [3, 0, 1]
+    assert pivoted["Asia"]['number'] == [0, 0, 2]
+    assert pivoted["Asia"]['bucket'] == template['bucket']
@@ -0,0 +1,124 @@
+"""
+Outland Adventures report helpers: time bucketing
+
+Reports group rows into time buckets (years, quarters, months or ISO weeks).
+Rather than spelling out one CASE branch per bucket, the SQL side derives the
+first date of each row's bucket arithmetically, so the statement and the cost
+per row are the same no matter how many buckets a report spans. The Python
+side builds the matching list of buckets and zero-fills it with dictionary
+lookups keyed by those bucket start dates.
+"""
+
+from datetime import date, timedelta
+
+# Supported granularities, smallest to largest
+GRANULARITIES = ("week", "month", "quarter", "year")
+
+
+# Function to get the SQL expression for the first date of a column's bucket
+def bucket_start_sql(column, granularity="quarter"):
+
+    # Column names can't be sent as query parameters, so they are spliced in;
+    # only ever pass a known column name here, never user input.
+    if granularity == "year":
+        return f"makedate(year({column}), 1)"
+    elif granularity == "quarter":
+        return f"makedate(year({column}), 1) + interval (quarter({column}) - 1) quarter"
+    elif granularity == "month":
+        return f"{column} - interval (dayofmonth({column}) - 1) day"
+    elif granularity == "week":
+        # weekday() is 0 for Monday, matching ISO weeks
+        return f"{column} - interval weekday({column}) day"
+    raise ValueError(f"Unknown granularity '{granularity}', expected one of {GRANULARITIES}")
+
+
+# Function to get the first date of the bucket a date falls in; mirrors bucket_start_sql
+def bucket_start(day, granularity="quarter"):
+    if granularity == "year":
+        return date(day.year, 1, 1)
+    elif granularity == "quarter":
+        return date(day.year, day.month - (day.month - 1) % 3, 1)
+    elif granularity == "month":
+        return date(day.year, day.month, 1)
+    elif granularity == "week":
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Unknown granularity '{granularity}', expected one of {GRANULARITIES}")
+
+
+# Function to get the start of the bucket after the one starting on start
+def next_bucket(start, granularity="quarter"):
+    if granularity == "year":
+        return date(start.year + 1, 1, 1)
+    elif granularity == "week":
+        return start + timedelta(days=7)
+
+    # Months and quarters just step forward 1 or 3 months, rolling into the next year
+    step = 3 if granularity == "quarter" else 1
+    month = start.month + step
+    if month > 12:
+        return date(start.year + 1, month - 12, 1)
+    return date(start.year, month, 1)
+
+
+# Function to get the display label of the bucket starting on start
+def bucket_label(start, granularity="quarter"):
+    if granularity == "year":
+        return str(start.year) # e.g. 2025
+    elif granularity == "quarter":
+        return f"{start.year}Q{(start.month - 1) // 3 + 1}" # e.g. 2025Q1
+    elif granularity == "month":
+        return f"{start.year}-{start.month:02d}" # e.g. 2025-03
+    elif granularity == "week":
+        iso_year, iso_week, _ = start.isocalendar()
+        return f"{iso_year}W{iso_week:02d}" # e.g. 2025W09
+    raise ValueError(f"Unknown granularity '{granularity}', expected one of {GRANULARITIES}")
+
+
+# Function to build a zero-filled template covering every bucket between two dates
+def generate_template(min_date, max_date, granularity="quarter"):
+
+    # 'bucket' holds the labels shown in tables/charts, 'start' the bucket start
+    # dates that query rows are matched on, and 'number' one 0 per bucket so that
+    # buckets with no rows still show up in the report
+    template = {'bucket': [], 'start': [], 'number': []}
+    start = bucket_start(min_date, granularity)
+    last = bucket_start(max_date, granularity)
+    while start <= last:
+        template['bucket'].append(bucket_label(start, granularity))
+        template['start'].append(start)
+        template['number'].append(0)
+        start = next_bucket(start, granularity)
+    return template
+
+
+# Function to map each bucket start date in a template to its position
+def bucket_index(template):
+    return {start: i for i, start in enumerate(template['start'])}
+
+
+# Function to copy a template and fill in (bucket start, value) rows
+def fill_template(template, rows, index=None):
+
+    # The index can be passed in when filling several series from one template
+    if index is None:
+        index = bucket_index(template)
+
+    # Labels and start dates are never mutated, so only the numbers need copying
+    # (a list, or a NumPy array for templates from report_arrays)
+    filled = {'bucket': template['bucket'], 'start': template['start'],
+              'number': template['number'].copy()}
+    for start, value in rows:
+        filled['number'][index[start]] = value
+    return filled
+
+
+# Function to split (series, bucket start, value) rows into one filled template per series
+def pivot_template(template, rows):
+    index = bucket_index(template)
+
+    # Group the rows by series first, keeping the order series first appear in
+    series_rows = {}
+    for series, start, value in rows:
+        series_rows.setdefault(series, []).append((start, value))
+
+    return {series: fill_template(template, pairs, index) for series, pairs in series_rows.items()}
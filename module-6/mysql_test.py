@@ -3,28 +3,22 @@
 # 4 February 2025
 
 """ import statements """
-import mysql.connector # to connect
+import os
+import sys
+import mysql.connector # for its errors
 from mysql.connector import errorcode
 
-import dotenv # to use .env file
-from dotenv import dotenv_values
-
-#using our .env file
-secrets = dotenv_values(r"..\.env")
+# shared_db (in the parent folder) reads our .env file and hands out pooled connections
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+from shared_db import load_config, get_connection
 
 """ database config object """
-config = {
-    "user": secrets["USER"],
-    "password": secrets["PASSWORD"],
-    "host": secrets["HOST"],
-    "database": secrets["DATABASE"],
-    "raise_on_warnings": True #not in .env file
-}
+config = load_config(".env")
 
 try:
     """ try/catch block for handling potential MySQL database errors """ 
 
-    db = mysql.connector.connect(**config) # connect to the movies database 
+    db = get_connection(".env", pool_size=1) # connect to the movies database 
     
     # output the connection status 
     print("\n  Database user {} connected to MySQL on host {} with database {}".format(config["user"], config["host"], config["database"]))
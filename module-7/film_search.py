@@ -0,0 +1,124 @@
+"""
+Searching the movies catalogue
+
+search_films() finds films by any mix of:
+
+    name / director   names starting with some text (LIKE 'text%', which uses the
+                      B-tree index on the column, so it never scans the table)
+    words             words anywhere in the name or director, through the FULLTEXT
+                      index; the best matches come first. Words the index leaves
+                      out (stopwords like "the", and words under 3 letters) are
+                      skipped, and a search made up only of those looks for the
+                      words with LIKE '%word%' instead, which reads every film
+    runtime           a range of minutes
+    released          a range of release years
+
+The indexes are added by module-8/movies_upgrade.sql. Results are read off
+an unbuffered cursor a few at a time and handed back as they arrive, and a
+search never returns more than its limit, however big the catalogue is.
+"""
+
+import re
+
+# Columns returned for each film
+COLUMNS = "film_name, film_director, film_runtime, film_releaseDate"
+
+# Characters with a meaning in MySQL's boolean full-text syntax; they're dropped from the words
+FULLTEXT_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+# Words the FULLTEXT index doesn't hold: InnoDB's default stopwords, and words shorter than
+# innodb_ft_min_token_size (3 by default). Requiring one of them (+word) would match nothing.
+FULLTEXT_STOPWORDS = {"a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en", "for", "from",
+                      "how", "i", "in", "is", "it", "la", "of", "on", "or", "that", "the", "this", "to",
+                      "was", "what", "when", "where", "who", "will", "with", "und", "www"}
+FULLTEXT_MIN_LENGTH = 3
+
+
+# Function to escape text for a LIKE pattern, so % and _ in it are matched as themselves
+def like_prefix(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+# Function to split search words, leaving out full-text operator characters
+def search_words(words):
+    return FULLTEXT_OPERATORS.sub(" ", words).split()
+
+
+# Function to check whether the FULLTEXT index holds a word
+def indexed_word(word):
+    return len(word) >= FULLTEXT_MIN_LENGTH and word.lower() not in FULLTEXT_STOPWORDS
+
+
+# Function to turn search words into a boolean full-text query where every indexed word has to
+# appear, and a word also matches longer words it's the start of ("blade run" finds Blade Runner);
+# gives "" if none of the words are indexed
+def fulltext_query(words):
+    return " ".join(f"+{word}*" for word in search_words(words) if indexed_word(word))
+
+
+# Function to build the statement and parameters for a search; see search_films()
+def build_search(name=None, director=None, words=None, runtime=None, released=None, limit=50):
+    conditions = []
+    params = []
+    order = "film_name"
+    score = ""
+
+    if name:
+        conditions.append("film_name LIKE %s")
+        params.append(like_prefix(name))
+    if director:
+        conditions.append("film_director LIKE %s")
+        params.append(like_prefix(director))
+        if not name:
+            order = "film_director, film_name"
+    query = fulltext_query(words) if words else ""
+    if query:
+        # Both columns have to be given, in the same order as the FULLTEXT index
+        score = ", MATCH(film_name, film_director) AGAINST (%s IN BOOLEAN MODE) AS score"
+        conditions.append("MATCH(film_name, film_director) AGAINST (%s IN BOOLEAN MODE)")
+        params = [query] + params + [query]
+        order = "score DESC, film_name"
+    elif words:
+        # Only words the index doesn't hold (e.g. "of"), so each has to be looked for in the text
+        for word in search_words(words):
+            conditions.append("(film_name LIKE %s OR film_director LIKE %s)")
+            pattern = "%" + like_prefix(word)
+            params += [pattern, pattern]
+
+    # Ranges are (lowest, highest), either of which can be None for no limit that way. The
+    # release year is stored as text (e.g. "1997"), so it's compared as text; comparing it to
+    # a number would convert every row's year and skip the index.
+    for column, bounds, convert in (("film_runtime", runtime, int), ("film_releaseDate", released, str)):
+        low, high = bounds or (None, None)
+        if low is not None:
+            conditions.append(f"{column} >= %s")
+            params.append(convert(low))
+        if high is not None:
+            conditions.append(f"{column} <= %s")
+            params.append(convert(high))
+
+    sql = f"SELECT {COLUMNS}{score} FROM film"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += f" ORDER BY {order} LIMIT %s"
+    params.append(limit)
+    return sql, params
+
+
+# Function to search the films, yielding (name, director, runtime, release year) as the rows arrive;
+# cursor should be an ordinary (unbuffered) cursor
+def search_films(cursor, name=None, director=None, words=None, runtime=None, released=None, limit=50,
+                 batch_size=20):
+    sql, params = build_search(name, director, words, runtime, released, limit)
+    cursor.execute(sql, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row[:4]
+    finally:
+        # If the caller stops early, the rest of the (limited) result still has to be read
+        # before the connection can run anything else
+        cursor.fetchall()
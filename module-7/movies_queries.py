@@ -3,31 +3,60 @@
 # 16 February 2025
 
 import os
+import shlex
+import sys
 import mysql.connector as db
 from mysql.connector import errorcode
-from dotenv import dotenv_values
 
-# .env is in parent folder; this gets absolute path to parent folder
-# Did this so I don't have to move to file's folder for it to execute properly
-parent_dir = "\\".join(os.path.realpath(__file__).split("\\")[:-2])
-
-# .env file must be in parent folder for this to work
-# e.g. this script is in csd-310\module-7 and .env is in csd-310
-secrets = dotenv_values(parent_dir + "\\.env")
+# shared_db is in the parent folder; it finds the .env file there no matter which
+# folder the script is run from, and hands out pooled connections
+# e.g. this script is in csd-310/module-7 and .env and shared_db are in csd-310
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+from shared_db import load_config, get_connection
+
+# Film search, backed by the indexes in module-8/movies_upgrade.sql
+from film_search import search_films
+
+SEARCH_HELP = """
+  Search the films by any mix of:
+    name:ali            names starting with "ali"
+    director:scott      directors starting with "scott"
+    runtime:90-120      runtimes from 90 to 120 minutes (90- or -120 for open ranges)
+    released:1979-1990  films released from 1979 to 1990
+    limit:10            show at most 10 films (default 25)
+    other words         films with all of these words in their name or director
+  Use quotes for more than one word, e.g. name:"the fifth". Press Enter on its own to exit."""
+
+# Function to turn "90-120", "90-" or "-120" into a (lowest, highest) range
+def parse_range(text):
+    low, _, high = text.partition("-")
+    return (int(low) if low.strip() else None, int(high) if high.strip() else None)
+
+# Function to turn a search line into search_films() arguments
+def parse_search(line):
+    options = {"limit": 25}
+    words = []
+    for term in shlex.split(line):
+        key, _, value = term.partition(":")
+        if key in ("name", "director") and value:
+            options[key] = value
+        elif key in ("runtime", "released") and value:
+            options[key] = parse_range(value)
+        elif key == "limit" and value.isdigit():
+            options["limit"] = int(value)
+        else:
+            words.append(term)
+    if words:
+        options["words"] = " ".join(words)
+    return options
 
 """ database config object """
-config = {
-    "user": secrets["USER"],
-    "password": secrets["PASSWORD"],
-    "host": secrets["HOST"],
-    "database": secrets["DATABASE"],
-    "raise_on_warnings": True #not in .env file
-}
+config = load_config(".env")
 
 try:
     """ try/catch block for handling potential MySQL database errors """ 
 
-    movies = db.connect(**config) # connect to the movies database 
+    movies = get_connection(".env", pool_size=1) # connect to the movies database 
     
     # output the connection status 
     print("\n  Database user {} connected to MySQL on host {} with database {}".format(config["user"], config["host"], config["database"]))
@@ -83,8 +112,26 @@ try:
         print(f"Director: {film[1]}")
         print()
     
-    # Control flow of program with input "breaks"
-    input("\n  Queries complete, press Enter to exit...\n")
+    # Search mode: films are printed as they come back from MySQL
+    print("\n  Queries complete!")
+    print(SEARCH_HELP)
+    while True:
+        line = input("\n  Search: ").strip()
+        if not line:
+            break
+        try:
+            options = parse_search(line)
+        except ValueError as err:
+            print(f"  Sorry, I didn't understand that ({err})")
+            continue
+        found = 0
+        for film in search_films(cursor, **options):
+            found += 1
+            print(f"Film Name: {film[0]}")
+            print(f"Director: {film[1]}")
+            print(f"Runtime: {film[2]} minutes, released {film[3]}")
+            print()
+        print(f"  {found} film{'' if found == 1 else 's'} found")
 
 except db.Error as err:
     """ on error code """
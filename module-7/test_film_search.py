@@ -0,0 +1,92 @@
+"""
+Tests for film_search: building the search statements
+"""
+
+from film_search import COLUMNS, like_prefix, fulltext_query, build_search, search_films
+
+
+def test_like_prefix_escapes_wildcards():
+    assert like_prefix("Alien") == "Alien%"
+    assert like_prefix("100%_sure\\") == "100\\%\\_sure\\\\%"
+
+
+def test_fulltext_query_requires_every_word():
+    assert fulltext_query("blade run") == "+blade* +run*"
+
+
+def test_fulltext_query_drops_operators():
+    assert fulltext_query('"alien" -resurrection +(ridley)') == "+alien* +resurrection* +ridley*"
+
+
+def test_fulltext_query_skips_words_the_index_leaves_out():
+    assert fulltext_query("the lord of rings") == "+lord* +rings*"
+    assert fulltext_query("Up") == ""
+    assert fulltext_query("THE") == ""
+
+
+def test_search_with_nothing_lists_films_by_name():
+    sql, params = build_search()
+    assert sql == f"SELECT {COLUMNS} FROM film ORDER BY film_name LIMIT %s"
+    assert params == [50]
+
+
+def test_search_by_name_and_director_prefixes():
+    sql, params = build_search(name="ali", director="scott", limit=10)
+    assert "WHERE film_name LIKE %s AND film_director LIKE %s ORDER BY film_name" in sql
+    assert params == ["ali%", "scott%", 10]
+
+
+def test_search_by_director_orders_by_director():
+    sql, params = build_search(director="scott")
+    assert sql.endswith("ORDER BY film_director, film_name LIMIT %s")
+
+
+def test_search_by_words_uses_the_fulltext_index():
+    sql, params = build_search(words="blade run", name="b")
+    assert sql.count("MATCH(film_name, film_director) AGAINST (%s IN BOOLEAN MODE)") == 2
+    assert sql.endswith("ORDER BY score DESC, film_name LIMIT %s")
+    # The score's parameter comes before the WHERE clause's, the MATCH condition's after the name's
+    assert params == ["+blade* +run*", "b%", "+blade* +run*", 50]
+
+
+def test_search_by_unindexed_words_falls_back_to_like():
+    sql, params = build_search(words="of the")
+    assert "MATCH" not in sql
+    assert sql.count("(film_name LIKE %s OR film_director LIKE %s)") == 2
+    assert params == ["%of%", "%of%", "%the%", "%the%", 50]
+
+
+def test_search_by_ranges():
+    sql, params = build_search(runtime=(90, None), released=(1979, 1990))
+    assert "film_runtime >= %s" in sql and "film_runtime <= %s" not in sql
+    assert "film_releaseDate >= %s AND film_releaseDate <= %s" in sql
+    # Release years are stored as text, so they're compared as text
+    assert params == [90, "1979", "1990", 50]
+
+
+# Class standing in for an unbuffered cursor
+class FakeCursor:
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.executed = []
+
+    def execute(self, sql, params):
+        self.executed.append((sql, params))
+
+    def fetchmany(self, size=1):
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+    def fetchall(self):
+        rest, self.rows = self.rows, []
+        return rest
+
+
+def test_search_films_drops_the_score_and_reads_the_rest_when_stopped_early():
+    cursor = FakeCursor([("Alien", "Ridley Scott", 117, "1979", 1.5), ("Aliens", "James Cameron", 137, "1986", 1.2),
+                         ("Alien 3", "David Fincher", 114, "1992", 1.0)])
+    results = search_films(cursor, words="alien", batch_size=2)
+    assert next(results) == ("Alien", "Ridley Scott", 117, "1979")
+    results.close()
+    assert cursor.rows == []
@@ -0,0 +1,158 @@
+"""
+Studio and genre name -> id lookups for the movies database
+
+Films refer to their studio and genre by id, but changes come in by name.
+Instead of looking each name up with a subquery in every INSERT or UPDATE,
+DimensionCache reads the whole (small) studio and genre tables once and
+hands out plain ids. Names it doesn't know are added in one multi-row
+INSERT and their new ids read back in one SELECT.
+
+A table's names are trusted for recheck_after seconds; after that they are
+reused only if the table's change markers (its highest id and the time
+InnoDB last wrote to it) still match, and re-read otherwise. The update time
+only counts whole seconds, so markers read in the same second as a write
+never match and the names are re-read at the next recheck. invalidate()
+drops them straight away, e.g. after a rollback.
+
+The name columns should have unique indexes (see movies_upgrade.sql), so a
+name always means one row and adding one twice can't make a duplicate. Like
+those indexes (the columns' collation ignores case and accents), the cache
+treats "SciFi", "scifi" and "SCIFI" as the same name.
+"""
+
+import time
+import unicodedata
+
+from mysql.connector import Error
+
+# Tables looked up by name: table -> (id column, name column)
+DIMENSIONS = {"studio": ("studio_id", "studio_name"), "genre": ("genre_id", "genre_name")}
+
+
+# Function to get the key a name is cached under: the name without case or accents, the way
+# MySQL's default (_ai_ci) collation compares names
+def name_key(name):
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+# Class to map studio and genre names to ids, adding the names that don't exist yet
+class DimensionCache:
+
+    def __init__(self, connection, recheck_after=2.0):
+        self.connection = connection
+        self.recheck_after = recheck_after # seconds a table's names are trusted without rechecking
+        self._ids = {}      # table -> {name_key(name): id}
+        self._names = {}    # table -> {name_key(name): name as the table has it}
+        self._markers = {}  # table -> change markers when its names were read
+        self._checked = {}  # table -> time its names were read or last rechecked
+        self._session_ready = False
+
+    # Method to get the ids of some names, adding any missing ones to the table
+    # unless create is False (then they're left out of the result); the result is
+    # keyed by the names as given, whatever case the table has them in
+    def ids(self, table, names, create=True):
+        names = list(dict.fromkeys(names))
+        known = self._current(table)
+        missing = {}
+        for name in names:
+            if name_key(name) not in known:
+                missing.setdefault(name_key(name), name) # the first spelling of a new name is the one added
+        missing = list(missing.values())
+        if missing and create:
+            self._add(table, missing)
+        return {name: known[name_key(name)] for name in names if name_key(name) in known}
+
+    # Method to get the id of one name, adding it if it's missing unless create is False
+    def id_of(self, table, name, create=True):
+        return self.ids(table, [name], create).get(name)
+
+    # Method to get a name as the table has it (e.g. "SciFi" for "scifi"), or as given if it's
+    # not known
+    def stored_name(self, table, name):
+        return self._names.get(table, {}).get(name_key(name), name)
+
+    # Method to record the id of a name this program has just added itself
+    def remember(self, table, name, new_id):
+        if table in self._ids:
+            self._ids[table][name_key(name)] = new_id
+            self._names[table][name_key(name)] = name
+
+    # Method to forget what's known about a table (or every table), so it's read again next time
+    def invalidate(self, table=None):
+        for name in ([table] if table is not None else list(DIMENSIONS)):
+            self._ids.pop(name, None)
+            self._names.pop(name, None)
+            self._markers.pop(name, None)
+            self._checked.pop(name, None)
+
+    # Method to get a table's names, re-reading them if the table has changed
+    def _current(self, table):
+        if table in self._ids and time.monotonic() - self._checked[table] >= self.recheck_after:
+            current = self._fetch_markers(table)
+            if current is not None and current == self._markers[table]:
+                self._checked[table] = time.monotonic()
+            else:
+                self.invalidate(table)
+        if table not in self._ids:
+            self._load(table)
+        return self._ids[table]
+
+    # Method to read all of a table's names; the markers are read first so that a change
+    # made in between is picked up by the next recheck
+    def _load(self, table):
+        key, name = DIMENSIONS[table]
+        markers = self._fetch_markers(table)
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"SELECT {key}, {name} FROM {table}")
+            rows = cursor.fetchall()
+            self._ids[table] = {name_key(row[1]): row[0] for row in rows}
+            self._names[table] = {name_key(row[1]): row[1] for row in rows}
+        finally:
+            cursor.close()
+        self._markers[table] = markers
+        self._checked[table] = time.monotonic()
+
+    # Method to add names to a table in one statement and read back their ids
+    def _add(self, table, names):
+        key, name = DIMENSIONS[table]
+        cursor = self.connection.cursor()
+        try:
+            # A name someone else added in the meantime (perhaps spelt with different case)
+            # is left as it is, that's what the unique index is for, and its id read back
+            # along with the new ones
+            cursor.executemany(f"INSERT INTO {table} ({name}) VALUES (%s) ON DUPLICATE KEY UPDATE {name} = {name}",
+                               [(value,) for value in names])
+            cursor.execute(f"SELECT {key}, {name} FROM {table} WHERE {name} IN ({', '.join(['%s'] * len(names))})",
+                           names)
+            for row in cursor.fetchall():
+                self._ids[table][name_key(row[1])] = row[0]
+                self._names[table][name_key(row[1])] = row[1]
+        finally:
+            cursor.close()
+
+    # Method to get a table's change markers: its highest id and InnoDB's last update time;
+    # gives None if the table was written to in the current second
+    def _fetch_markers(self, table):
+        cursor = self.connection.cursor()
+        try:
+            # MySQL 8 caches update_time for a day by default; turn that off for this session.
+            # Older servers don't have the setting, but don't cache either.
+            if not self._session_ready:
+                try:
+                    cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+                except Error:
+                    pass
+                self._session_ready = True
+            # The update time only counts whole seconds, so another write later in the same
+            # second wouldn't change it; the server's time is read too, to check it against
+            cursor.execute(f"""SELECT NOW(), (SELECT MAX({DIMENSIONS[table][0]}) FROM {table}),
+                               (SELECT update_time FROM information_schema.tables
+                                WHERE table_schema = DATABASE() AND table_name = %s)""", (table,))
+            now, max_id, update_time = cursor.fetchall()[0]
+            if update_time is not None and update_time >= now:
+                return None
+            return max_id, update_time
+        finally:
+            cursor.close()
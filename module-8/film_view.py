@@ -0,0 +1,188 @@
+"""
+Write-through film view for the movies database
+
+FilmView reads the film/genre/studio join once and keeps it in memory, keyed
+by film id. Studio and genre names are turned into ids by a DimensionCache
+(see dimension_cache.py), so the writes send plain ids. Inserts, updates and deletes go through the
+view: each is sent to the database, and once MySQL confirms it the view
+applies the same change to itself instead of re-reading the join. The films
+changed since they were last shown are remembered, so showing the result of
+a change costs the same however many films there are.
+
+The view can be checked against the database on demand with check(), and
+is checked automatically every check_every changes if that's set. Changes
+made in bulk with a MovieBatch (see movie_batch.py) are picked up by
+re-reading just the films the batch reports it changed.
+"""
+
+from dimension_cache import DimensionCache
+
+# Statements used by the view; values are always passed separately as parameters (%s) so the
+# statement text never changes, each one is prepared once, and a name with an apostrophe in it
+# can't break the query
+FILMS_SQL = "SELECT film.film_id, film_name, film_director, genre_name, studio_name FROM film "
+FILMS_SQL += "INNER JOIN genre ON film.genre_id = genre.genre_id "
+FILMS_SQL += "INNER JOIN studio ON film.studio_id = studio.studio_id"
+
+# The same join for some films only
+FILMS_BY_ID_SQL = FILMS_SQL + " WHERE film.film_id IN ({})"
+
+INSERT_STUDIO = "INSERT INTO studio (studio_name) VALUES (%s)"
+
+# Add a movie; studio_id and genre_id come from the DimensionCache
+INSERT_FILM = "INSERT INTO film (film_name, film_releaseDate, film_runtime, film_director, studio_id, "
+INSERT_FILM += "genre_id) VALUES (%s, %s, %s, %s, %s, %s)"
+
+UPDATE_FILM_GENRE = "UPDATE film SET genre_id = %s WHERE film_name = %s"
+
+DELETE_FILM = "DELETE FROM film WHERE film_name = %s"
+
+
+# Class for an in-memory copy of the film join that's kept up to date as films are changed
+class FilmView:
+
+    def __init__(self, cursor, check_every=None, dimensions=None):
+        # cursor (a PreparedCursor) is used for every read and write; check_every, if set, is
+        # the number of changes after which the view is checked against the database;
+        # dimensions is the DimensionCache to share with others, e.g. a MovieBatch
+        self.cursor = cursor
+        self.check_every = check_every
+        self.dimensions = dimensions or DimensionCache(cursor.connection)
+        self.chunk_size = 500 # most film ids put in one IN (...) list by refresh()
+        self.films = {}       # film id -> [name, director, genre name, studio name]
+        self._named = {}      # film name -> ids of the films with that name
+        self.changes = []     # (what happened, film id, film) since the last pop_changes()
+        self._writes = 0      # changes since the last check
+        self.load()
+
+    # Method to (re)read the whole join
+    def load(self):
+        self._set_films(self._read_films())
+        self._writes = 0
+
+    # Method to read the film join into a dictionary keyed by film id
+    def _read_films(self):
+        self.cursor.execute(FILMS_SQL)
+        return {row[0]: list(row[1:]) for row in self.cursor.fetchall()}
+
+    # Method to read some films from the film join, chunk_size ids at a time
+    def _read_films_by_id(self, film_ids):
+        films = {}
+        film_ids = sorted(film_ids)
+        for start in range(0, len(film_ids), self.chunk_size):
+            chunk = film_ids[start:start + self.chunk_size]
+            self.cursor.execute(FILMS_BY_ID_SQL.format(", ".join(["%s"] * len(chunk))), chunk)
+            films.update((row[0], list(row[1:])) for row in self.cursor.fetchall())
+        return films
+
+    # Methods to replace, add and remove films, keeping the name index in step
+    def _set_films(self, films):
+        self.films = {}
+        self._named = {}
+        for film_id, film in films.items():
+            self._put(film_id, film)
+
+    def _put(self, film_id, film):
+        self.films[film_id] = film
+        self._named.setdefault(film[0], set()).add(film_id)
+
+    def _drop(self, film_id):
+        film = self.films.pop(film_id, None)
+        if film is not None:
+            self._named[film[0]].discard(film_id)
+        return film
+
+    # Method to get the ids of the films with a given name
+    def ids_named(self, name):
+        return sorted(self._named.get(name, ()))
+
+    # Method to count a change, checking the view once check_every changes have been made
+    def _wrote(self):
+        self._writes += 1
+        if self.check_every is not None and self._writes >= self.check_every:
+            self.check()
+
+    # Method to add a studio
+    def add_studio(self, name):
+        self.cursor.execute(INSERT_STUDIO, (name,))
+        self.dimensions.remember("studio", name, self.cursor.lastrowid)
+        self._wrote()
+
+    # Method to add a film, given its studio and genre by name (added first if they're new); returns its id
+    def add_film(self, name, release_date, runtime, director, studio, genre):
+        studio_id = self.dimensions.id_of("studio", studio)
+        genre_id = self.dimensions.id_of("genre", genre)
+        self.cursor.execute(INSERT_FILM, (name, release_date, runtime, director, studio_id, genre_id))
+        film_id = self.cursor.lastrowid
+        # The view shows the studio and genre the way the tables spell them
+        self._put(film_id, [name, director, self.dimensions.stored_name("genre", genre),
+                            self.dimensions.stored_name("studio", studio)])
+        self.changes.append(("added", film_id, list(self.films[film_id])))
+        self._wrote()
+        return film_id
+
+    # Method to change the genre of every film with a given name (adding the genre if it's new)
+    def update_genre(self, film_name, genre):
+        self.cursor.execute(UPDATE_FILM_GENRE, (self.dimensions.id_of("genre", genre), film_name))
+        genre = self.dimensions.stored_name("genre", genre)
+        for film_id in self.ids_named(film_name):
+            self.films[film_id][2] = genre
+            self.changes.append(("updated", film_id, list(self.films[film_id])))
+        self._wrote()
+
+    # Method to delete every film with a given name
+    def delete_film(self, film_name):
+        self.cursor.execute(DELETE_FILM, (film_name,))
+        deleted = self.cursor.rowcount
+        film_ids = self.ids_named(film_name)
+        for film_id in film_ids:
+            self.changes.append(("removed", film_id, self._drop(film_id)))
+
+        # MySQL deleting a different number of films than the view had means the view was out of date
+        if deleted != len(film_ids):
+            self.check()
+        else:
+            self._wrote()
+
+    # Method to apply a MovieBatch, then re-read the films it changed; returns the batch's counts
+    def apply(self, batch, skip_failed=False):
+        counts, film_ids = batch.apply(skip_failed)
+        self.refresh(film_ids)
+        return counts
+
+    # Method to bring some films in the view in line with the database, re-reading only
+    # those; returns the ids of the films that differed
+    def refresh(self, film_ids):
+        films = self._read_films_by_id(film_ids)
+        differences = self._record_differences(films, film_ids)
+        for film_id in differences:
+            self._drop(film_id)
+            if film_id in films:
+                self._put(film_id, films[film_id])
+        return differences
+
+    # Method to get (and forget) the changes made since this was last called
+    def pop_changes(self):
+        changes, self.changes = self.changes, []
+        return changes
+
+    # Method to check the view against the database, bringing it back in line if it has
+    # drifted (e.g. someone else changed the films); returns the ids of the films that differed
+    def check(self):
+        films = self._read_films()
+        differences = self._record_differences(films, self.films.keys() | films.keys())
+        self._set_films(films)
+        self.dimensions.invalidate()
+        self._writes = 0
+        return differences
+
+    # Method to compare the view with films read from the database (film ids missing from
+    # them are films that no longer exist) and record what changed; returns the ids that differed
+    def _record_differences(self, films, film_ids):
+        differences = [film_id for film_id in film_ids if self.films.get(film_id) != films.get(film_id)]
+        for film_id in differences:
+            if film_id in films:
+                self.changes.append(("updated" if film_id in self.films else "added", film_id, films[film_id]))
+            else:
+                self.changes.append(("removed", film_id, self.films[film_id]))
+        return differences
@@ -0,0 +1,190 @@
+"""
+Transactional batches of changes to the movies database
+
+MovieBatch collects studio, genre and film inserts, genre updates and film
+deletes, then applies them all in one transaction with a single commit,
+instead of one autocommitted statement (and one commit) each. Changes are
+applied in the order they were added, with each run of the same kind of
+change sent together:
+
+    inserts   one executemany, which mysql.connector sends as multi-row INSERTs
+    updates   one UPDATE ... WHERE film_name IN (...) per genre
+    deletes   one DELETE ... WHERE film_name IN (...)
+
+Studio and genre names are turned into ids by a DimensionCache (see
+dimension_cache.py), which adds any that don't exist yet in one go before
+the films that use them, inside the same transaction.
+
+savepoint() starts a new section of the batch. Normally any error rolls the
+whole batch back; with apply(skip_failed=True) a section that fails is
+rolled back to its savepoint on its own and the rest of the batch carries
+on. Changes added before the first savepoint are never skipped.
+
+apply() also hands back the ids of the films the batch added, changed or
+deleted, so a FilmView only has to re-read those films.
+"""
+
+import re
+from itertools import groupby
+
+from mysql.connector import Error
+
+from dimension_cache import DimensionCache
+from film_view import INSERT_STUDIO, INSERT_FILM
+
+INSERT_GENRE = "INSERT INTO genre (genre_name) VALUES (%s)"
+UPDATE_FILMS_GENRE = "UPDATE film SET genre_id = %s WHERE film_name IN ({})"
+DELETE_FILMS = "DELETE FROM film WHERE film_name IN ({})"
+
+# Ids of the films with some names; FOR UPDATE locks them so that they're the films the
+# following UPDATE or DELETE changes
+FILM_IDS_NAMED = "SELECT film_id FROM film WHERE film_name IN ({}) FOR UPDATE"
+
+# Ids of the films just added by a multi-row INSERT, which are numbered from its first id on
+FILM_IDS_ADDED = "SELECT film_id FROM film WHERE film_id >= %s AND film_name IN ({})"
+
+# Statement and table for each kind of studio/genre insert
+DIMENSION_INSERTS = {"add_studio": (INSERT_STUDIO, "studio"), "add_genre": (INSERT_GENRE, "genre")}
+
+# Kinds of change, in the order their counts are reported
+OPERATIONS = ("add_studio", "add_genre", "add_film", "update_genre", "delete_film")
+
+
+# Class to collect changes and apply them in one transaction
+class MovieBatch:
+
+    def __init__(self, connection, chunk_size=500, dimensions=None):
+        # chunk_size is the most film names put in one IN (...) list; dimensions is the
+        # DimensionCache to share with others, e.g. a FilmView
+        self.connection = connection
+        self.chunk_size = chunk_size
+        self.dimensions = dimensions or DimensionCache(connection)
+        self.sections = [(None, [])] # (savepoint name, [(kind of change, values)])
+        self.counts = {}             # kind of change -> rows changed by the last apply()
+        self.film_ids = set()        # ids of the films added, changed or deleted by the last apply()
+        self.failed = []             # (savepoint name, error) of the sections skipped by the last apply()
+
+    # Methods to add changes to the batch
+    def add_studio(self, name):
+        self._add("add_studio", (name,))
+
+    def add_genre(self, name):
+        self._add("add_genre", (name,))
+
+    def add_film(self, name, release_date, runtime, director, studio, genre):
+        self._add("add_film", (name, release_date, runtime, director, studio, genre))
+
+    def update_genre(self, film_name, genre):
+        self._add("update_genre", (film_name, genre))
+
+    def delete_film(self, film_name):
+        self._add("delete_film", (film_name,))
+
+    def _add(self, kind, values):
+        self.sections[-1][1].append((kind, values))
+
+    # Method to start a new section of the batch, which can be rolled back on its own
+    def savepoint(self, name=None):
+        name = name or f"batch_{len(self.sections)}"
+        if not re.fullmatch(r"[A-Za-z_]\w*", name):
+            raise ValueError(f"{name!r} can't be used as a savepoint name")
+        self.sections.append((name, []))
+
+    def __len__(self):
+        return sum(len(changes) for name, changes in self.sections)
+
+    # Method to forget every change added so far
+    def clear(self):
+        self.sections = [(None, [])]
+
+    # Method to apply the batch in one transaction; returns the rows changed by each kind
+    # of change and the ids of the films changed. The batch is emptied once it's committed.
+    def apply(self, skip_failed=False):
+        self.counts = dict.fromkeys(OPERATIONS, 0)
+        self.film_ids = set()
+        self.failed = []
+        cursor = self.connection.cursor()
+        self.connection.start_transaction()
+        try:
+            for name, changes in self.sections:
+                if name is not None:
+                    cursor.execute(f"SAVEPOINT {name}")
+                film_ids = set()
+                try:
+                    counts = self._apply_changes(cursor, changes, film_ids)
+                except Error as err:
+                    if name is None or not skip_failed:
+                        raise
+                    cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+                    self.dimensions.invalidate() # it may have names that were just rolled back
+                    self.failed.append((name, err))
+                    continue
+                for kind, count in counts.items():
+                    self.counts[kind] += count
+                self.film_ids |= film_ids
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            self.dimensions.invalidate()
+            self.film_ids = set()
+            raise
+        finally:
+            cursor.close()
+        self.clear()
+        return self.counts, self.film_ids
+
+    # Method to apply one section's changes, a run of the same kind of change at a time;
+    # the ids of the films changed are added to film_ids
+    def _apply_changes(self, cursor, changes, film_ids):
+        counts = dict.fromkeys(OPERATIONS, 0)
+        for kind, run in groupby(changes, key=lambda change: change[0]):
+            values = [change[1] for change in run]
+            if kind in DIMENSION_INSERTS:
+                statement, table = DIMENSION_INSERTS[kind]
+                cursor.executemany(statement, values)
+                counts[kind] += cursor.rowcount
+                self.dimensions.invalidate(table) # a multi-row INSERT only reports its first new id
+            elif kind == "add_film":
+                studios = self.dimensions.ids("studio", [film[4] for film in values])
+                genres = self.dimensions.ids("genre", [film[5] for film in values])
+                cursor.executemany(INSERT_FILM, [film[:4] + (studios[film[4]], genres[film[5]]) for film in values])
+                counts[kind] += cursor.rowcount
+                # executemany sends the films as one multi-row INSERT, whose lastrowid is the first new
+                # id; the names keep out anything other sessions have added since
+                film_ids.update(self._ids_in_chunks(cursor, FILM_IDS_ADDED, [film[0] for film in values],
+                                                    (cursor.lastrowid,)))
+            elif kind == "update_genre":
+                # Only a film's last new genre matters, so films are grouped by that
+                latest = dict(values)
+                genres = self.dimensions.ids("genre", latest.values())
+                film_ids.update(self._ids_in_chunks(cursor, FILM_IDS_NAMED, latest))
+                for genre, films in groupby(sorted(latest.items(), key=lambda item: item[1]), key=lambda item: item[1]):
+                    counts[kind] += self._in_chunks(cursor, UPDATE_FILMS_GENRE, [film for film, _ in films],
+                                                    (genres[genre],))
+            else:
+                film_names = [film_name for film_name, in values]
+                film_ids.update(self._ids_in_chunks(cursor, FILM_IDS_NAMED, film_names))
+                counts[kind] += self._in_chunks(cursor, DELETE_FILMS, film_names)
+        return counts
+
+    # Method to run a statement with an IN (...) list of film names, chunk_size names at a time;
+    # returns the rows changed
+    def _in_chunks(self, cursor, statement, film_names, before=()):
+        changed = 0
+        film_names = list(dict.fromkeys(film_names)) # each name once
+        for start in range(0, len(film_names), self.chunk_size):
+            chunk = film_names[start:start + self.chunk_size]
+            cursor.execute(statement.format(", ".join(["%s"] * len(chunk))), before + tuple(chunk))
+            changed += cursor.rowcount
+        return changed
+
+    # Method to read the film ids a query with an IN (...) list of film names finds, chunk_size
+    # names at a time
+    def _ids_in_chunks(self, cursor, statement, film_names, before=()):
+        film_ids = set()
+        film_names = list(dict.fromkeys(film_names))
+        for start in range(0, len(film_names), self.chunk_size):
+            chunk = film_names[start:start + self.chunk_size]
+            cursor.execute(statement.format(", ".join(["%s"] * len(chunk))), before + tuple(chunk))
+            film_ids.update(row[0] for row in cursor.fetchall())
+        return film_ids
@@ -3,110 +3,126 @@
 # 16 February 2025
 
 import os
+import sys
 import mysql.connector as db
 from mysql.connector import errorcode
-from dotenv import dotenv_values
 
-# .env is in parent folder; this gets absolute path to parent folder
-# Did this so I don't have to move to file's folder for it to execute properly
-parent_dir = "\\".join(os.path.realpath(__file__).split("\\")[:-2])
+# shared_db is in the parent folder; it finds the .env file there no matter which
+# folder the script is run from, and hands out pooled connections
+# e.g. this script is in csd-310/module-8 and .env and shared_db are in csd-310
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+from shared_db import load_config, get_connection, PreparedCursor
 
-# .env file must be in parent folder for this to work
-# e.g. this script is in csd-310\module-8 and .env is in csd-310
-secrets = dotenv_values(parent_dir + "\\.env")
+# In-memory copy of the film join; inserts, updates and deletes go through it so only
+# the films they change need showing afterwards, instead of re-running the whole join
+from film_view import FilmView
+
+# Batches of changes applied in one transaction
+from movie_batch import MovieBatch
+
+# Studio and genre name -> id lookups, shared by the view and the batches
+from dimension_cache import DimensionCache
 
 """ database config object """
-config = {
-    "user": secrets["USER"],
-    "password": secrets["PASSWORD"],
-    "host": secrets["HOST"],
-    "database": secrets["DATABASE"],
-    "raise_on_warnings": True, #not in .env file
-    "autocommit": True # was confused why updates didn't stick... now they do
-}
-
-def show_films(cursor, title):
-    ''' method to execute an inner join on all tables,
-        iterate over the dataset and output results to terminal window '''
-    
-    # inner join query
-    ''' I did the "as" bits as directed but don't really see why since
-        the results are pulled positionally, not by name... 
-        Also I did the query incrementally to keep the left-to-right
-        sizing appropriate to a python script '''
-    query = "SELECT film_name as Name, film_director as Director, "
-    query += "genre_name as Genre, studio_name as Studio FROM film "
-    query += "INNER JOIN genre ON film.genre_id = genre.genre_id "
-    query += "INNER JOIN studio ON film.studio_id = studio.studio_id"
-    cursor.execute(query)
-
-    # Store results of query
-    films = cursor.fetchall()
+config = load_config(".env", autocommit=True) # was confused why updates didn't stick... now they do
+
+def show_films(view, title):
+    ''' method to output every film in the view to the terminal window '''
 
     print(f"\n -- {title} --")
 
-    # Iterate over film data set and display the results
-    for film in films:
+    # Iterate over the films (name, director, genre, studio) and display them
+    for film in view.films.values():
         print(f"Name: {film[0]}")
         print(f"Director: {film[1]}")
         print(f"Genre: {film[2]}")
         print(f"Studio: {film[3]}")
         print()
 
+    # Nothing shown here needs showing again as a change
+    view.pop_changes()
+
+def show_changes(view, title):
+    ''' method to output just the films changed since the last display '''
+
+    print(f"\n -- {title} --")
+    for change, film_id, film in view.pop_changes():
+        print(f"{change.capitalize()}: {film[0]} (film ID {film_id})")
+        print(f"Director: {film[1]}")
+        print(f"Genre: {film[2]}")
+        print(f"Studio: {film[3]}")
+        print()
+    print(f"{len(view.films)} films in all")
+
+# Set before connecting so the finally block knows what there is to close
+movies = None
+cursor = None
+
 try:
     """ try/catch block for handling potential MySQL database errors """ 
 
-    movies = db.connect(**config) # connect to the movies database 
+    movies = get_connection(".env", pool_size=1, autocommit=True) # connect to the movies database 
     
     # output the connection status 
     print(f"\n  Database user {config["user"]} connected to MySQL on host {config["host"]} with database {config["database"]}")
 
-    # Create cursor to use for executing queries
-    cursor = movies.cursor()
+    # Create cursor to use for executing queries; it prepares each statement the first
+    # time it's run and reuses that for every later run on this connection
+    cursor = PreparedCursor(movies)
+
+    # Read the films once; the view is checked against the database every 50 changes
+    dimensions = DimensionCache(movies)
+    view = FilmView(cursor, check_every=50, dimensions=dimensions)
 
     # Control flow of program with input "breaks"
     input("\n  Press Enter to continue to display films in initial database...\n")
 
     # Call the function
-    show_films(cursor, "DISPLAYING FILMS")
+    show_films(view, "DISPLAYING FILMS")
 
     # Control flow of program with input "breaks"
     input("\n  Press Enter to continue to add The Fifth Element & then re-display films...\n")
 
     # The Fifth Element: Gaumont, 126 minutes, 1997, SciFi, Luc Besson
+    # The studio and the movie go in together, in one transaction, so neither is
+    # left behind without the other if something goes wrong
+    batch = MovieBatch(movies, dimensions=dimensions)
+
     # Add studio first
-    query = "INSERT INTO studio (studio_name) VALUES ('Gaumont')"
-    cursor.execute(query)
+    batch.add_studio("Gaumont")
 
-    # Now add movie, looking up genre_id and studio_id on the go
-    query = "INSERT INTO film (film_name, film_releaseDate, film_runtime, film_director, studio_id, "
-    query += "genre_id) VALUES ('The Fifth Element', '1997', 126, 'Luc Besson', (SELECT studio_id FROM "
-    query += "studio WHERE studio_name = 'Gaumont'), (SELECT genre_id FROM genre WHERE genre_name = 'SciFi'))"
-    cursor.execute(query)
+    # Now add movie; its studio_id and genre_id are looked up from the names
+    batch.add_film("The Fifth Element", "1997", 126, "Luc Besson", "Gaumont", "SciFi")
+    counts = view.apply(batch)
+    print(f"  Added {counts['add_studio']} studio and {counts['add_film']} film")
 
     # Call the function
-    show_films(cursor, "DISPLAYING FILMS AFTER INSERT")
+    show_changes(view, "DISPLAYING FILMS AFTER INSERT")
 
     # Control flow of program with input "breaks"
     input("\n  Press Enter to continue to update Alien genre & then re-display films...\n")
 
     # Update Alien's genre to Horror
-    query = "UPDATE film SET genre_id = (SELECT genre_id FROM genre WHERE genre_name = 'Horror') "
-    query += "WHERE film_name = 'Alien'"
-    cursor.execute(query)
+    view.update_genre("Alien", "Horror")
 
     # Call the function
-    show_films(cursor, "DISPLAYING FILMS AFTER Alien Horror UPDATE")
+    show_changes(view, "DISPLAYING FILMS AFTER Alien Horror UPDATE")
 
     # Control flow of program with input "breaks"
     input("\n  Press Enter to continue to remove Gladiator & then display films...\n")
 
     # Remove Gladiator from database
-    query = "DELETE FROM film WHERE film_name = 'Gladiator'"
-    cursor.execute(query)
+    view.delete_film("Gladiator")
 
     # Call the function
-    show_films(cursor, "DISPLAYING FILMS AFTER Gladiator DELETION")
+    show_changes(view, "DISPLAYING FILMS AFTER Gladiator DELETION")
+
+    # Control flow of program with input "breaks"
+    input("\n  Press Enter to check the films shown against the database...\n")
+
+    # Any differences (e.g. from someone else's changes) are shown and taken on by the view
+    view.check()
+    show_changes(view, "DIFFERENCES FOUND IN THE DATABASE")
 
 except db.Error as err:
     """ on error code """
@@ -121,6 +137,9 @@ except db.Error as err:
         print(err)
 
 finally:
-    """ close the connection to MySQL """
+    """ close the prepared statements and the connection to MySQL """
 
-    movies.close()
\ No newline at end of file
+    if cursor is not None:
+        cursor.close()
+    if movies is not None:
+        movies.close()
\ No newline at end of file
@@ -0,0 +1,23 @@
+/*
+    Title: movies_upgrade.sql
+    Description: index changes for the movies database used by modules 6-8. Each
+		section only needs to be run once.
+*/
+
+USE movies;
+
+-- studio and genre names are looked up to get their ids (see module-8/dimension_cache.py);
+-- unique indexes make those lookups index reads and keep a name from being added twice
+-- (if this fails, there are duplicate names to merge first)
+ALTER TABLE studio ADD UNIQUE INDEX idx_studio_name (studio_name);
+ALTER TABLE genre ADD UNIQUE INDEX idx_genre_name (genre_name);
+
+-- indexes for searching films (see module-7/film_search.py): B-tree indexes for name and
+-- director prefixes (and ordering by director) and for runtime and release year ranges, and a
+-- FULLTEXT index for words anywhere in the name or director
+ALTER TABLE film
+	ADD INDEX idx_film_name (film_name),
+	ADD INDEX idx_film_director (film_director),
+	ADD INDEX idx_film_runtime (film_runtime),
+	ADD INDEX idx_film_release_date (film_releaseDate);
+ALTER TABLE film ADD FULLTEXT INDEX ft_film_name_director (film_name, film_director);
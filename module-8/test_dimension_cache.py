@@ -0,0 +1,161 @@
+"""
+Tests for dimension_cache: studio and genre name lookups, run against an
+in-memory SQLite copy of the movies tables standing in for MySQL
+"""
+
+import re
+import sqlite3
+
+import pytest
+
+from dimension_cache import DimensionCache, name_key
+from movie_batch import MovieBatch
+
+# The movies tables, with the case-insensitive unique names of movies_upgrade.sql
+SCHEMA = """
+CREATE TABLE studio (studio_id INTEGER PRIMARY KEY, studio_name TEXT UNIQUE COLLATE NOCASE);
+CREATE TABLE genre (genre_id INTEGER PRIMARY KEY, genre_name TEXT UNIQUE COLLATE NOCASE);
+CREATE TABLE film (film_id INTEGER PRIMARY KEY, film_name TEXT, film_releaseDate TEXT, film_runtime INT,
+                   film_director TEXT, studio_id INT, genre_id INT);
+INSERT INTO studio VALUES (1, '20th Century Fox'), (2, 'Blumhouse Productions');
+INSERT INTO genre VALUES (1, 'Horror'), (2, 'SciFi'), (3, 'Drama');
+INSERT INTO film VALUES (1, 'Gladiator', '2000', 155, 'Ridley Scott', 1, 3),
+                        (2, 'Alien', '1979', 117, 'Ridley Scott', 1, 2);
+"""
+
+
+# Function to turn the MySQL statements used into SQLite ones
+def sqlite_sql(sql):
+    sql = sql.replace("%s", "?").replace(" FOR UPDATE", "")
+    return re.sub(r"ON DUPLICATE KEY UPDATE .*", "ON CONFLICT DO NOTHING", sql)
+
+
+# Class standing in for a mysql.connector cursor
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = connection.db.cursor()
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def execute(self, sql, params=()):
+        self.connection.statements.append(sql)
+        self.cursor.execute(sqlite_sql(sql), tuple(params))
+        self.rowcount, self.lastrowid = self.cursor.rowcount, self.cursor.lastrowid
+
+    # Like mysql.connector's multi-row INSERT: rows changed in all, and the first new id
+    def executemany(self, sql, seq_params):
+        self.connection.statements.append(sql)
+        self.rowcount, self.lastrowid = 0, None
+        for params in seq_params:
+            self.cursor.execute(sqlite_sql(sql), tuple(params))
+            self.rowcount += self.cursor.rowcount
+            self.lastrowid = self.lastrowid or self.cursor.lastrowid
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def close(self):
+        pass
+
+
+# Class standing in for a mysql.connector connection
+class FakeConnection:
+
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:", isolation_level=None)
+        self.db.executescript(SCHEMA)
+        self.statements = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def start_transaction(self):
+        self.db.execute("BEGIN")
+
+    def commit(self):
+        self.db.execute("COMMIT")
+
+    def rollback(self):
+        self.db.execute("ROLLBACK")
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    # SQLite has no information_schema; the markers only have to stay the same
+    monkeypatch.setattr(DimensionCache, "_fetch_markers", lambda self, table: ("unchanged",))
+    return FakeConnection()
+
+
+def genres(connection):
+    return connection.db.execute("SELECT genre_id, genre_name FROM genre ORDER BY genre_id").fetchall()
+
+
+def test_name_key_ignores_case_and_accents():
+    assert name_key("SciFi") == name_key("scifi") == name_key("SCIFI")
+    assert name_key("Gaumont Café") == name_key("gaumont cafe")
+    assert name_key("Horror") != name_key("Drama")
+
+
+def test_ids_of_known_names(connection):
+    cache = DimensionCache(connection)
+    assert cache.ids("genre", ["Horror", "Drama"]) == {"Horror": 1, "Drama": 3}
+    assert cache.id_of("studio", "Blumhouse Productions") == 2
+
+
+def test_names_match_whatever_their_case(connection):
+    cache = DimensionCache(connection)
+    assert cache.ids("genre", ["scifi", "HORROR"]) == {"scifi": 2, "HORROR": 1}
+    assert cache.stored_name("genre", "scifi") == "SciFi"
+    assert len(genres(connection)) == 3
+
+
+def test_missing_names_are_added_once(connection):
+    cache = DimensionCache(connection)
+    assert cache.ids("genre", ["Western", "western", "Horror"]) == {"Western": 4, "western": 4, "Horror": 1}
+    assert genres(connection)[3:] == [(4, "Western")]
+
+
+def test_missing_names_are_left_out_without_create(connection):
+    cache = DimensionCache(connection)
+    assert cache.ids("genre", ["Western", "Drama"], create=False) == {"Drama": 3}
+    assert cache.id_of("genre", "Western", create=False) is None
+    assert len(genres(connection)) == 3
+
+
+def test_names_are_only_read_once(connection):
+    cache = DimensionCache(connection)
+    cache.ids("genre", ["Horror"])
+    cache.ids("genre", ["Drama", "scifi"])
+    assert sum("FROM genre" in sql for sql in connection.statements) == 1
+
+
+def test_invalidate_reads_the_names_again(connection):
+    cache = DimensionCache(connection)
+    cache.ids("genre", ["Horror"])
+    connection.db.execute("UPDATE genre SET genre_name = 'Thriller' WHERE genre_id = 1")
+    assert cache.id_of("genre", "Thriller", create=False) is None
+    cache.invalidate("genre")
+    assert cache.id_of("genre", "Thriller", create=False) == 1
+
+
+def test_markers_from_the_same_second_as_a_write_never_match(connection, monkeypatch):
+    # None is what _fetch_markers gives when the table was written to in the current second
+    monkeypatch.setattr(DimensionCache, "_fetch_markers", lambda self, table: None)
+    cache = DimensionCache(connection, recheck_after=0)
+    cache.ids("genre", ["Horror"])
+    connection.db.execute("UPDATE genre SET genre_name = 'Thriller' WHERE genre_id = 1")
+    assert cache.id_of("genre", "Thriller", create=False) == 1
+    assert sum("FROM genre" in sql for sql in connection.statements) == 2
+
+
+def test_batch_adds_films_with_names_in_another_case(connection):
+    batch = MovieBatch(connection)
+    batch.add_film("Dune", "2021", 155, "Denis Villeneuve", "blumhouse productions", "scifi")
+    counts, film_ids = batch.apply()
+    assert counts["add_film"] == 1
+    (film_id,) = film_ids
+    assert connection.db.execute("SELECT studio_id, genre_id FROM film WHERE film_id = ?",
+                                 (film_id,)).fetchall() == [(2, 2)]
+    assert len(genres(connection)) == 3
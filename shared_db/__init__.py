@@ -0,0 +1,23 @@
+"""
+Shared database access for the csd-310 scripts
+
+Every script used to read its own .env file (with Windows-only paths), build
+its own config dictionary and open its own connection. This package does that
+once: load_config() reads a .env file from the repo's top folder, and
+get_connection()/connection() hand out health-checked connections from a
+mysql.connector connection pool.
+
+Scripts in the module-N folders add the repo's top folder to sys.path and then:
+
+    from shared_db import connection
+    with connection(".env_outland") as db:
+        ...
+"""
+
+from shared_db.config import load_config
+from shared_db.pool import get_pool, get_connection, connection
+from shared_db.prepared import PreparedCursor
+from shared_db.instrument import QueryLog, InstrumentedCursor, normalize_sql
+
+__all__ = ["load_config", "get_pool", "get_connection", "connection", "PreparedCursor",
+           "QueryLog", "InstrumentedCursor", "normalize_sql"]
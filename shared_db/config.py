@@ -0,0 +1,60 @@
+"""
+Loading database settings from the .env files in the repo's top folder
+"""
+
+from functools import lru_cache
+from pathlib import Path
+
+from dotenv import dotenv_values
+
+# The .env files live in the repo's top folder, next to this package
+ENV_DIR = Path(__file__).resolve().parent.parent
+
+# Pool size used when neither the caller nor the .env file sets POOL_SIZE
+DEFAULT_POOL_SIZE = 5
+
+# Waiver store folder used when the .env file doesn't set WAIVER_STORE
+DEFAULT_WAIVER_STORE = "waiver_store"
+
+
+# Function to read a .env file once; later calls reuse what was read
+@lru_cache(maxsize=None)
+def _read_env(env_name):
+    path = ENV_DIR / env_name
+    if not path.is_file():
+        raise FileNotFoundError(f"Database settings file {path} does not exist")
+    return dotenv_values(path)
+
+
+# Function to build the mysql.connector config dictionary for a .env file,
+# e.g. ".env_outland" for the outland database or ".env" for movies
+def load_config(env_name=".env_outland", **overrides):
+    secrets = _read_env(env_name)
+
+    # Set up config dictionary to match named variables expected by mysql.connector
+    config = {
+        "user": secrets["USER"],
+        "password": secrets["PASSWORD"],
+        "host": secrets["HOST"],
+        "database": secrets["DATABASE"],
+        "raise_on_warnings": True # not in .env file
+    }
+    if secrets.get("PORT"):
+        config["port"] = int(secrets["PORT"])
+
+    # Anything else (autocommit etc.) comes from the caller
+    config.update(overrides)
+    return config
+
+
+# Function to get the pool size set in a .env file, if any
+def pool_size_setting(env_name=".env_outland"):
+    value = _read_env(env_name).get("POOL_SIZE")
+    return int(value) if value else DEFAULT_POOL_SIZE
+
+
+# Function to get the folder of the waiver store set in a .env file (WAIVER_STORE, relative
+# to the repo's top folder unless absolute); defaults to a waiver_store folder there
+def waiver_store_setting(env_name=".env_outland"):
+    value = _read_env(env_name).get("WAIVER_STORE")
+    return ENV_DIR / (value or DEFAULT_WAIVER_STORE)
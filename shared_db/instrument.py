@@ -0,0 +1,235 @@
+"""
+Query instrumentation
+
+InstrumentedCursor wraps a cursor (a plain one or a PreparedCursor) and
+records every statement it runs in a QueryLog: the normalized statement text,
+how long it took (executing plus reading its rows), the rows and bytes read
+back, and which report ran it. Statements slower than a threshold get their
+EXPLAIN plan captured once. The log keeps per-statement totals for the
+diagnostics panel and can also write each statement to a rotating log file.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+# Patterns used to turn statements into their normalized form
+_COMMENTS = re.compile(r"/\*.*?\*/|--[^\n]*|#[^\n]*", re.DOTALL)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+_PLACEHOLDERS = re.compile(r"%s|%\(\w+\)s")
+_VALUE_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+# Statements EXPLAIN works on
+_EXPLAINABLE = ("select", "insert", "update", "delete", "replace", "with")
+
+
+# Function to normalize a statement so that runs differing only in their values group
+# together: comments dropped, literals and placeholders turned into ?, lists of values
+# squashed to (...), whitespace collapsed
+def normalize_sql(sql):
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", "replace")
+    sql = _COMMENTS.sub(" ", sql)
+    sql = _STRINGS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _VALUE_LISTS.sub("(...)", sql)
+    return _SPACES.sub(" ", sql).strip().rstrip(";").strip()
+
+
+# Function to estimate how many bytes a row took to send; the protocol overhead is
+# left out, so this is the payload size rather than exact network traffic
+def row_bytes(row):
+    total = 0
+    for value in row:
+        if value is None:
+            continue
+        if isinstance(value, (bytes, bytearray, str)):
+            total += len(value)
+        else:
+            total += 8
+    return total
+
+
+# Class to collect statement timings, keeping per-statement totals and recent statements
+class QueryLog:
+
+    def __init__(self, log_path=None, explain_over_ms=None, max_bytes=1_000_000, backups=3, recent=500):
+        # log_path, if given, is a file every statement is written to, rolled over at
+        # max_bytes with `backups` old copies kept; explain_over_ms, if given, is the
+        # time over which a statement's EXPLAIN plan is captured
+        self.log_path = log_path
+        self.explain_over_ms = explain_over_ms
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.recent = deque(maxlen=recent) # latest statements, newest last
+        self._stats = {}                   # (report, statement) -> totals, see record()
+        self._lock = threading.Lock()      # statements are recorded from worker threads
+        self._logger = None
+
+    # Method to set up the log file the first time something is written to it
+    def _file_logger(self):
+        if self._logger is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            handler = RotatingFileHandler(self.log_path, maxBytes=self.max_bytes, backupCount=self.backups,
+                                          encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self._logger = logging.getLogger(f"shared_db.queries.{id(self)}")
+            self._logger.propagate = False
+            self._logger.setLevel(logging.INFO)
+            self._logger.addHandler(handler)
+        return self._logger
+
+    # Method to check whether a statement that took elapsed_ms still needs its plan captured
+    def wants_plan(self, report, statement, elapsed_ms):
+        if self.explain_over_ms is None or elapsed_ms < self.explain_over_ms:
+            return False
+        if not statement.lower().startswith(_EXPLAINABLE):
+            return False
+        with self._lock:
+            stats = self._stats.get((report, statement))
+            return stats is None or stats["plan"] is None
+
+    # Method to record one finished statement
+    def record(self, report, statement, elapsed_ms, rows, size, plan=None):
+        with self._lock:
+            stats = self._stats.get((report, statement))
+            if stats is None:
+                stats = {"report": report, "statement": statement, "calls": 0, "total_ms": 0.0,
+                         "max_ms": 0.0, "rows": 0, "bytes": 0, "plan": None}
+                self._stats[(report, statement)] = stats
+            stats["calls"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["rows"] += rows
+            stats["bytes"] += size
+            if plan is not None:
+                stats["plan"] = plan
+            self.recent.append((time.time(), report, statement, elapsed_ms, rows, size))
+        if self.log_path:
+            self._file_logger().info(f"report={report or '-'} ms={elapsed_ms:.1f} rows={rows} bytes={size} "
+                                     f"sql={statement}" + (f" plan={plan}" if plan else ""))
+
+    # Method to get the slowest statements (by their slowest run), optionally for one report
+    def slowest(self, report=None, limit=10):
+        with self._lock:
+            stats = [dict(entry) for entry in self._stats.values() if report is None or entry["report"] == report]
+        stats.sort(key=lambda entry: entry["max_ms"], reverse=True)
+        return stats[:limit]
+
+    # Method to get the names of the reports that have run statements
+    def reports(self):
+        with self._lock:
+            return sorted({entry["report"] or "" for entry in self._stats.values()})
+
+    # Method to forget everything recorded so far
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+            self.recent.clear()
+
+
+# Class for a cursor that records what it runs in a QueryLog
+class InstrumentedCursor:
+
+    def __init__(self, cursor, log, report=None, connection=None):
+        # connection is used to run EXPLAIN; a PreparedCursor's own connection is used if not given
+        self.cursor = cursor
+        self.log = log
+        self.report = report # set this to tag statements with the report running them
+        self.connection = connection
+        self._statement = None
+        self._params = None
+        self._elapsed = 0.0
+        self._rows = 0
+        self._bytes = 0
+
+    # Method to run a statement; the previous one is recorded first, now its rows have been read
+    def execute(self, operation, params=()):
+        self.finish()
+        self._statement = operation
+        self._params = params
+        self._rows = self._bytes = 0
+        started = time.perf_counter()
+        try:
+            self.cursor.execute(operation, params)
+        finally:
+            self._elapsed = time.perf_counter() - started
+        return self
+
+    # Methods to read results, adding the time spent and what came back to the statement
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self.cursor.fetchone()
+        self._elapsed += time.perf_counter() - started
+        if row is not None:
+            self._rows += 1
+            self._bytes += row_bytes(row)
+        return row
+
+    def fetchmany(self, size=1):
+        started = time.perf_counter()
+        rows = self.cursor.fetchmany(size)
+        self._elapsed += time.perf_counter() - started
+        self._rows += len(rows)
+        self._bytes += sum(row_bytes(row) for row in rows)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self.cursor.fetchall()
+        self._elapsed += time.perf_counter() - started
+        self._rows += len(rows)
+        self._bytes += sum(row_bytes(row) for row in rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name) # rowcount, lastrowid etc. come from the wrapped cursor
+
+    # Method to record the last statement, capturing its plan if it was slow; called
+    # automatically by the next execute() and close(), or by hand once a job is over
+    def finish(self):
+        if self._statement is None:
+            return
+        operation, params = self._statement, self._params
+        self._statement = None
+        statement = normalize_sql(operation)
+        elapsed_ms = self._elapsed * 1000
+        plan = None
+        if self.log.wants_plan(self.report, statement, elapsed_ms):
+            plan = self._explain(operation, params)
+        self.log.record(self.report, statement, elapsed_ms, self._rows, self._bytes, plan)
+
+    # Method to get a statement's EXPLAIN plan as one short line per table
+    def _explain(self, operation, params):
+
+        # EXPLAIN can't be run as a prepared statement, so it goes through a plain cursor
+        # on the same connection, once the statement's own rows are out of the way
+        connection = self.connection or getattr(self.cursor, "connection", None)
+        if connection is None:
+            return None
+        try:
+            if connection.unread_result:
+                self.cursor.fetchall()
+            cursor = connection.cursor()
+            try:
+                cursor.execute("EXPLAIN " + operation.strip().rstrip(";"), tuple(params))
+                columns = [column[0] for column in cursor.description]
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception:
+            return None # a missing plan isn't worth failing the report over
+        return "; ".join(f"{row.get('table')}: {row.get('type')} key={row.get('key')} rows={row.get('rows')}"
+                         + (f" ({row['Extra']})" if row.get("Extra") else "") for row in rows)
+
+    # Method to record the last statement and close the wrapped cursor
+    def close(self):
+        self.finish()
+        self.cursor.close()
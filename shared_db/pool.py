@@ -0,0 +1,72 @@
+"""
+Pooled, health-checked connections
+
+Connections are handed out from one mysql.connector pool per .env file and
+set of connection options, so scripts and report workers reuse warm
+connections instead of paying the connect cost every time.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from shared_db.config import load_config, pool_size_setting
+
+# Pools made so far, keyed by .env file name and connection options
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+# Function to get (creating it the first time) the pool for a .env file and options
+def get_pool(env_name=".env_outland", pool_size=None, **overrides):
+
+    # mysql.connector is slow to import, so it's only loaded once a pool is needed
+    from mysql.connector import pooling
+
+    key = (env_name, tuple(sorted(overrides.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            size = pool_size or pool_size_setting(env_name)
+            pool = pooling.MySQLConnectionPool(pool_name=f"csd310_{len(_pools) + 1}",
+                                               pool_size=size,
+                                               **load_config(env_name, **overrides))
+            _pools[key] = pool
+    return pool
+
+
+# Function to check out a connection; close() on it hands it back to the pool
+def get_connection(env_name=".env_outland", pool_size=None, timeout=10, **overrides):
+    from mysql.connector import errors
+
+    pool = get_pool(env_name, pool_size, **overrides)
+
+    # Wait for a connection if they're all in use rather than failing straight away
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection = pool.get_connection()
+            break
+        except errors.PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+    # Health check: a connection that sat in the pool may have been dropped by the
+    # server (wait_timeout, restarts); ping reconnects it before it's handed out
+    try:
+        connection.ping(reconnect=True, attempts=3, delay=1)
+    except errors.Error:
+        connection.close()
+        raise
+    return connection
+
+
+# Context manager version of get_connection that always hands the connection back
+@contextmanager
+def connection(env_name=".env_outland", pool_size=None, timeout=10, **overrides):
+    db = get_connection(env_name, pool_size, timeout, **overrides)
+    try:
+        yield db
+    finally:
+        db.close()
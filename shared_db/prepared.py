@@ -0,0 +1,90 @@
+"""
+Prepared statements, cached per connection
+
+PreparedCursor looks and behaves like an ordinary cursor (execute, fetchone,
+fetchmany, fetchall, close), but runs every statement through a server-side
+prepared statement. Each distinct statement is prepared once per connection
+and its handle kept, so running the same statement again only sends the
+parameter values. Values must always be passed as parameters (%s); only
+fixed SQL text, like known table and column names, belongs in the statement.
+"""
+
+from collections import OrderedDict
+
+
+# Class for a cursor that keeps one prepared statement per distinct SQL statement
+class PreparedCursor:
+
+    def __init__(self, connection, max_statements=32):
+        self.connection = connection
+        self.max_statements = max_statements # prepared handles kept before the oldest is closed
+        self._statements = OrderedDict()     # SQL text -> (SQL text, prepared cursor for it)
+        self._current = None                 # cursor of the statement executed last
+        self._rowcount = None                # rows changed by the last executemany(), added up
+
+    # Method to run a statement, preparing it first if this connection hasn't seen it yet
+    def execute(self, operation, params=()):
+        self._rowcount = None
+
+        # Like any unbuffered cursor, the last statement's rows have to be read before the
+        # connection can run another one (e.g. after fetchone() on a one-row result). That
+        # includes closing a prepared handle below, so they're read first.
+        if self._current is not None and self.connection.unread_result:
+            self._current.fetchall()
+
+        entry = self._statements.get(operation)
+        if entry is None:
+            # mysql.connector only reuses a prepared handle when it's handed the very same
+            # string object it prepared, so that string is kept alongside the cursor
+            entry = (operation, self.connection.cursor(prepared=True))
+            self._statements[operation] = entry
+            while len(self._statements) > self.max_statements:
+                self._statements.popitem(last=False)[1][1].close()
+        else:
+            self._statements.move_to_end(operation)
+        operation, cursor = entry
+        self._current = cursor
+        cursor.execute(operation, tuple(params))
+        return self
+
+    # Method to run a statement once per set of parameters, reusing one prepared handle;
+    # rowcount is then the rows changed by all of them
+    def executemany(self, operation, seq_params):
+        changed = 0
+        for params in seq_params:
+            self.execute(operation, params)
+            changed += max(self._current.rowcount, 0)
+        self._rowcount = changed
+        return self
+
+    # Methods to read the results of the last statement
+    def fetchone(self):
+        return self._current.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._current.fetchmany(size)
+
+    def fetchall(self):
+        return self._current.fetchall()
+
+    @property
+    def rowcount(self):
+        if self._rowcount is not None:
+            return self._rowcount
+        return self._current.rowcount if self._current is not None else -1
+
+    @property
+    def lastrowid(self):
+        return self._current.lastrowid if self._current is not None else None
+
+    @property
+    def description(self):
+        return self._current.description if self._current is not None else None
+
+    # Method to close every prepared statement; do this before closing (or handing back
+    # to its pool) the connection, since pooled connections forget their statements
+    def close(self):
+        statements, self._statements = self._statements, OrderedDict()
+        self._current = None
+        for operation, cursor in statements.values():
+            cursor.close()